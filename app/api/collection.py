@@ -1,29 +1,38 @@
 """
 컬렉션 관리 API
 """
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import asyncpg
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from pymilvus.exceptions import MilvusException
 from app.models.collection import (
     CollectionInitRequest, 
     CollectionInitResponse,
     BotRegisterRequest,
-    BotRegisterResponse
+    BotRegisterResponse,
+    BotBatchRegisterRequest,
+    BotBatchRegisterResult,
+    BotBatchRegisterResponse
 )
 from app.utils.logger import setup_logger
+from app.utils.exceptions import MilvusRAGException, CollectionAlreadyExistsError
+from app.utils.naming import generate_partition_name, generate_collection_name
 from app.core.milvus_client import milvus_client
 from app.core.postgres_client import postgres_client
-from app.core.partition_manager import partition_manager
+from app.core.partition_creator import partition_creator
 from app.config import settings
 
 logger = setup_logger(__name__)
 router = APIRouter()
 
+# 500 응답으로 변환할 백엔드 예외 (그 외 예외는 FastAPI 기본 핸들러로 전달)
+# - ValueError: 잘못된 계정명 (settings.get_db_name / get_collection_name 검증)
+# - OSError: 연결 거부, 타임아웃 등 네트워크 오류
+BACKEND_ERRORS = (MilvusException, asyncpg.PostgresError, MilvusRAGException, OSError, ValueError)
 
-def generate_partition_name(chat_bot_id: str) -> str:
-    """chat_bot_id로 파티션명 자동 생성"""
-    return f"bot_{chat_bot_id.replace('-', '')}"
 
-
-@router.post("/create", response_model=CollectionInitResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/create", response_model=CollectionInitResponse, response_class=ORJSONResponse, status_code=status.HTTP_201_CREATED)
 async def create_collection_endpoint(request: CollectionInitRequest):
     """
     컬렉션 생성 (최초 1회만)
@@ -38,54 +47,66 @@ async def create_collection_endpoint(request: CollectionInitRequest):
     - 삭제는 별도 API로만 가능
     """
     try:
-        collection_name = f"collection_{request.account_name}"
+        collection_name = generate_collection_name(request.account_name)
         dimension = settings.EMBEDDING_DIMENSION
         
-        logger.info(f"컬렉션 생성 요청: account={request.account_name}, dimension={dimension} (시스템 설정)")
+        logger.info("컬렉션 생성 요청: account=%s, dimension=%s (시스템 설정)", request.account_name, dimension)
         
-        # 1. PostgreSQL 데이터베이스 생성
+        # 1. PostgreSQL 데이터베이스 생성 (테이블 초기화의 선행 조건)
         await postgres_client.create_database(request.account_name)
-        logger.info(f"✅ PostgreSQL 데이터베이스 생성 완료")
+        logger.info("✅ PostgreSQL 데이터베이스 생성 완료")
         
-        # 2. PostgreSQL 테이블 초기화
-        await postgres_client.init_account_tables(request.account_name)
-        logger.info(f"✅ PostgreSQL 테이블 초기화 완료")
+        # 2. Milvus 컬렉션 생성은 PostgreSQL과 독립적이므로 바로 시작
+        #    (동기 pymilvus 호출은 스레드에서 실행하여 이벤트 루프 차단 방지)
+        milvus_task = asyncio.create_task(asyncio.to_thread(
+            milvus_client.create_collection,
+            account_name=request.account_name,
+            dimension=dimension
+        ))
         
-        # 3. Milvus 컬렉션 생성 (이미 존재하면 예외 발생)
+        # 3. PostgreSQL 테이블 초기화 (Milvus 컬렉션 생성과 동시 진행)
         try:
-            milvus_client.create_collection(
-                account_name=request.account_name,
-                dimension=dimension
-            )
-            logger.info(f"✅ Milvus 컬렉션 생성 완료: {collection_name}")
+            await postgres_client.init_account_tables(request.account_name)
+        except Exception:
+            milvus_task.cancel()
+            raise
+        logger.info("✅ PostgreSQL 테이블 초기화 완료")
+        
+        # 4. Milvus 컬렉션 생성 결과 확인 (이미 존재하면 예외 발생)
+        try:
+            await milvus_task
+            logger.info("✅ Milvus 컬렉션 생성 완료: %s", collection_name)
             
-            return CollectionInitResponse(
-                status="success",
-                message=f"Collection '{collection_name}' created successfully.",
-                collection_name=collection_name
+            return ORJSONResponse(
+                status_code=status.HTTP_201_CREATED,
+                content={
+                    "status": "success",
+                    "message": f"Collection '{collection_name}' created successfully.",
+                    "collection_name": collection_name
+                }
             )
             
-        except Exception as create_error:
+        except CollectionAlreadyExistsError:
             # 이미 존재하는 경우
-            if "already exist" in str(create_error).lower():
-                logger.info(f"⚠️ 컬렉션이 이미 존재합니다: {collection_name}")
-                return CollectionInitResponse(
-                    status="success",
-                    message=f"Collection '{collection_name}' already exists.",
-                    collection_name=collection_name
-                )
-            else:
-                raise create_error
+            logger.info("⚠️ 컬렉션이 이미 존재합니다: %s", collection_name)
+            return ORJSONResponse(
+                status_code=status.HTTP_201_CREATED,
+                content={
+                    "status": "success",
+                    "message": f"Collection '{collection_name}' already exists.",
+                    "collection_name": collection_name
+                }
+            )
                 
-    except Exception as e:
-        logger.error(f"컬렉션 생성 실패: {str(e)}")
+    except BACKEND_ERRORS as e:
+        logger.exception("컬렉션 생성 실패")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create collection: {str(e)}"
+            detail=f"Failed to create collection: {e}"
         )
 
 
-@router.post("/register-bot", response_model=BotRegisterResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/register-bot", response_model=BotRegisterResponse, response_class=ORJSONResponse, status_code=status.HTTP_201_CREATED)
 async def register_bot(request: BotRegisterRequest):
     """
     새로운 봇 등록 (파티션 자동 생성)
@@ -101,40 +122,229 @@ async def register_bot(request: BotRegisterRequest):
     try:
         # 파티션명 자동 생성
         partition_name = generate_partition_name(request.chat_bot_id)
-        collection_name = f"collection_{request.account_name}"
+        collection_name = generate_collection_name(request.account_name)
         
-        logger.info(f"봇 등록 요청 (account: {request.account_name}): bot_id={request.chat_bot_id}, name={request.bot_name}, partition={partition_name}")
+        logger.info("봇 등록 요청 (account: %s): bot_id=%s, name=%s, partition=%s", request.account_name, request.chat_bot_id, request.bot_name, partition_name)
         
-        # 1. PostgreSQL 봇 등록 (트리거로 PostgreSQL 파티션 자동 생성)
-        await postgres_client.register_bot(
-            account_name=request.account_name,
-            bot_id=request.chat_bot_id,
-            bot_name=request.bot_name,
-            partition_name=partition_name,
-            description=request.description if hasattr(request, 'description') else None,
-            metadata=request.metadata if hasattr(request, 'metadata') else None
+        # 1. PostgreSQL 봇 등록 + Milvus 파티션 생성 동시 실행
+        #    - PostgreSQL: 신규 등록 시 PostgreSQL 파티션 생성
+        #    - Milvus: collection_{account_name} 내 파티션 생성 (파티션 생성 큐에서 묶음 처리)
+        pg_result, milvus_result = await asyncio.gather(
+            postgres_client.register_bot(
+                account_name=request.account_name,
+                bot_id=request.chat_bot_id,
+                bot_name=request.bot_name,
+                partition_name=partition_name,
+                description=request.description,
+                metadata=request.metadata
+            ),
+            partition_creator.create(
+                account_name=request.account_name,
+                partition_name=partition_name
+            ),
+            return_exceptions=True
         )
-        logger.info(f"✅ PostgreSQL 봇 등록 완료: {request.bot_name}")
         
-        # 2. Milvus 파티션 생성 (collection_{account_name} 내)
-        milvus_client.create_partition(
-            account_name=request.account_name,
-            partition_name=partition_name
-        )
-        logger.info(f"✅ Milvus 파티션 생성 완료: {partition_name}")
+        pg_failed = isinstance(pg_result, BaseException)
+        milvus_failed = isinstance(milvus_result, BaseException)
+        
+        # 2. 한쪽만 실패한 경우 성공한 쪽을 보상 (Saga)
+        if pg_failed or milvus_failed:
+            if milvus_failed and not pg_failed and pg_result:
+                # 이번 요청으로 새로 등록된 경우에만 등록 취소 (기존 봇은 유지)
+                try:
+                    await postgres_client.unregister_bot(request.account_name, request.chat_bot_id)
+                except Exception as rollback_error:
+                    logger.error("❌ PostgreSQL 봇 등록 롤백 실패: %s", rollback_error)
+            elif pg_failed and not milvus_failed:
+                try:
+                    await milvus_client.delete_partition(collection_name, partition_name)
+                except Exception as rollback_error:
+                    logger.error("❌ Milvus 파티션 롤백 실패: %s", rollback_error)
+            
+            raise pg_result if pg_failed else milvus_result
+        
+        logger.info("✅ PostgreSQL 봇 등록 완료: %s", request.bot_name)
+        logger.info("✅ Milvus 파티션 생성 완료: %s", partition_name)
         
         # Note: 파티션 로드는 데이터 삽입/검색 시 자동으로 수행됨 (온디맨드)
         
-        return BotRegisterResponse(
-            status="success",
-            message=f"Bot '{request.bot_name}' registered successfully.",
-            partition_name=partition_name,
-            collection_name=collection_name
+        # 고정 형태의 성공 응답은 모델 검증 없이 바로 직렬화
+        return ORJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content={
+                "status": "success",
+                "message": f"Bot '{request.bot_name}' registered successfully.",
+                "partition_name": partition_name,
+                "collection_name": collection_name
+            }
         )
-    except Exception as e:
-        logger.error(f"컬렉션 생성 실패: {str(e)}")
+    except BACKEND_ERRORS as e:
+        logger.exception("봇 등록 실패")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create collection: {str(e)}"
+            detail=f"Failed to create collection: {e}"
         )
 
+
+async def _run_compensations(compensations: list):
+    """
+    봇 일괄 등록 보상 작업 실행 (MAX_CONCURRENT_PARTITION_CREATES 개수까지 동시 실행)
+    
+    Args:
+        compensations: (코루틴, 로그용 설명) 리스트
+    
+    Note:
+        보상 실패는 로그만 남김 (응답에는 이미 실패로 기록됨)
+    """
+    semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PARTITION_CREATES)
+    
+    async def _run(coro):
+        async with semaphore:
+            return await coro
+    
+    outcomes = await asyncio.gather(*[_run(coro) for coro, _ in compensations], return_exceptions=True)
+    for (_, target), outcome in zip(compensations, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("❌ 봇 등록 롤백 실패: %s - %s", target, outcome)
+
+
+@router.post(
+    "/register-bots",
+    response_model=BotBatchRegisterResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        207: {"model": BotBatchRegisterResponse, "description": "일부 봇만 등록됨"},
+        500: {"model": BotBatchRegisterResponse, "description": "모든 봇 등록 실패"}
+    }
+)
+async def register_bots(request: BotBatchRegisterRequest, response: Response):
+    """
+    봇 일괄 등록 (파티션 자동 생성)
+    
+    - **bots**: 등록할 봇 리스트 (각 항목은 /register-bot 요청과 동일)
+    
+    1. PostgreSQL: 계정별 단일 트랜잭션으로 bot_registry 일괄 등록
+    2. Milvus: 파티션 생성 큐에 적재 (MAX_CONCURRENT_PARTITION_CREATES 개수씩 묶어 병렬 생성)
+    3. 한쪽만 실패한 봇은 성공한 쪽을 보상 (Saga, 같은 개수 제한으로 병렬 실행)
+    
+    응답 코드: 전체 성공 201, 일부 실패 207, 전체 실패 500 (본문에 봇별 결과 포함)
+    
+    Note: 컬렉션(collection_chatty)은 /create API로 먼저 생성되어 있어야 합니다.
+    """
+    try:
+        logger.info("봇 일괄 등록 요청: %s개", len(request.bots))
+        
+        # 계정별 그룹화 (같은 요청 내 중복 봇은 첫 번째만 처리)
+        bots_by_account = {}
+        results = []
+        seen = set()
+        for bot in request.bots:
+            partition_name = generate_partition_name(bot.chat_bot_id)
+            key = (bot.account_name, bot.chat_bot_id)
+            if key in seen:
+                results.append(BotBatchRegisterResult(
+                    chat_bot_id=bot.chat_bot_id,
+                    partition_name=partition_name,
+                    status="failed",
+                    error="Duplicate bot in request"
+                ))
+                continue
+            seen.add(key)
+            bots_by_account.setdefault(bot.account_name, []).append((bot, partition_name))
+        
+        # PostgreSQL(계정별 1회) + Milvus(봇별) 동시 실행
+        pg_tasks = {
+            account_name: asyncio.create_task(postgres_client.register_bots(
+                account_name=account_name,
+                bots=[
+                    {
+                        "bot_id": bot.chat_bot_id,
+                        "bot_name": bot.bot_name,
+                        "partition_name": partition_name,
+                        "description": bot.description,
+                        "metadata": bot.metadata
+                    }
+                    for bot, partition_name in bots
+                ]
+            ))
+            for account_name, bots in bots_by_account.items()
+        }
+        milvus_tasks = {
+            (account_name, bot.chat_bot_id): asyncio.create_task(
+                partition_creator.create(account_name, partition_name)
+            )
+            for account_name, bots in bots_by_account.items()
+            for bot, partition_name in bots
+        }
+        await asyncio.gather(*pg_tasks.values(), *milvus_tasks.values(), return_exceptions=True)
+        
+        # 결과 집계 및 보상 작업 수집
+        compensations = []
+        for account_name, bots in bots_by_account.items():
+            collection_name = generate_collection_name(account_name)
+            pg_task = pg_tasks[account_name]
+            pg_error = pg_task.exception()
+            inserted_bot_ids = set() if pg_error else set(pg_task.result())
+            
+            for bot, partition_name in bots:
+                milvus_error = milvus_tasks[(account_name, bot.chat_bot_id)].exception()
+                
+                if pg_error is None and milvus_error is None:
+                    results.append(BotBatchRegisterResult(
+                        chat_bot_id=bot.chat_bot_id,
+                        partition_name=partition_name,
+                        status="success"
+                    ))
+                    continue
+                
+                if milvus_error is not None and bot.chat_bot_id in inserted_bot_ids:
+                    compensations.append((
+                        postgres_client.unregister_bot(account_name, bot.chat_bot_id),
+                        f"PostgreSQL bot_id={bot.chat_bot_id}"
+                    ))
+                elif pg_error is not None and milvus_error is None:
+                    compensations.append((
+                        milvus_client.delete_partition(collection_name, partition_name),
+                        f"Milvus partition={partition_name}"
+                    ))
+                
+                results.append(BotBatchRegisterResult(
+                    chat_bot_id=bot.chat_bot_id,
+                    partition_name=partition_name,
+                    status="failed",
+                    error=str(pg_error if pg_error is not None else milvus_error)
+                ))
+        
+        if compensations:
+            await _run_compensations(compensations)
+        
+        success_count = sum(1 for result in results if result.status == "success")
+        failed_count = len(results) - success_count
+        
+        # HTTP 상태 코드만 보는 클라이언트도 실패를 구분할 수 있도록 207/500 사용
+        if failed_count == 0:
+            response_status = "success"
+        elif success_count == 0:
+            response_status = "failed"
+            response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        else:
+            response_status = "partial"
+            response.status_code = status.HTTP_207_MULTI_STATUS
+        
+        logger.info("✅ 봇 일괄 등록 완료: 성공 %s개, 실패 %s개", success_count, failed_count)
+        
+        return BotBatchRegisterResponse(
+            status=response_status,
+            message=f"Registered {success_count}/{len(results)} bots.",
+            total_count=len(results),
+            success_count=success_count,
+            failed_count=failed_count,
+            results=results
+        )
+    except BACKEND_ERRORS as e:
+        logger.exception("봇 일괄 등록 실패")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to register bots: {e}"
+        )
@@ -1,13 +1,21 @@
 """
 데이터 관리 API (CRUD)
 """
+import asyncio
+import logging
+import asyncpg
+import orjson
+from collections import defaultdict
+from functools import lru_cache, wraps
 from fastapi import APIRouter, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.models.document import (
     DocumentInsertRequest,
     DocumentInsertResponse,
     BatchInsertRequest,
     BatchInsertResponse,
     BatchInsertWithEmbeddingsRequest,
+    BatchInsertResult,
     DocumentResponse,
     DocumentUpdateRequest,
     DocumentUpdateResponse,
@@ -15,28 +23,260 @@ from app.models.document import (
     DocumentDeleteResponse,
     BotDeleteRequest,
     BotDeleteResponse,
+    BotDeleteJobStatusResponse,
     MetadataUpdateRequest,
     MetadataUpdateResponse,
     DuplicateCheckRequest,
     DuplicateCheckResponse
 )
-from app.schemas.milvus_metadata import filter_milvus_metadata
-from app.utils.logger import setup_logger
+from app.schemas.milvus_metadata import filter_milvus_metadata, filter_milvus_metadata_many
+from app.utils.logger import setup_logger, log_request_summary
+from app.utils.naming import generate_partition_name, generate_collection_name
 from app.core.auto_flusher import auto_flusher
 from app.core.postgres_client import postgres_client
 from app.core.milvus_client import milvus_client
+from app.core.partition_reaper import partition_reaper
 from app.core.embedding import embedding_service
 from app.config import settings
 from pymilvus import Collection
-from datetime import datetime
+from pymilvus.exceptions import MilvusException
+from time import perf_counter_ns
 
 logger = setup_logger(__name__)
-router = APIRouter()
+# 모든 응답을 orjson으로 직렬화 (C 구현, bytes 직접 생성)
+# 응답 모델은 서버가 만든 값이므로 model_construct로 생성 (검증은 응답 직렬화 단계에서 1회만)
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# 계정별 동시 삽입 제한 (한 계정이 연결 풀/임베딩 서버를 독점하지 않도록)
+_insert_semaphores = defaultdict(lambda: asyncio.Semaphore(settings.MAX_CONCURRENT_INSERTS))
 
-def generate_partition_name(chat_bot_id: str) -> str:
-    """chat_bot_id로 파티션명 자동 생성"""
-    return f"bot_{chat_bot_id.replace('-', '')}"
+
+def _limit_concurrent_inserts(func):
+    """
+    삽입 엔드포인트를 계정별 세마포어로 감싸는 데코레이터
+    
+    Note:
+        request.account_name 기준으로 MAX_CONCURRENT_INSERTS개까지만 동시 실행
+        functools.wraps로 원래 시그니처를 유지하므로 FastAPI 요청 파싱은 그대로 동작
+    """
+    @wraps(func)
+    async def wrapper(request, *args, **kwargs):
+        async with _insert_semaphores[request.account_name]:
+            return await func(request, *args, **kwargs)
+    return wrapper
+
+
+async def _timed(coro):
+    """
+    코루틴 실행 후 (결과, 소요 시간 ms) 반환
+    
+    asyncio.gather로 동시 실행하는 단계별 소요 시간 측정용
+    """
+    start = perf_counter_ns()
+    result = await coro
+    return result, (perf_counter_ns() - start) / 1e6
+
+
+_UNTITLED = '(제목 없음)'
+
+# 저장소별로 예상 가능한 실패 (그 외 예외는 그대로 전파되어 최종 핸들러에서 500 처리)
+_MILVUS_ERRORS = (MilvusException, ConnectionError, TimeoutError)
+_POSTGRES_ERRORS = (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, TimeoutError)
+
+# 문서 삭제 결과 → (응답 status, message 포맷) 조회 테이블
+# 키: (모두 성공 여부, 1개 이상 성공 여부)
+_DELETE_STATUS_TABLE = {
+    (True, True): ("success", "All {n_req} documents deleted successfully"),
+    (False, True): ("partial_success", "Deleted {n_ok} out of {n_req} requested documents"),
+    (False, False): ("failed", "Failed to delete any of {n_req} requested documents"),
+}
+
+
+@lru_cache(maxsize=1024)
+def _delete_status(n_ok: int, n_req: int) -> tuple:
+    """
+    문서 삭제 결과의 (응답 status, message) 조회
+    
+    Note:
+        (n_ok, n_req) 조합은 요청 크기 분포상 반복이 많으므로 포맷 결과를 캐시
+    """
+    response_status, message_format = _DELETE_STATUS_TABLE[(n_ok == n_req, n_ok > 0)]
+    return response_status, message_format.format(n_ok=n_ok, n_req=n_req)
+
+
+def _alternate_url(content_name: str):
+    """
+    URL 형식 content_name의 http ↔ https 교체 이름 반환 (URL이 아니면 None)
+    """
+    if content_name.startswith('http://'):
+        return 'https://' + content_name[7:]
+    if content_name.startswith('https://'):
+        return 'http://' + content_name[8:]
+    return None
+
+
+def _doc_title(doc) -> str:
+    """문서 메타데이터의 title 조회 (없으면 '(제목 없음)')"""
+    metadata = doc.metadata
+    return metadata.get('title', _UNTITLED) if metadata else _UNTITLED
+
+
+def _failed_result(doc, reason: str) -> BatchInsertResult:
+    """배치 삽입 실패 문서 결과 생성 (서버가 만든 값이므로 검증 없이 model_construct 사용)"""
+    return BatchInsertResult.model_construct(
+        doc_id=0,
+        title=_doc_title(doc),
+        total_chunks=0,
+        success=False,
+        error=reason
+    )
+
+
+def _batch_insert_response(response: BatchInsertResponse):
+    """
+    배치 삽입 응답 반환 (결과가 많으면 스트리밍)
+    
+    Args:
+        response: model_construct로 만든 배치 삽입 응답
+    
+    Returns:
+        results가 STREAM_RESPONSE_MIN_RESULTS개 이하면 response 그대로,
+        초과하면 JSON을 조각으로 내보내는 StreamingResponse (201)
+    
+    Note:
+        응답 전체를 하나의 bytes로 직렬화하지 않고 results를 STREAM_RESPONSE_CHUNK_SIZE개씩
+        orjson으로 직렬화해 전송 (응답 크기만큼의 메모리 피크 제거, 첫 바이트 전송 시점 단축)
+    """
+    results = response.results
+    if len(results) <= settings.STREAM_RESPONSE_MIN_RESULTS:
+        return response
+    
+    chunk_size = settings.STREAM_RESPONSE_CHUNK_SIZE
+    
+    async def _iter_json():
+        # {..., "results": [ 까지 먼저 전송
+        head = orjson.dumps(response.model_dump(exclude={"results"}))
+        yield head[:-1] + b',"results":['
+        for i in range(0, len(results), chunk_size):
+            body = orjson.dumps([r.model_dump() for r in results[i:i + chunk_size]])[1:-1]
+            yield body if i == 0 else b"," + body
+        yield b"]}"
+    
+    return StreamingResponse(
+        _iter_json(),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json"
+    )
+
+
+def _ensure_batch_within_limit(total_chunks: int):
+    """
+    배치 요청의 총 청크 수 상한 검사 (DB/임베딩 작업 전에 거부)
+    
+    Raises:
+        HTTPException(413): total_chunks가 MAX_CHUNKS_PER_BATCH 초과
+    """
+    if total_chunks > settings.MAX_CHUNKS_PER_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"배치당 최대 청크 수 초과: {total_chunks}개 (최대 {settings.MAX_CHUNKS_PER_BATCH}개)"
+        )
+
+
+def _build_batch_payloads_with_embeddings(documents: list) -> tuple:
+    """
+    임베딩 포함 배치 삽입용 PostgreSQL/Milvus 페이로드를 한 번의 순회로 구성
+    
+    Args:
+        documents: 요청 문서 리스트 (DocumentWithChunksAndEmbeddings)
+    
+    Returns:
+        (PostgreSQL documents_data, Milvus documents_data) 튜플
+    
+    Note:
+        - 청크 dict는 PostgreSQL(chunk_index, text, content_hash)과 Milvus(embedding)가 공유
+        - Milvus 페이로드의 doc_id는 PostgreSQL 삽입 후 채움
+        - CPU 작업만 수행하므로 asyncio.to_thread로 호출
+    """
+    documents_data = []
+    milvus_documents_data = []
+    milvus_metadatas = filter_milvus_metadata_many(doc.metadata for doc in documents)
+    for doc, milvus_metadata in zip(documents, milvus_metadatas):
+        all_metadata = doc.metadata or {}
+        chunks = [
+            {
+                "chunk_index": c.chunk_index,
+                "text": c.text,
+                "content_hash": c.content_hash,
+                "embedding": c.embedding  # 제공된 임베딩 사용
+            }
+            for c in doc.chunks
+        ]
+        
+        documents_data.append({
+            "document_data": {
+                "chat_bot_id": doc.chat_bot_id,
+                "content_name": doc.content_name,  # 문서 고유 식별자
+                "metadata": all_metadata  # 전체 메타데이터를 PostgreSQL에 저장
+            },
+            "chunks": chunks
+        })
+        milvus_documents_data.append({
+            "chat_bot_id": doc.chat_bot_id,
+            "doc_id": None,  # PostgreSQL 삽입 후 채움
+            "content_name": doc.content_name,
+            "chunks": chunks,
+            "metadata": milvus_metadata  # 필터링용 메타데이터만 Milvus에
+        })
+    
+    return documents_data, milvus_documents_data
+
+
+# 실행 중인 백그라운드 보상 삭제 태스크 (GC로 태스크가 사라지지 않도록 참조 유지)
+_rollback_tasks = set()
+
+
+def _spawn_rollback(coro, target: str):
+    """
+    보상 삭제를 백그라운드 태스크로 실행 (실패 응답은 롤백 완료를 기다리지 않고 바로 반환)
+    
+    Args:
+        coro: 보상 삭제 코루틴
+        target: 로그용 대상 설명 (예: "doc_id=1")
+    
+    Note:
+        요청과 별개 태스크이므로 클라이언트 연결이 끊겨도 취소되지 않음
+        완료/실패는 done 콜백에서 로그로 남김
+    """
+    task = asyncio.create_task(coro)
+    _rollback_tasks.add(task)
+    
+    def _on_done(t: asyncio.Task):
+        _rollback_tasks.discard(t)
+        if t.cancelled():
+            logger.error("❌ PostgreSQL 롤백 취소됨: %s", target)
+        elif t.exception() is not None:
+            logger.error("❌ PostgreSQL 롤백 실패: %s, 오류: %s", target, t.exception())
+        else:
+            logger.info("✅ PostgreSQL 롤백 완료: %s", target)
+    
+    task.add_done_callback(_on_done)
+
+
+async def _rollback_documents(account_name: str, documents: list, doc_ids: list):
+    """
+    배치 삽입 실패 시 PostgreSQL 보상 삭제 (봇 수와 관계없이 DELETE 1회)
+    
+    Args:
+        account_name: 계정명
+        documents: 요청 문서 리스트 (chat_bot_id 확인용)
+        doc_ids: documents와 같은 순서의 doc_id 리스트
+    """
+    await postgres_client.delete_document_pairs(account_name, [
+        (doc.chat_bot_id, doc_id)
+        for doc, doc_id in zip(documents, doc_ids)
+        if doc_id is not None
+    ])
 
 
 @router.post("/check-duplicates", response_model=DuplicateCheckResponse, status_code=status.HTTP_200_OK)
@@ -51,12 +291,7 @@ async def check_duplicates(request: DuplicateCheckRequest):
     중복 기준: chat_bot_id + content_name 조합
     """
     try:
-        start_time = datetime.now()
-        
-        logger.info(f"🔍 중복 검사 시작")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Bot ID: {request.chat_bot_id}")
-        logger.info(f"   - 요청한 content_names: {len(request.content_name)}개")
+        start_time = perf_counter_ns()
         
         # PostgreSQL에서 존재하는 content_name들 조회
         existing_content_names = await postgres_client.get_existing_content_names(
@@ -65,22 +300,23 @@ async def check_duplicates(request: DuplicateCheckRequest):
             content_names=request.content_name
         )
         
-        # 중복된 것과 중복되지 않은 것 구분
+        # 중복된 것과 중복되지 않은 것 구분 (요청 순서 유지, 요청 내 같은 이름은 1회만)
         existing_set = set(existing_content_names)
-        requested_set = set(request.content_name)
+        requested_names = dict.fromkeys(request.content_name)
         
-        duplicate_content_names = list(existing_set)
-        unique_content_names = list(requested_set - existing_set)
+        duplicate_content_names = [name for name in requested_names if name in existing_set]
+        unique_content_names = [name for name in requested_names if name not in existing_set]
         
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
+        total_time = (perf_counter_ns() - start_time) / 1e6
         
-        logger.info(f"✅ 중복 검사 완료")
-        logger.info(f"   - 요청된 문서: {len(request.content_name)}개")
-        logger.info(f"   - 중복된 문서: {len(duplicate_content_names)}개")
-        logger.info(f"   - 중복되지 않은 문서: {len(unique_content_names)}개")
-        logger.info(f"   - 처리 시간: {total_time:.2f}ms")
+        # 요청당 1회 요약 로그 (인자는 INFO가 켜져 있을 때만 포맷팅)
+        logger.info(
+            "✅ check_duplicates_done account=%s bot=%s requested=%d duplicate=%d unique=%d total_ms=%.2f",
+            request.account_name, request.chat_bot_id, len(request.content_name),
+            len(duplicate_content_names), len(unique_content_names), total_time
+        )
         
-        return DuplicateCheckResponse(
+        return DuplicateCheckResponse.model_construct(
             status="success",
             total_requested=len(request.content_name),
             duplicate_count=len(duplicate_content_names),
@@ -90,7 +326,7 @@ async def check_duplicates(request: DuplicateCheckRequest):
         )
         
     except Exception as e:
-        logger.error(f"❌ 중복 검사 실패: {str(e)}")
+        logger.error("❌ 중복 검사 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to check duplicates: {str(e)}"
@@ -98,6 +334,7 @@ async def check_duplicates(request: DuplicateCheckRequest):
 
 
 @router.post("/insert", response_model=DocumentInsertResponse, status_code=status.HTTP_201_CREATED)
+@_limit_concurrent_inserts
 async def insert_document(request: DocumentInsertRequest):
     """
     문서 데이터 삽입 (개선된 Saga Pattern)
@@ -110,106 +347,94 @@ async def insert_document(request: DocumentInsertRequest):
     """
     doc_id = None
     try:
-        start_time = datetime.now()
-        collection_name = f"collection_{request.account_name}"
+        start_time = perf_counter_ns()
+        collection_name = generate_collection_name(request.account_name)
         partition_name = generate_partition_name(request.chat_bot_id)
         
-        logger.info(f"📝 문서 삽입 시작 (Saga Pattern)")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Bot ID: {request.chat_bot_id}")
-        logger.info(f"   - Title: {request.metadata.get('title', '(제목 없음)')}")
-        logger.info(f"   - Chunks: {len(request.chunks)}")
-        logger.info(f"   - Collection: {collection_name}")
-        logger.info(f"   - Partition: {partition_name}")
-        
-        # ========== Step 0: 중복 체크 ==========
-        existing_content_names = await postgres_client.get_existing_content_names(
-            account_name=request.account_name,
-            chat_bot_id=request.chat_bot_id,
-            content_names=[request.content_name]
-        )
-        
-        if existing_content_names:
-            # 중복된 문서가 존재함
-            logger.warning(f"⚠️ 중복된 문서 발견, 스킵: content_name='{request.content_name}'")
-            total_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            return DocumentInsertResponse(
-                status="skipped",
-                doc_id=None,
-                total_chunks=len(request.chunks),
-                skipped=True,
-                error_message=f"문서가 이미 존재합니다: {request.content_name}",
-                postgres_insert_time_ms=0.0,
-                embedding_time_ms=0.0,
-                milvus_insert_time_ms=0.0,
-                total_time_ms=total_time
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "📝 문서 삽입 시작 (Saga Pattern): account=%s, bot=%s, title=%s, chunks=%d, collection=%s, partition=%s",
+                request.account_name, request.chat_bot_id, _doc_title(request),
+                len(request.chunks), collection_name, partition_name
             )
         
         # ========== Step 1: 메타데이터 분리 ==========
         all_metadata = request.metadata or {}
         milvus_metadata = filter_milvus_metadata(all_metadata)  # Milvus 필터링용만 추출
         
-        logger.info(f"📊 메타데이터 분리 완료:")
-        logger.info(f"   - Milvus 필터링용: {len(milvus_metadata)}개 필드")
-        logger.info(f"   - PostgreSQL 전체: {len(all_metadata)}개 필드 (전체 저장)")
+        logger.debug("📊 메타데이터 분리 완료: Milvus %d개 필드, PostgreSQL %d개 필드", len(milvus_metadata), len(all_metadata))
         
-        # ========== Step 2: PostgreSQL 트랜잭션 (원자성 보장) ==========
-        postgres_start = datetime.now()
+        # 청크 필드를 한 번만 추출하여 PostgreSQL/임베딩/Milvus 페이로드에 재사용
+        chunk_texts = [c.text for c in request.chunks]
+        chunk_indices = [c.chunk_index for c in request.chunks]
+        pg_chunks = [
+            {"chunk_index": ci, "text": t, "content_hash": c.content_hash}
+            for ci, t, c in zip(chunk_indices, chunk_texts, request.chunks)
+        ]
         
-        doc_id = await postgres_client.insert_document_with_chunks_transaction(
-            account_name=request.account_name,
-            document_data={
-                "chat_bot_id": request.chat_bot_id,
-                "content_name": request.content_name,  # 문서 고유 식별자
-                "metadata": all_metadata  # 전체 메타데이터를 PostgreSQL에 저장
-            },
-            chunks=[{"chunk_index": c.chunk_index, "text": c.text, "content_hash": c.content_hash} for c in request.chunks]
+        # ========== Step 2: PostgreSQL 트랜잭션 + 임베딩 생성 동시 실행 ==========
+        # 임베딩은 doc_id 없이 청크 텍스트만 필요하므로 PostgreSQL 삽입과 독립적
+        pg_result, embedding_result = await asyncio.gather(
+            _timed(postgres_client.insert_document_with_chunks_transaction(
+                account_name=request.account_name,
+                document_data={
+                    "chat_bot_id": request.chat_bot_id,
+                    "content_name": request.content_name,  # 문서 고유 식별자
+                    "metadata": all_metadata  # 전체 메타데이터를 PostgreSQL에 저장
+                },
+                chunks=pg_chunks
+            )),
+            _timed(embedding_service.batch_embed_with_retry(
+                texts=chunk_texts,
+                max_retries=3,
+                backoff=2.0
+            )),
+            return_exceptions=True
         )
         
+        # PostgreSQL 실패 시 임베딩 결과는 버림
+        if isinstance(pg_result, BaseException):
+            raise pg_result
+        
+        doc_id, postgres_time = pg_result
+        
         # 중복 문서 처리: doc_id가 None이면 중복이므로 스킵
+        # 중복 체크는 UNIQUE 제약 + ON CONFLICT DO NOTHING에 맡김 (사전 조회 왕복 없음)
         if doc_id is None:
-            logger.warning(f"⚠️ 중복된 문서 발견 (PostgreSQL 반환): content_name='{request.content_name}', 스킵")
-            total_time = (datetime.now() - start_time).total_seconds() * 1000
+            logger.warning("⚠️ 중복된 문서 발견 (PostgreSQL 반환): content_name='%s', 스킵", request.content_name)
+            total_time = (perf_counter_ns() - start_time) / 1e6
             
-            return DocumentInsertResponse(
+            return DocumentInsertResponse.model_construct(
                 status="skipped",
                 doc_id=None,
                 total_chunks=len(request.chunks),
                 skipped=True,
-                error_message=f"문서가 이미 존재합니다: {request.content_name} (동시 삽입 시도)",
+                error_message=f"문서가 이미 존재합니다: {request.content_name}",
                 postgres_insert_time_ms=0.0,
                 embedding_time_ms=0.0,
                 milvus_insert_time_ms=0.0,
                 total_time_ms=total_time
             )
         
-        postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
-        logger.info(f"✅ PostgreSQL 트랜잭션 완료: doc_id={doc_id}")
+        logger.debug("✅ PostgreSQL 트랜잭션 완료: doc_id=%s", doc_id)
         
-        # ========== Step 2: 임베딩 생성 (재시도 로직) ==========
-        embedding_start = datetime.now()
-        
-        try:
-            embeddings = await embedding_service.batch_embed_with_retry(
-                texts=[chunk.text for chunk in request.chunks],
-                max_retries=3,
-                backoff=2.0
-            )
-            embedding_time = (datetime.now() - embedding_start).total_seconds() * 1000
-            logger.info(f"✅ 임베딩 생성 완료: {len(embeddings)}개 벡터")
-            
-        except Exception as embedding_error:
+        if isinstance(embedding_result, BaseException):
             # 임베딩 실패 시 PostgreSQL 롤백
-            logger.error(f"❌ 임베딩 생성 실패, PostgreSQL 롤백 시작: {str(embedding_error)}")
-            await postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id)
+            logger.error("❌ 임베딩 생성 실패, PostgreSQL 롤백 시작: %s", embedding_result)
+            _spawn_rollback(
+                postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id),
+                f"doc_id={doc_id}"
+            )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"임베딩 생성 실패: {str(embedding_error)}"
+                detail=f"임베딩 생성 실패: {str(embedding_result)}"
             )
         
+        embeddings, embedding_time = embedding_result
+        logger.debug("✅ 임베딩 생성 완료: %d개 벡터", len(embeddings))
+        
         # ========== Step 3: Milvus 벡터 저장 (재시도 로직) ==========
-        milvus_start = datetime.now()
+        milvus_start = perf_counter_ns()
         
         try:
             await milvus_client.insert_vectors_with_retry(
@@ -219,42 +444,43 @@ async def insert_document(request: DocumentInsertRequest):
                 doc_id=doc_id,
                 content_name=request.content_name,  # content_name 추가
                 chunks=[
-                    {
-                        "chunk_index": chunk.chunk_index,
-                        "embedding": embeddings[idx],
-                        "text": chunk.text
-                    }
-                    for idx, chunk in enumerate(request.chunks)
+                    {"chunk_index": ci, "embedding": embedding, "text": t}
+                    for ci, embedding, t in zip(chunk_indices, embeddings, chunk_texts)
                 ],
                 metadata=milvus_metadata,  # 필터링용 메타데이터만 Milvus에
                 max_retries=3,
                 backoff=2.0
             )
-            milvus_time = (datetime.now() - milvus_start).total_seconds() * 1000
-            logger.info(f"✅ Milvus 벡터 삽입 완료")
+            milvus_time = (perf_counter_ns() - milvus_start) / 1e6
+            logger.debug("✅ Milvus 벡터 삽입 완료")
             
         except Exception as milvus_error:
             # Milvus 실패 시 PostgreSQL 롤백 (보상 트랜잭션)
-            logger.error(f"❌ Milvus 삽입 실패, PostgreSQL 롤백 시작: {str(milvus_error)}")
-            await postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id)
+            logger.error("❌ Milvus 삽입 실패, PostgreSQL 롤백 시작: %s", milvus_error)
+            _spawn_rollback(
+                postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id),
+                f"doc_id={doc_id}"
+            )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Milvus 삽입 실패: {str(milvus_error)}"
             )
         
         # ========== Step 4: 🔥 자동 flush 마킹 (이벤트 기반) ==========
-        await auto_flusher.mark_for_flush(collection_name)
-        logger.info(f"🔥 Flush marked: {collection_name} (will flush within 0.5s)")
+        auto_flusher.mark_for_flush_nowait(collection_name)
+        logger.debug("🔥 Flush marked: %s (will flush within 0.5s)", collection_name)
         
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
+        total_time = (perf_counter_ns() - start_time) / 1e6
         
-        logger.info(f"✅ 문서 삽입 완료 (Saga Pattern 성공)")
-        logger.info(f"   - doc_id: {doc_id}")
-        logger.info(f"   - 청크 수: {len(request.chunks)}")
-        logger.info(f"   - 총 소요 시간: {total_time:.2f}ms")
-        logger.info(f"   - 검색 가능 시간: 0.5초 이내")
+        # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+        log_request_summary(
+            logger, "insert",
+            doc_id=doc_id, chunks=len(request.chunks),
+            pg_ms=round(postgres_time, 2), emb_ms=round(embedding_time, 2),
+            milvus_ms=round(milvus_time, 2), total_ms=round(total_time, 2)
+        )
         
-        return DocumentInsertResponse(
+        return DocumentInsertResponse.model_construct(
             status="success",
             doc_id=doc_id,
             total_chunks=len(request.chunks),
@@ -270,14 +496,13 @@ async def insert_document(request: DocumentInsertRequest):
     except Exception as e:
         # 예상치 못한 오류 시 PostgreSQL 롤백
         if doc_id is not None:
-            logger.error(f"❌ 예상치 못한 오류 발생, PostgreSQL 롤백 시작: {str(e)}")
-            try:
-                await postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id)
-                logger.info(f"✅ PostgreSQL 롤백 완료: doc_id={doc_id}")
-            except Exception as rollback_error:
-                logger.error(f"❌ PostgreSQL 롤백 실패: {str(rollback_error)}")
+            logger.error("❌ 예상치 못한 오류 발생, PostgreSQL 롤백 시작: %s", e)
+            _spawn_rollback(
+                postgres_client.delete_document(request.account_name, request.chat_bot_id, doc_id),
+                f"doc_id={doc_id}"
+            )
         
-        logger.error(f"❌ 문서 삽입 실패: {str(e)}")
+        logger.error("❌ 문서 삽입 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to insert document: {str(e)}"
@@ -285,6 +510,7 @@ async def insert_document(request: DocumentInsertRequest):
 
 
 @router.post("/insert/batch", response_model=BatchInsertResponse, status_code=status.HTTP_201_CREATED)
+@_limit_concurrent_inserts
 async def batch_insert_documents(request: BatchInsertRequest):
     """
     여러 문서 일괄 삽입 (개선된 Saga Pattern)
@@ -297,236 +523,260 @@ async def batch_insert_documents(request: BatchInsertRequest):
     """
     doc_ids = []
     try:
-        start_time = datetime.now()
+        start_time = perf_counter_ns()
         total_docs = len(request.documents)
-        collection_name = f"collection_{request.account_name}"
+        collection_name = generate_collection_name(request.account_name)
         
-        logger.info(f"📝 배치 삽입 시작 (Saga Pattern)")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Documents: {total_docs}개")
-        logger.info(f"   - Collection: {collection_name}")
+        # 과도한 요청은 페이로드 구성 전에 거부
+        _ensure_batch_within_limit(sum(len(doc.chunks) for doc in request.documents))
         
-        # ========== Step 0: 중복 체크 ==========
-        # 동일한 chat_bot_id를 가진 문서들만 처리 (혼합된 봇 ID 허용)
-        content_names = [doc.content_name for doc in request.documents]
+        logger.debug(
+            "📝 배치 삽입 시작 (Saga Pattern): account=%s, documents=%d, collection=%s",
+            request.account_name, total_docs, collection_name
+        )
         
-        # 같은 봇의 문서들을 그룹화
-        bot_id_map = {}
-        for i, doc in enumerate(request.documents):
-            if doc.chat_bot_id not in bot_id_map:
-                bot_id_map[doc.chat_bot_id] = []
-            bot_id_map[doc.chat_bot_id].append((i, doc))
+        # ========== Step 0: 중복 체크 ==========
+        # 혼합된 봇 ID 허용: 모든 (chat_bot_id, content_name) 쌍을 한 번의 쿼리로 확인
+        existing_pairs = await postgres_client.get_existing_pairs(
+            request.account_name,
+            [(doc.chat_bot_id, doc.content_name) for doc in request.documents]
+        )
         
-        # 각 봇별로 중복 체크
         unique_docs = []  # 중복되지 않은 문서들의 원본 인덱스와 문서 정보
-        failed_docs = []  # 중복된 문서들의 정보
-        
-        for bot_id, doc_list in bot_id_map.items():
-            bot_content_names = [doc.content_name for _, doc in doc_list]
-            existing_names = await postgres_client.get_existing_content_names(
-                account_name=request.account_name,
-                chat_bot_id=bot_id,
-                content_names=bot_content_names
-            )
-            
-            existing_set = set(existing_names)
-            for idx, doc in doc_list:
-                if doc.content_name in existing_set:
-                    # 중복된 문서
-                    failed_docs.append({
-                        "content_name": doc.content_name,
-                        "title": doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
-                        "reason": "이미 존재하는 문서"
-                    })
-                    logger.warning(f"⚠️ 중복된 문서 발견, 스킵: content_name='{doc.content_name}'")
-                else:
-                    # 중복되지 않은 문서
-                    unique_docs.append((idx, doc))
+        # 문서별 결과를 원본 요청 인덱스 위치에 기록 (응답도 입력 순서 유지)
+        results = [None] * total_docs
+        
+        for idx, doc in enumerate(request.documents):
+            if (doc.chat_bot_id, doc.content_name) in existing_pairs:
+                # 중복된 문서
+                results[idx] = _failed_result(doc, "이미 존재하는 문서")
+                logger.warning("⚠️ 중복된 문서 발견, 스킵: content_name='%s'", doc.content_name)
+            else:
+                # 중복되지 않은 문서
+                unique_docs.append((idx, doc))
         
         # 모든 문서가 중복인 경우
         if not unique_docs:
-            total_time = (datetime.now() - start_time).total_seconds() * 1000
-            logger.warning(f"⚠️ 모든 문서가 중복됨, 스킵: {total_docs}개")
+            total_time = (perf_counter_ns() - start_time) / 1e6
+            logger.warning("⚠️ 모든 문서가 중복됨, 스킵: %s개", total_docs)
             
-            from app.models.document import BatchInsertResult
-            return BatchInsertResponse(
+            return _batch_insert_response(BatchInsertResponse.model_construct(
                 status="skipped",
                 total_documents=total_docs,
                 total_chunks=sum(len(doc.chunks) for doc in request.documents),
                 success_count=0,
-                failure_count=len(failed_docs),
+                failure_count=total_docs,
                 inserted_documents=0,
                 total_vectors=0,
-                failed_content_names=[doc["content_name"] for doc in failed_docs],
-                results=[BatchInsertResult(
-                    doc_id=0,
-                    title=doc["title"],
-                    total_chunks=0,
-                    success=False,
-                    error=doc["reason"]
-                ) for doc in failed_docs],
+                failed_content_names=[doc.content_name for doc in request.documents],
+                results=results,
                 postgres_insert_time_ms=0.0,
                 embedding_time_ms=0.0,
                 milvus_insert_time_ms=0.0,
                 total_time_ms=total_time
-            )
+            ))
         
         # 중복되지 않은 문서들로만 재구성
-        logger.info(f"📋 중복 체크 완료: {len(unique_docs)}개 삽입, {len(failed_docs)}개 중복 스킵")
+        logger.debug("📋 중복 체크 완료: %d개 삽입, %d개 중복 스킵", len(unique_docs), total_docs - len(unique_docs))
         unique_doc_list = [doc for _, doc in unique_docs]
         total_chunks = sum(len(doc.chunks) for doc in unique_doc_list)
         
-        # ========== Step 1~3: 문서별 개별 처리 (부분 실패 허용) ==========
-        postgres_start = datetime.now()
-        embedding_start = datetime.now()
-        milvus_start = datetime.now()
+        # ========== Step 1~3: PostgreSQL 일괄 삽입 → 임베딩 → Milvus (부분 실패 허용) ==========
+        failed_processing_count = 0  # 처리 중 실패한 문서 수
+        
+        # ========== Step 2 (백그라운드): 문서 그룹별 임베딩 (PostgreSQL 삽입과 동시 진행) ==========
+        # 청크 수가 PIPELINE_GROUP_CHUNKS에 도달할 때마다 그룹을 나누고, 그룹별로 임베딩이 끝나는 즉시
+        # 해당 그룹의 Milvus 삽입을 시작 (임베딩 ↔ Milvus 단계 파이프라이닝)
+        # 문서별 청크 필드를 한 번만 추출하여 PostgreSQL/임베딩/Milvus 페이로드에 재사용
+        doc_texts = [[c.text for c in doc.chunks] for doc in unique_doc_list]
+        doc_chunk_indices = [[c.chunk_index for c in doc.chunks] for doc in unique_doc_list]
+        # Milvus 필터링용 메타데이터도 문서당 1회만 계산 (그룹별 Milvus 삽입에서 인덱스로 참조)
+        doc_milvus_metadata = list(filter_milvus_metadata_many(doc.metadata for doc in unique_doc_list))
+        
+        groups = []  # 그룹별 unique_doc_list 인덱스 리스트
+        group_texts = []  # 그룹별 청크 텍스트 (flatten)
+        offsets = []  # 문서별 (그룹 번호, 시작, 끝)
+        for i, texts_i in enumerate(doc_texts):
+            if not groups or len(group_texts[-1]) >= settings.PIPELINE_GROUP_CHUNKS:
+                groups.append([])
+                group_texts.append([])
+            texts = group_texts[-1]
+            start = len(texts)
+            texts.extend(texts_i)
+            groups[-1].append(i)
+            offsets.append((len(groups) - 1, start, len(texts)))
+        
+        async def _embed_group(g):
+            """그룹 임베딩 → (그룹 번호, (임베딩, ms) 또는 예외)"""
+            try:
+                return g, await _timed(embedding_service.batch_embed_with_retry(
+                    texts=group_texts[g], max_retries=3, backoff=2.0
+                ))
+            except Exception as e:
+                return g, e
         
-        successful_docs = []  # 성공한 문서들의 정보 (doc, doc_id)
-        failed_processing_docs = []  # 처리 중 실패한 문서들
+        embedding_tasks = [asyncio.create_task(_embed_group(g)) for g in range(len(groups))]
         
-        for i, doc in enumerate(unique_doc_list):
-            doc_id = None
-            try:
-                # ========== Step 1: PostgreSQL 삽입 ==========
-                all_metadata = doc.metadata or {}
-                doc_id = await postgres_client.insert_document_with_chunks_transaction(
-                    account_name=request.account_name,
-                    document_data={
+        # ========== Step 1: PostgreSQL 배치 트랜잭션 (문서/청크 각각 INSERT 1회) ==========
+        postgres_start = perf_counter_ns()
+        try:
+            pg_doc_ids = await postgres_client.batch_insert_documents_with_chunks_transaction(
+                account_name=request.account_name,
+                documents=[
+                    {
+                        "document_data": {
+                            "chat_bot_id": doc.chat_bot_id,
+                            "content_name": doc.content_name,
+                            "metadata": doc.metadata or {}
+                        },
+                        "chunks": [
+                            {"chunk_index": ci, "text": t, "content_hash": c.content_hash}
+                            for ci, t, c in zip(chunk_indices, texts, doc.chunks)
+                        ]
+                    }
+                    for doc, chunk_indices, texts in zip(unique_doc_list, doc_chunk_indices, doc_texts)
+                ]
+            )
+        except Exception:
+            for task in embedding_tasks:
+                task.cancel()
+            raise
+        postgres_time = (perf_counter_ns() - postgres_start) / 1e6
+        
+        # 동시 삽입으로 그 사이 생긴 중복(doc_id=None)은 스킵
+        inserted = []  # (unique_doc_list 인덱스, doc, doc_id)
+        for i, (doc, doc_id) in enumerate(zip(unique_doc_list, pg_doc_ids)):
+            if doc_id is None:
+                logger.warning("⚠️ 중복된 문서 발견 (PostgreSQL 반환): content_name='%s', 스킵", doc.content_name)
+                results[unique_docs[i][0]] = _failed_result(doc, "이미 존재하는 문서 (동시 삽입 시도)")
+                failed_processing_count += 1
+            else:
+                inserted.append((i, doc, doc_id))
+        
+        # ========== Step 2~3: 그룹별 임베딩 완료 순서대로 Milvus 배치 삽입 시작 ==========
+        milvus_start = perf_counter_ns()
+        embedding_time = 0.0
+        semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+        
+        # 그룹별로 삽입된 문서 (unique_doc_list 인덱스, doc, doc_id)
+        inserted_by_group = [[] for _ in groups]
+        for item in inserted:
+            inserted_by_group[offsets[item[0]][0]].append(item)
+        
+        async def _insert_group_vectors(items, group_embeddings):
+            """그룹 내 삽입된 문서들의 벡터를 Milvus 배치 삽입 1회로 저장 (파티션당 insert 1회)"""
+            async with semaphore:
+                documents_data = []
+                for i, doc, doc_id in items:
+                    _, start, end = offsets[i]
+                    documents_data.append({
                         "chat_bot_id": doc.chat_bot_id,
+                        "doc_id": doc_id,
                         "content_name": doc.content_name,
-                        "metadata": all_metadata
-                    },
-                    chunks=[{"chunk_index": c.chunk_index, "text": c.text, "content_hash": c.content_hash} for c in doc.chunks]
-                )
-                
-                # 중복 문서 처리: doc_id가 None이면 중복이므로 스킵
-                if doc_id is None:
-                    logger.warning(f"⚠️ 중복된 문서 발견 (PostgreSQL 반환): content_name='{doc.content_name}', 스킵")
-                    failed_processing_docs.append({
-                        "content_name": doc.content_name,
-                        "title": doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
-                        "reason": "이미 존재하는 문서 (동시 삽입 시도)"
-                    })
-                    continue
-                
-                # ========== Step 2: 임베딩 생성 ==========
-                embeddings = await embedding_service.batch_embed_with_retry(
-                    texts=[chunk.text for chunk in doc.chunks],
-                    max_retries=3,
-                    backoff=2.0
-                )
-                
-                # ========== Step 3: Milvus 삽입 ==========
-                partition_name = generate_partition_name(doc.chat_bot_id)
-                milvus_metadata = filter_milvus_metadata(all_metadata)
-                
-                chunks_with_embeddings = []
-                for idx, chunk in enumerate(doc.chunks):
-                    chunks_with_embeddings.append({
-                        "chunk_index": chunk.chunk_index,
-                        "embedding": embeddings[idx],
-                        "text": chunk.text
+                        "chunks": [
+                            {"chunk_index": ci, "embedding": embedding, "text": t}
+                            for ci, embedding, t in zip(doc_chunk_indices[i], group_embeddings[start:end], doc_texts[i])
+                        ],
+                        "metadata": doc_milvus_metadata[i]
                     })
-                
-                await milvus_client.insert_vectors_with_retry(
+                await milvus_client.batch_insert_vectors_with_retry(
                     account_name=request.account_name,
-                    chat_bot_id=doc.chat_bot_id,
-                    partition_name=partition_name,
-                    doc_id=doc_id,
-                    content_name=doc.content_name,
-                    chunks=chunks_with_embeddings,
-                    metadata=milvus_metadata,
+                    documents_data=documents_data,
+                    metadata={},  # 개별 문서 메타데이터가 우선됨
                     max_retries=3,
                     backoff=2.0
                 )
-                
-                # 모든 단계 성공
-                successful_docs.append((doc, doc_id))
-                logger.info(f"✅ 문서 처리 완료: content_name='{doc.content_name}', doc_id={doc_id}")
-                
-            except Exception as e:
-                # 중복 오류 예외 처리 (안전장치)
-                error_str = str(e)
-                if "duplicate key value violates unique constraint" in error_str or "unique constraint" in error_str.lower():
-                    logger.warning(f"⚠️ 중복된 문서 발견 (예외 처리): content_name='{doc.content_name}', 스킵")
-                    failed_processing_docs.append({
-                        "content_name": doc.content_name,
-                        "title": doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
-                        "reason": "이미 존재하는 문서 (동시 삽입 시도)"
-                    })
-                    continue
-                
-                # 어느 단계든 실패하면 해당 문서만 롤백
-                logger.error(f"❌ 문서 처리 실패: content_name='{doc.content_name}', 오류: {str(e)}")
-                
-                if doc_id is not None:
-                    # PostgreSQL에 삽입된 경우 롤백
-                    try:
-                        await postgres_client.delete_document(request.account_name, doc.chat_bot_id, doc_id)
-                        logger.info(f"✅ 롤백 완료: doc_id={doc_id}")
-                    except Exception as rollback_error:
-                        logger.error(f"❌ 롤백 실패: doc_id={doc_id}, 오류: {str(rollback_error)}")
-                
-                # 실패 정보 저장
-                failed_processing_docs.append({
-                    "content_name": doc.content_name,
-                    "title": doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
-                    "reason": str(e)
-                })
+        
+        failed_items = []  # (unique_doc_list 인덱스, doc, doc_id, 사유)
+        milvus_groups = []  # Milvus 삽입을 시작한 그룹의 문서 리스트
+        milvus_tasks = []
+        
+        try:
+            if not inserted:
+                for task in embedding_tasks:
+                    task.cancel()
+            else:
+                for next_group in asyncio.as_completed(embedding_tasks):
+                    g, outcome = await next_group
+                    if not inserted_by_group[g]:
+                        continue
+                    if isinstance(outcome, BaseException):
+                        # 임베딩 실패 시 해당 그룹 문서만 롤백 대상
+                        logger.error("❌ 임베딩 생성 실패 (그룹 %s): %s", g, outcome)
+                        failed_items.extend((i, doc, doc_id, str(outcome)) for i, doc, doc_id in inserted_by_group[g])
+                        continue
+                    group_embeddings, group_time = outcome
+                    embedding_time = max(embedding_time, group_time)
+                    milvus_groups.append(inserted_by_group[g])
+                    milvus_tasks.append(asyncio.create_task(_insert_group_vectors(inserted_by_group[g], group_embeddings)))
+            
+            milvus_results = await asyncio.gather(*milvus_tasks, return_exceptions=True)
+            
+            for items, result in zip(milvus_groups, milvus_results):
+                if isinstance(result, BaseException):
+                    logger.error("❌ Milvus 배치 삽입 실패: %s개 문서, 오류: %s", len(items), result)
+                    failed_items.extend((i, doc, doc_id, str(result)) for i, doc, doc_id in items)
+            
+            # 실패한 문서는 한 번에 롤백 (DELETE 1회, 응답을 기다리게 하지 않도록 백그라운드 실행)
+            failed_doc_ids = {doc_id for _, _, doc_id, _ in failed_items}
+            for i, doc, _, reason in failed_items:
+                results[unique_docs[i][0]] = _failed_result(doc, reason)
+            failed_processing_count += len(failed_items)
+            if failed_items:
+                rollback_doc_ids = [doc_id for _, _, doc_id, _ in failed_items]
+                _spawn_rollback(
+                    _rollback_documents(request.account_name, [doc for _, doc, _, _ in failed_items], rollback_doc_ids),
+                    f"doc_ids={rollback_doc_ids}"
+                )
+        except BaseException:
+            # PostgreSQL 커밋 이후 예외/취소: 진행 중인 작업을 취소하고
+            # Milvus 삽입이 확인되지 않은 문서는 모두 롤백 (PostgreSQL에 벡터 없는 문서가 남지 않도록)
+            for task in (*embedding_tasks, *milvus_tasks):
+                task.cancel()
+            confirmed_doc_ids = {
+                doc_id
+                for items, task in zip(milvus_groups, milvus_tasks)
+                if task.done() and not task.cancelled() and task.exception() is None
+                for _, _, doc_id in items
+            }
+            unconfirmed = [(doc, doc_id) for _, doc, doc_id in inserted if doc_id not in confirmed_doc_ids]
+            if unconfirmed:
+                rollback_doc_ids = [doc_id for _, doc_id in unconfirmed]
+                _spawn_rollback(
+                    _rollback_documents(request.account_name, [doc for doc, _ in unconfirmed], rollback_doc_ids),
+                    f"doc_ids={rollback_doc_ids}"
+                )
+            raise
+        
+        # 입력 순서대로 성공 문서 정리 (doc, doc_id)
+        successful_docs = [(i, doc, doc_id) for i, doc, doc_id in inserted if doc_id not in failed_doc_ids]
         
         # 성공한 문서들의 doc_id 추출
-        doc_ids = [doc_id for _, doc_id in successful_docs]
+        doc_ids = [doc_id for _, _, doc_id in successful_docs]
         
         # 시간 측정
-        postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
-        embedding_time = (datetime.now() - embedding_start).total_seconds() * 1000
-        milvus_time = (datetime.now() - milvus_start).total_seconds() * 1000
+        milvus_time = (perf_counter_ns() - milvus_start) / 1e6
         
-        logger.info(f"✅ 배치 처리 완료: 성공 {len(successful_docs)}개, 실패 {len(failed_processing_docs)}개 (처리 중)")
+        logger.debug("✅ 배치 처리 완료: 성공 %d개, 실패 %d개 (처리 중)", len(successful_docs), failed_processing_count)
         
         # ========== Step 4: 🔥 자동 flush 마킹 (이벤트 기반) ==========
-        await auto_flusher.mark_for_flush(collection_name)
-        logger.info(f"🔥 Flush marked: {collection_name}")
-        
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
+        if successful_docs:
+            auto_flusher.mark_for_flush_nowait(collection_name)
+            logger.debug("🔥 Flush marked: %s", collection_name)
         
-        # 성공 및 실패 결과 생성
-        from app.models.document import BatchInsertResult
-        results = []
+        total_time = (perf_counter_ns() - start_time) / 1e6
         
-        # 성공한 문서들 추가
-        for doc, doc_id in successful_docs:
-            results.append(BatchInsertResult(
+        # 성공 결과를 원본 인덱스 위치에 기록 (실패 결과는 실패 시점에 이미 기록됨)
+        for i, doc, doc_id in successful_docs:
+            results[unique_docs[i][0]] = BatchInsertResult.model_construct(
                 doc_id=doc_id,
-                title=doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
+                title=_doc_title(doc),
                 total_chunks=len(doc.chunks),
                 success=True,
                 error=None
-            ))
-        
-        # 중복으로 스킵된 문서들 추가
-        for failed_doc in failed_docs:
-            results.append(BatchInsertResult(
-                doc_id=0,
-                title=failed_doc["title"],
-                total_chunks=0,
-                success=False,
-                error=failed_doc["reason"]
-            ))
-        
-        # 처리 중 실패한 문서들 추가
-        for failed_doc in failed_processing_docs:
-            results.append(BatchInsertResult(
-                doc_id=0,
-                title=failed_doc["title"],
-                total_chunks=0,
-                success=False,
-                error=failed_doc["reason"]
-            ))
+            )
         
-        # 모든 실패 문서 합치기
-        all_failed_docs = failed_docs + failed_processing_docs
-        total_failed = len(all_failed_docs)
+        total_failed = total_docs - len(successful_docs)
         
         # status 결정
         if total_failed == 0:
@@ -537,16 +787,16 @@ async def batch_insert_documents(request: BatchInsertRequest):
             response_status = "partial_success"
         
         # 총 삽입된 청크 수 계산 (성공한 문서들만)
-        total_inserted_chunks = sum(len(doc.chunks) for doc, _ in successful_docs)
+        total_inserted_chunks = sum(len(doc.chunks) for _, doc, _ in successful_docs)
         
-        logger.info(f"✅ 배치 삽입 완료")
-        logger.info(f"   - 요청: {total_docs}개 문서")
-        logger.info(f"   - 성공: {len(successful_docs)}개 문서")
-        logger.info(f"   - 실패: {total_failed}개 문서 (중복: {len(failed_docs)}, 처리중: {len(failed_processing_docs)})")
-        logger.info(f"   - 총 소요 시간: {total_time:.2f}ms")
-        logger.info(f"   - 검색 가능 시간: 0.5초 이내")
+        # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+        log_request_summary(
+            logger, "batch_insert",
+            docs=total_docs, ok=len(successful_docs), fail=total_failed,
+            chunks=total_inserted_chunks, total_ms=round(total_time, 2)
+        )
         
-        return BatchInsertResponse(
+        return _batch_insert_response(BatchInsertResponse.model_construct(
             status=response_status,
             total_documents=total_docs,
             total_chunks=sum(len(doc.chunks) for doc in request.documents),  # 전체 요청 청크 수
@@ -554,21 +804,25 @@ async def batch_insert_documents(request: BatchInsertRequest):
             failure_count=total_failed,
             inserted_documents=len(successful_docs),
             total_vectors=total_inserted_chunks,  # 성공한 문서들의 청크 수
-            failed_content_names=[doc["content_name"] for doc in all_failed_docs],
+            failed_content_names=[
+                doc.content_name
+                for doc, result in zip(request.documents, results)
+                if not result.success
+            ],
             results=results,
             postgres_insert_time_ms=postgres_time,
             embedding_time_ms=embedding_time,
             milvus_insert_time_ms=milvus_time,
             total_time_ms=total_time
-        )
+        ))
         
     except HTTPException:
         # HTTPException은 그대로 재발생
         raise
     except Exception as e:
         # 예상치 못한 오류는 로그만 남기고 실패 응답 반환
-        # 문서별 처리가므로 이미 롤백 처리됨
-        logger.error(f"❌ 배치 삽입 예상치 못한 오류: {str(e)}")
+        # PostgreSQL 커밋 이후 단계의 오류는 Milvus 미확인 문서 롤백을 이미 시작한 상태
+        logger.error("❌ 배치 삽입 예상치 못한 오류: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch insert failed: {str(e)}"
@@ -576,6 +830,7 @@ async def batch_insert_documents(request: BatchInsertRequest):
 
 
 @router.post("/insert/batch/with-embeddings", response_model=BatchInsertResponse, status_code=status.HTTP_201_CREATED)
+@_limit_concurrent_inserts
 async def batch_insert_documents_with_embeddings(request: BatchInsertWithEmbeddingsRequest):
     """
     임베딩을 포함한 여러 문서 일괄 삽입 (마이그레이션용)
@@ -588,142 +843,143 @@ async def batch_insert_documents_with_embeddings(request: BatchInsertWithEmbeddi
     """
     doc_ids = []
     try:
-        start_time = datetime.now()
+        start_time = perf_counter_ns()
         total_docs = len(request.documents)
         total_chunks = sum(len(doc.chunks) for doc in request.documents)
-        collection_name = f"collection_{request.account_name}"
+        collection_name = generate_collection_name(request.account_name)
         
-        logger.info(f"📝 배치 삽입 시작 (임베딩 포함, 마이그레이션용)")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Documents: {total_docs}개")
-        logger.info(f"   - Total Chunks: {total_chunks}개")
-        logger.info(f"   - Collection: {collection_name}")
-        logger.info(f"   - 임베딩 생성: 스킵 (기존 벡터 사용)")
+        # 과도한 요청과 차원이 다른 임베딩은 페이로드 구성 전에 거부
+        _ensure_batch_within_limit(total_chunks)
+        embedding_dim = settings.EMBEDDING_DIMENSION
+        for doc in request.documents:
+            for c in doc.chunks:
+                if len(c.embedding) != embedding_dim:
+                    raise HTTPException(
+                        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        detail=f"임베딩 차원 불일치: content_name='{doc.content_name}', chunk_index={c.chunk_index}, "
+                               f"{len(c.embedding)}차원 (기대값 {embedding_dim}차원)"
+                    )
+        
+        logger.debug(
+            "📝 배치 삽입 시작 (임베딩 포함, 마이그레이션용): account=%s, documents=%d, chunks=%d, collection=%s",
+            request.account_name, total_docs, total_chunks, collection_name
+        )
         
         # ========== Step 1: PostgreSQL 배치 트랜잭션 (원자성 보장) ==========
-        postgres_start = datetime.now()
+        postgres_start = perf_counter_ns()
         
-        # 문서 데이터 준비 (메타데이터 분리)
-        documents_data = []
-        for doc in request.documents:
-            # 메타데이터 분리
-            all_metadata = doc.metadata or {}
-            
-            documents_data.append({
-                "document_data": {
-                    "chat_bot_id": doc.chat_bot_id,
-                    "content_name": doc.content_name,  # 문서 고유 식별자
-                    "metadata": all_metadata  # 전체 메타데이터를 PostgreSQL에 저장
-                },
-                "chunks": [{"chunk_index": c.chunk_index, "text": c.text, "content_hash": c.content_hash} for c in doc.chunks]
-            })
+        # 문서 데이터 준비 (대량 배치에서 이벤트 루프를 막지 않도록 스레드에서 구성)
+        documents_data, milvus_documents_data = await asyncio.to_thread(
+            _build_batch_payloads_with_embeddings, request.documents
+        )
         
         doc_ids = await postgres_client.batch_insert_documents_with_chunks_transaction(
             account_name=request.account_name,
             documents=documents_data
         )
         
-        postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
-        logger.info(f"✅ PostgreSQL 배치 트랜잭션 완료: {len(doc_ids)}개 문서")
+        postgres_time = (perf_counter_ns() - postgres_start) / 1e6
+        
+        # 이미 존재하는 문서(doc_id=None)는 Milvus 삽입 대상에서 제외
+        inserted_milvus_docs = []
+        for milvus_doc, doc_id in zip(milvus_documents_data, doc_ids):
+            if doc_id is not None:
+                milvus_doc["doc_id"] = doc_id
+                inserted_milvus_docs.append(milvus_doc)
+        inserted_count = len(inserted_milvus_docs)
+        inserted_chunks = sum(len(doc.chunks) for doc, doc_id in zip(request.documents, doc_ids) if doc_id is not None)
+        logger.debug("✅ PostgreSQL 배치 트랜잭션 완료: %d개 문서 (중복 %d개)", inserted_count, total_docs - inserted_count)
         
         # ========== Step 2: 임베딩 생성 스킵 (이미 제공됨) ==========
-        embedding_start = datetime.now()
+        embedding_start = perf_counter_ns()
         embedding_time = 0.0  # 임베딩 생성하지 않음
-        logger.info(f"⏭️ 임베딩 생성 스킵 (기존 벡터 사용): {total_chunks}개 벡터")
+        logger.debug("⏭️ 임베딩 생성 스킵 (기존 벡터 사용): %d개 벡터", total_chunks)
         
         # ========== Step 3: Milvus 배치 벡터 저장 (재시도 로직) ==========
-        milvus_start = datetime.now()
+        milvus_start = perf_counter_ns()
         
         try:
-            # 문서별 데이터 준비
-            documents_data = []
-            
-            for i, doc in enumerate(request.documents):
-                doc_id = doc_ids[i]
-                
-                # 메타데이터 분리
-                all_metadata = doc.metadata or {}
-                milvus_metadata = filter_milvus_metadata(all_metadata)  # Milvus 필터링용
-                
-                # 청크에 이미 임베딩이 포함되어 있음
-                chunks_with_embeddings = []
-                for chunk in doc.chunks:
-                    chunks_with_embeddings.append({
-                        "chunk_index": chunk.chunk_index,
-                        "embedding": chunk.embedding,  # 제공된 임베딩 사용
-                        "text": chunk.text
-                    })
-                
-                documents_data.append({
-                    "chat_bot_id": doc.chat_bot_id,
-                    "doc_id": doc_id,
-                    "content_name": doc.content_name,  # content_name 추가
-                    "chunks": chunks_with_embeddings,
-                    "metadata": milvus_metadata  # 필터링용 메타데이터만 Milvus에
-                })
-            
-            # Milvus 배치 삽입
-            await milvus_client.batch_insert_vectors_with_retry(
-                account_name=request.account_name,
-                documents_data=documents_data,
-                metadata={},  # 개별 문서 메타데이터가 우선됨
-                max_retries=3,
-                backoff=2.0
-            )
+            # Milvus 배치 삽입 (doc_id가 채워진 신규 문서만)
+            if inserted_milvus_docs:
+                await milvus_client.batch_insert_vectors_with_retry(
+                    account_name=request.account_name,
+                    documents_data=inserted_milvus_docs,
+                    metadata={},  # 개별 문서 메타데이터가 우선됨
+                    max_retries=3,
+                    backoff=2.0
+                )
             
-            milvus_time = (datetime.now() - milvus_start).total_seconds() * 1000
-            logger.info(f"✅ Milvus 배치 벡터 삽입 완료")
+            milvus_time = (perf_counter_ns() - milvus_start) / 1e6
+            logger.debug("✅ Milvus 배치 벡터 삽입 완료")
             
         except Exception as milvus_error:
             # Milvus 실패 시 PostgreSQL 롤백 (보상 트랜잭션)
-            logger.error(f"❌ Milvus 배치 삽입 실패, PostgreSQL 롤백 시작: {str(milvus_error)}")
-            for doc_id in doc_ids:
-                try:
-                    await postgres_client.delete_document(request.account_name, request.documents[0].chat_bot_id, doc_id)
-                except:
-                    pass  # 롤백 실패는 로그만 남기고 계속
+            logger.error("❌ Milvus 배치 삽입 실패, PostgreSQL 롤백 시작: %s", milvus_error)
+            _spawn_rollback(
+                _rollback_documents(request.account_name, request.documents, doc_ids),
+                f"doc_ids={doc_ids}"
+            )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Milvus 배치 삽입 실패: {str(milvus_error)}"
             )
         
         # ========== Step 4: 🔥 자동 flush 마킹 (이벤트 기반) ==========
-        await auto_flusher.mark_for_flush(collection_name)
-        logger.info(f"🔥 Flush marked: {collection_name}")
-        
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
-        
-        # 성공 결과 생성
-        results = []
-        for i, doc in enumerate(request.documents):
-            results.append({
-                "doc_id": doc_ids[i],
-                "title": doc.metadata.get('title', '(제목 없음)') if doc.metadata else '(제목 없음)',
-                "total_chunks": len(doc.chunks),
-                "success": True
-            })
-        
-        logger.info(f"✅ 배치 삽입 완료 (임베딩 포함, 마이그레이션)")
-        logger.info(f"   - 성공: {len(doc_ids)}개 문서")
-        logger.info(f"   - 총 소요 시간: {total_time:.2f}ms")
-        logger.info(f"   - 임베딩 생성 시간: 0ms (스킵됨)")
-        logger.info(f"   - 검색 가능 시간: 0.5초 이내")
-        
-        from app.models.document import BatchInsertResult
-        return BatchInsertResponse(
-            status="success",
+        if inserted_milvus_docs:
+            auto_flusher.mark_for_flush_nowait(collection_name)
+            logger.debug("🔥 Flush marked: %s", collection_name)
+        
+        total_time = (perf_counter_ns() - start_time) / 1e6
+        
+        # 결과 생성 (제목은 문서당 1회만 조회, 검증 없이 model_construct 사용)
+        results = [
+            BatchInsertResult.model_construct(
+                doc_id=doc_id,
+                title=_doc_title(doc),
+                total_chunks=len(doc.chunks),
+                success=True
+            ) if doc_id is not None else BatchInsertResult.model_construct(
+                doc_id=0,
+                title=_doc_title(doc),
+                total_chunks=0,
+                success=False,
+                error="이미 존재하는 문서"
+            )
+            for doc, doc_id in zip(request.documents, doc_ids)
+        ]
+        failed_content_names = [
+            doc.content_name for doc, doc_id in zip(request.documents, doc_ids) if doc_id is None
+        ]
+        
+        if not failed_content_names:
+            response_status = "success"
+        elif inserted_count == 0:
+            response_status = "skipped"
+        else:
+            response_status = "partial_success"
+        
+        # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+        log_request_summary(
+            logger, "batch_insert_with_embeddings",
+            docs=inserted_count, chunks=inserted_chunks,
+            pg_ms=round(postgres_time, 2), milvus_ms=round(milvus_time, 2), total_ms=round(total_time, 2)
+        )
+        
+        return _batch_insert_response(BatchInsertResponse.model_construct(
+            status=response_status,
             total_documents=total_docs,
             total_chunks=total_chunks,
-            success_count=len(doc_ids),
-            failure_count=0,
-            inserted_documents=len(doc_ids),
-            total_vectors=total_chunks,
-            results=[BatchInsertResult(**r) for r in results],
+            success_count=inserted_count,
+            failure_count=len(failed_content_names),
+            inserted_documents=inserted_count,
+            total_vectors=inserted_chunks,
+            failed_content_names=failed_content_names,
+            results=results,
             postgres_insert_time_ms=postgres_time,
             embedding_time_ms=embedding_time,  # 0ms
             milvus_insert_time_ms=milvus_time,
             total_time_ms=total_time
-        )
+        ))
         
     except HTTPException:
         # HTTPException은 그대로 재발생
@@ -731,14 +987,13 @@ async def batch_insert_documents_with_embeddings(request: BatchInsertWithEmbeddi
     except Exception as e:
         # 예상치 못한 오류 시 PostgreSQL 롤백
         if doc_ids:
-            logger.error(f"❌ 예상치 못한 오류 발생, PostgreSQL 롤백 시작: {str(e)}")
-            for doc_id in doc_ids:
-                try:
-                    await postgres_client.delete_document(request.account_name, request.documents[0].chat_bot_id, doc_id)
-                except Exception as rollback_error:
-                    logger.error(f"❌ PostgreSQL 롤백 실패 (doc_id: {doc_id}): {str(rollback_error)}")
+            logger.error("❌ 예상치 못한 오류 발생, PostgreSQL 롤백 시작: %s", e)
+            _spawn_rollback(
+                _rollback_documents(request.account_name, request.documents, doc_ids),
+                f"doc_ids={doc_ids}"
+            )
         
-        logger.error(f"❌ 배치 삽입 실패 (임베딩 포함): {str(e)}")
+        logger.error("❌ 배치 삽입 실패 (임베딩 포함): %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Batch insert with embeddings failed: {str(e)}"
@@ -757,7 +1012,7 @@ async def get_document(
     해당 계정 및 봇의 파티션에서 문서와 모든 청크 조회
     """
     try:
-        logger.info(f"문서 조회 요청 (account: {account_name}, bot: {chat_bot_id}): doc_id={doc_id}")
+        logger.info("문서 조회 요청 (account: %s, bot: %s): doc_id=%s", account_name, chat_bot_id, doc_id)
         
         # TODO: PostgreSQL에서 문서 조회 (자동으로 해당 파티션만 스캔)
         # document = await postgres_client.get_document(account_name, chat_bot_id, doc_id)
@@ -768,7 +1023,7 @@ async def get_document(
             detail="구현 예정"
         )
     except Exception as e:
-        logger.error(f"문서 조회 실패: {str(e)}")
+        logger.error("문서 조회 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve document: {str(e)}"
@@ -783,7 +1038,7 @@ async def update_document(doc_id: int, request: DocumentUpdateRequest):
     기존 문서의 모든 청크를 삭제하고 새로운 데이터로 교체
     """
     try:
-        logger.info(f"문서 업데이트 요청 (account: {request.account_name}, bot: {request.chat_bot_id}): doc_id={doc_id}")
+        logger.info("문서 업데이트 요청 (account: %s, bot: %s): doc_id=%s", request.account_name, request.chat_bot_id, doc_id)
         
         # TODO: 트랜잭션 처리
         # async with transaction():
@@ -804,23 +1059,24 @@ async def update_document(doc_id: int, request: DocumentUpdateRequest):
             detail="구현 예정"
         )
     except Exception as e:
-        logger.error(f"문서 업데이트 실패: {str(e)}")
+        logger.error("문서 업데이트 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update document: {str(e)}"
         )
 
 
-@router.post("/document/delete", response_model=DocumentDeleteResponse)
+@router.post("/document/delete", response_model=DocumentDeleteResponse, response_model_exclude_none=True)
 async def delete_document(request: DocumentDeleteRequest):
     """
     문서 삭제 (여러 content_name 기준) - Saga Pattern 적용
     
     PostgreSQL과 Milvus에서 여러 문서와 모든 청크를 일괄 삭제합니다.
     - content_name 리스트로 여러 문서 식별
-    - Milvus: content_name과 chat_bot_id로 필터링하여 모든 벡터 삭제 (먼저)
-    - PostgreSQL: 해당 파티션에서 여러 문서와 모든 청크 삭제 (나중에)
-    - PostgreSQL 실패 시 Milvus 복구 (보상 트랜잭션)
+    - Milvus: content_name과 chat_bot_id로 필터링하여 모든 벡터 삭제
+    - PostgreSQL: 해당 파티션에서 여러 문서와 모든 청크 삭제 (Milvus 삭제와 동시 실행)
+    - Milvus 삭제 실패 시 PostgreSQL에서 삭제한 행 재삽입 (보상 트랜잭션)
+    - PostgreSQL 삭제 실패 시 Milvus 스냅샷 복구(DELETE_MILVUS_SNAPSHOT) 또는 PostgreSQL 삭제 재시도
     - 자동 flush로 실시간 반영
     
     Saga Pattern 장점:
@@ -830,143 +1086,214 @@ async def delete_document(request: DocumentDeleteRequest):
     - POST 메서드로 요청 본문에 안전하게 데이터 전달
     """
     try:
-        start_time = datetime.now()
-        collection_name = f"collection_{request.account_name}"
-        
-        logger.info(f"🗑️ 문서 일괄 삭제 시작 (Saga Pattern)")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Bot ID: {request.chat_bot_id}")
-        logger.info(f"   - Content Names: {len(request.content_name)}개")
-        logger.info(f"   - Collection: {collection_name}")
+        start_time = perf_counter_ns()
+        collection_name = generate_collection_name(request.account_name)
+        n_req = len(request.content_name)
         
-        # ========== Step 0: 존재하는 문서만 필터링 ==========
-        existing_content_names = await postgres_client.get_existing_content_names(
-            request.account_name, request.chat_bot_id, request.content_name
+        logger.debug(
+            "🗑️ 문서 일괄 삭제 시작 (Saga Pattern): account=%s, bot=%s, content_names=%d, collection=%s",
+            request.account_name, request.chat_bot_id, n_req, collection_name
         )
         
-        if not existing_content_names:
-            # 존재하는 문서가 없음
-            logger.warning(f"⚠️ 존재하는 문서가 없음: {request.content_name}")
-            return DocumentDeleteResponse(
-                status="success",
-                message=f"No documents found to delete from {len(request.content_name)} requested",
-                total_requested=len(request.content_name),
-                total_success=0,
-                total_failed=len(request.content_name),
-                successful_content_names=[],
-                failed_content_names=request.content_name,
-                deleted_documents=0,
-                deleted_chunks=0,
-                deleted_vectors=0,
-                postgres_delete_time_ms=0.0,
-                milvus_delete_time_ms=0.0,
-                total_time_ms=(datetime.now() - start_time).total_seconds() * 1000
-            )
+        names_to_check = request.content_name
         
-        # 성공/실패한 문서 추적
-        successful_content_names = []
-        failed_content_names = []
-        
-        # 존재하지 않는 문서들을 실패 목록에 추가
-        if len(existing_content_names) < len(request.content_name):
-            missing_docs = set(request.content_name) - set(existing_content_names)
-            failed_content_names.extend(list(missing_docs))
-            logger.info(f"📋 존재하는 문서: {len(existing_content_names)}개 / {len(request.content_name)}개")
-            logger.info(f"   - 존재하는 문서: {existing_content_names}")
-            logger.info(f"   - 존재하지 않는 문서: {list(missing_docs)}")
-        else:
-            logger.info(f"📋 모든 문서 존재: {len(existing_content_names)}개")
-            logger.info(f"   - 존재하는 문서: {existing_content_names}")
+        async def _restore_milvus(snapshot):
+            """PostgreSQL 삭제 실패 시 Milvus 복구 (보상 트랜잭션: 삭제 전 스냅샷 재삽입)"""
+            try:
+                restored = await milvus_client.restore_vectors(collection_name, request.chat_bot_id, snapshot)
+                if restored:
+                    auto_flusher.mark_for_flush_nowait(collection_name)
+                logger.info("✅ Milvus 복구 완료: %d개 벡터", restored)
+            except Exception as recovery_error:
+                logger.error("❌ Milvus 복구 실패: %s", recovery_error)
         
-        # ========== Step 1: Milvus에서 벡터 일괄 삭제 (먼저) ==========
-        milvus_start = datetime.now()
-        deleted_vectors = 0
+        async def _restore_postgres(pg_snapshot):
+            """Milvus 삭제 실패 시 PostgreSQL 복구 (보상 트랜잭션: DELETE ... RETURNING 행 재삽입)"""
+            try:
+                await postgres_client.restore_documents(request.account_name, request.chat_bot_id, pg_snapshot)
+            except Exception as recovery_error:
+                logger.error(
+                    "❌ PostgreSQL 복구 실패 - PostgreSQL 문서만 삭제된 상태 (content_names: %s): %s",
+                    [doc["content_name"] for doc in pg_snapshot["documents"]], recovery_error
+                )
         
-        try:
-            # 존재하는 content_name과 chat_bot_id로 일괄 삭제
-            deleted_vectors = await milvus_client.delete_by_content_names(
-                collection_name, request.chat_bot_id, existing_content_names
-            )
+        async def _delete_names(names):
+            """
+            Milvus 벡터 + PostgreSQL 문서 동시 삭제 (Saga)
             
-            milvus_time = (datetime.now() - milvus_start).total_seconds() * 1000
-            logger.info(f"✅ Milvus 일괄 삭제 완료: {deleted_vectors}개 벡터, {milvus_time:.2f}ms")
+            Returns:
+                (삭제된 content_name 리스트, 문서 수, 청크 수, PostgreSQL ms, 벡터 수, Milvus ms)
             
-        except Exception as milvus_error:
-            logger.error(f"❌ Milvus 일괄 삭제 실패: {str(milvus_error)}")
-            # Milvus 삭제 실패 시 모든 존재하는 문서를 실패 목록에 추가
-            failed_content_names.extend(existing_content_names)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Milvus batch deletion failed: {str(milvus_error)}"
-            )
-        
-        # ========== Step 2: PostgreSQL에서 문서 일괄 삭제 (나중에) ==========
-        postgres_start = datetime.now()
-        
-        try:
-            deleted_docs, deleted_chunks = await postgres_client.delete_documents_by_content_names(
-                request.account_name, request.chat_bot_id, existing_content_names
-            )
-            postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
+            Note:
+                1. Milvus 삭제와 PostgreSQL 삭제(DELETE ... RETURNING, 자동 커밋)를 동시 실행
+                   → 지연 시간 max(t_milvus, t_pg), PostgreSQL 연결은 DELETE 문장 동안만 사용
+                2. Milvus 실패 → 반환된 PostgreSQL 행 재삽입 (보상)
+                3. PostgreSQL 실패 → DELETE는 문장 단위로 원자적이므로 PostgreSQL은 변경 없음
+                   - DELETE_MILVUS_SNAPSHOT=true면 삭제 전 스냅샷으로 Milvus 복구 (보상)
+                   - 스냅샷이 없으면 PostgreSQL 삭제를 1회 재시도 (삭제 완료 방향으로 복구)
+            """
+            snapshot = None
+            snapshot_ms = 0.0
+            if settings.DELETE_MILVUS_SNAPSHOT:
+                # 선택 기능: 벡터 전체 조회가 삭제 앞에 직렬로 추가됨 (상한 초과 시 None → 스냅샷 없이 진행)
+                try:
+                    snapshot, snapshot_ms = await _timed(milvus_client.snapshot_by_content_names(
+                        collection_name, request.chat_bot_id, names
+                    ))
+                except _MILVUS_ERRORS as snapshot_error:
+                    logger.error("❌ Milvus 스냅샷 조회 실패 (삭제 전이므로 변경 없음): %s", snapshot_error)
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Milvus batch deletion failed: {str(snapshot_error)}"
+                    )
             
-            logger.info(f"✅ PostgreSQL 일괄 삭제 완료: {deleted_docs}개 문서, {deleted_chunks}개 청크, {postgres_time:.2f}ms")
+            milvus_task = asyncio.create_task(_timed(milvus_client.delete_by_content_names(
+                collection_name, request.chat_bot_id, names
+            )))
+            postgres_task = asyncio.create_task(_timed(postgres_client.check_and_delete_documents(
+                request.account_name, request.chat_bot_id, names
+            )))
+            try:
+                milvus_outcome, postgres_outcome = await asyncio.gather(
+                    milvus_task, postgres_task, return_exceptions=True
+                )
+            except BaseException:
+                milvus_task.cancel()
+                postgres_task.cancel()
+                raise
             
-            # PostgreSQL 삭제 성공 시 모든 존재하는 문서를 성공 목록에 추가
-            successful_content_names.extend(existing_content_names)
+            milvus_error = milvus_outcome if isinstance(milvus_outcome, BaseException) else None
+            postgres_error = postgres_outcome if isinstance(postgres_outcome, BaseException) else None
             
-        except Exception as postgres_error:
-            # PostgreSQL 삭제 실패 시 Milvus 복구 (보상 트랜잭션)
-            logger.error(f"❌ PostgreSQL 일괄 삭제 실패, Milvus 복구 시작: {str(postgres_error)}")
-            try:
-                # TODO: Milvus 복구 로직 구현 (삭제된 벡터를 다시 삽입)
-                logger.warning(f"⚠️ Milvus 복구 로직 미구현 - 데이터 일관성 문제 가능성")
-            except Exception as recovery_error:
-                logger.error(f"❌ Milvus 복구 실패: {str(recovery_error)}")
+            if postgres_error is not None and milvus_error is None:
+                # PostgreSQL만 실패 → Milvus 벡터만 삭제된 상태
+                logger.error("❌ PostgreSQL 일괄 삭제 실패, Milvus 보상 시작: %s", postgres_error)
+                if snapshot is not None:
+                    await _restore_milvus(snapshot)
+                else:
+                    try:
+                        postgres_outcome = await _timed(postgres_client.check_and_delete_documents(
+                            request.account_name, request.chat_bot_id, names
+                        ))
+                        postgres_error = None
+                        logger.info("✅ PostgreSQL 일괄 삭제 재시도 성공")
+                    except Exception as retry_error:
+                        logger.error(
+                            "❌ PostgreSQL 삭제 재시도 실패 - Milvus 벡터만 삭제된 상태 (content_names: %s): %s",
+                            names, retry_error
+                        )
             
-            # PostgreSQL 삭제 실패 시 모든 존재하는 문서를 실패 목록에 추가
-            failed_content_names.extend(existing_content_names)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"PostgreSQL batch deletion failed: {str(postgres_error)}"
+            if milvus_error is not None:
+                if postgres_error is None:
+                    # Milvus만 실패 → PostgreSQL에서 삭제한 행 재삽입
+                    logger.error("❌ Milvus 일괄 삭제 실패, PostgreSQL 보상 시작: %s", milvus_error)
+                    await _restore_postgres(postgres_outcome[0][3])
+                if not isinstance(milvus_error, Exception):
+                    raise milvus_error
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Milvus batch deletion failed: {str(milvus_error)}"
+                )
+            if postgres_error is not None:
+                if not isinstance(postgres_error, Exception):
+                    raise postgres_error
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"PostgreSQL batch deletion failed: {str(postgres_error)}"
+                )
+            
+            (names_deleted, docs, chunks, _), pg_ms = postgres_outcome
+            vectors, delete_ms = milvus_outcome
+            mv_ms = snapshot_ms + delete_ms
+            logger.debug(
+                "✅ 일괄 삭제 완료: PostgreSQL %d개 문서, %d개 청크 (%.2fms), Milvus %d개 벡터 (%.2fms)",
+                docs, chunks, pg_ms, vectors, mv_ms
+            )
+            return names_deleted, docs, chunks, pg_ms, vectors, mv_ms
+        
+        # ========== Step 1~2: Milvus 벡터 + PostgreSQL 문서 일괄 삭제 ==========
+        (
+            successful_content_names, deleted_docs, deleted_chunks,
+            postgres_time, deleted_vectors, milvus_time
+        ) = await _delete_names(names_to_check)
+        
+        # 찾지 못한 URL 형식 content_name은 http/https만 바꿔서 한 번 더 삭제 (드문 경로)
+        deleted_set = set(successful_content_names)
+        alternatives = {}  # {대체 이름: 원래 이름}
+        for name in names_to_check:
+            if name not in deleted_set:
+                alternative = _alternate_url(name)
+                if alternative is not None and alternative not in deleted_set:
+                    alternatives.setdefault(alternative, name)
+        if alternatives:
+            alt_names, alt_docs, alt_chunks, alt_pg_ms, alt_vectors, alt_mv_ms = await _delete_names(list(alternatives))
+            for matched_name in alt_names:
+                logger.info("✅ 자동 매칭 (http/https): '%s' → '%s'", alternatives[matched_name], matched_name)
+                deleted_set.add(alternatives[matched_name])
+            successful_content_names.extend(alt_names)
+            deleted_set.update(alt_names)
+            deleted_docs += alt_docs
+            deleted_chunks += alt_chunks
+            deleted_vectors += alt_vectors
+            postgres_time += alt_pg_ms
+            milvus_time += alt_mv_ms
+        
+        # 존재하지 않았던 문서 (요청 순서 유지)
+        failed_content_names = [name for name in dict.fromkeys(request.content_name) if name not in deleted_set]
+        if failed_content_names:
+            logger.debug(
+                "📋 삭제된 문서: %d개 / %d개 (존재하지 않는 문서: %s)",
+                len(successful_content_names), n_req, failed_content_names
             )
         
         # ========== Step 3: 🔥 자동 flush 마킹 (삭제 이벤트) ==========
-        await auto_flusher.mark_for_flush(collection_name)
-        logger.info(f"🔥 Flush marked after delete: {collection_name}")
+        # Milvus에서 실제로 삭제된 벡터가 없으면 flush 불필요 (PostgreSQL에 없는 고아 벡터만 삭제된 경우 포함)
+        if deleted_vectors > 0:
+            auto_flusher.mark_for_flush_nowait(collection_name, "delete")
+            logger.debug("🔥 Flush marked after delete: %s", collection_name)
+        
+        if not successful_content_names:
+            # 존재하는 문서가 없음
+            logger.warning("⚠️ 존재하는 문서가 없음: %s", request.content_name)
+            return DocumentDeleteResponse.model_construct(
+                status="success",
+                message=f"No documents found to delete from {n_req} requested",
+                total_requested=n_req,
+                total_success=0,
+                total_failed=n_req,
+                successful_content_names=[],
+                failed_content_names=request.content_name,
+                deleted_documents=0,
+                deleted_chunks=0,
+                deleted_vectors=deleted_vectors,
+                postgres_delete_time_ms=postgres_time,
+                milvus_delete_time_ms=milvus_time,
+                total_time_ms=(perf_counter_ns() - start_time) / 1e6
+            )
         
         # ========== Step 4: 결과 반환 ==========
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
-        
-        # 응답 메시지 생성
-        if len(successful_content_names) == len(request.content_name):
-            # 모든 문서가 성공한 경우
-            status = "success"
-            message = f"All {len(request.content_name)} documents deleted successfully"
-        elif len(successful_content_names) > 0:
-            # 일부 문서만 성공한 경우
-            status = "partial_success"
-            message = f"Deleted {len(successful_content_names)} out of {len(request.content_name)} requested documents"
-        else:
-            # 모든 문서가 실패한 경우
-            status = "failed"
-            message = f"Failed to delete any of {len(request.content_name)} requested documents"
-        
-        logger.info(f"✅ 문서 일괄 삭제 완료 (Saga Pattern 성공)")
-        logger.info(f"   - 요청된 문서: {len(request.content_name)}개")
-        logger.info(f"   - 성공한 문서: {len(successful_content_names)}개")
-        logger.info(f"   - 실패한 문서: {len(failed_content_names)}개")
-        logger.info(f"   - 삭제된 문서: {deleted_docs}개")
-        logger.info(f"   - 삭제된 청크: {deleted_chunks}개")
-        logger.info(f"   - 삭제된 벡터: {deleted_vectors}개")
-        logger.info(f"   - 총 소요 시간: {total_time:.2f}ms")
-        logger.info(f"   - 검색에서 제외: 0.5초 이내")
-        
-        return DocumentDeleteResponse(
-            status=status,
+        total_time = (perf_counter_ns() - start_time) / 1e6
+        
+        # 응답 status/message 결정 (fastapi.status 모듈과 이름이 겹치지 않도록 response_status 사용)
+        n_ok = len(successful_content_names)
+        n_fail = len(failed_content_names)
+        response_status, message = _delete_status(n_ok, n_req)
+        
+        # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+        log_request_summary(
+            logger, "document_delete",
+            req=n_req, ok=n_ok, fail=n_fail,
+            docs=deleted_docs, chunks=deleted_chunks, vec=deleted_vectors,
+            pg_ms=round(postgres_time, 2), milvus_ms=round(milvus_time, 2), total_ms=round(total_time, 2)
+        )
+        
+        # 서버에서 만든 값이므로 검증 없이 model_construct 사용
+        return DocumentDeleteResponse.model_construct(
+            status=response_status,
             message=message,
-            total_requested=len(request.content_name),
-            total_success=len(successful_content_names),
-            total_failed=len(failed_content_names),
+            total_requested=n_req,
+            total_success=n_ok,
+            total_failed=n_fail,
             successful_content_names=successful_content_names,
             failed_content_names=failed_content_names,
             deleted_documents=deleted_docs,
@@ -980,116 +1307,109 @@ async def delete_document(request: DocumentDeleteRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ 문서 삭제 실패: {str(e)}")
+        logger.error("❌ 문서 삭제 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete document: {str(e)}"
         )
 
 
-@router.post("/bot/delete", response_model=BotDeleteResponse, status_code=status.HTTP_200_OK)
+@router.post("/bot/delete", response_model=BotDeleteResponse, response_model_exclude_none=True, status_code=status.HTTP_202_ACCEPTED)
 async def delete_bot_data(request: BotDeleteRequest):
     """
-    봇 전체 데이터 삭제 (chat_bot_id 기준) - Saga Pattern 적용
+    봇 전체 데이터 삭제 (chat_bot_id 기준) - 툼스톤 방식
     
-    해당 봇의 모든 문서와 청크를 PostgreSQL과 Milvus에서 삭제합니다.
-    - Milvus: 해당 파티션의 모든 벡터 삭제 (먼저)
-    - PostgreSQL: 해당 봇의 모든 문서와 청크 삭제 (나중에)
-    - PostgreSQL 실패 시 Milvus 복구 (보상 트랜잭션)
-    - 자동 flush로 실시간 반영
+    해당 봇의 모든 문서와 청크를 PostgreSQL에서 삭제하고 Milvus 벡터는 지연 삭제합니다.
+    - PostgreSQL: 문서/청크 삭제 + deleted_partitions 툼스톤 기록 (단일 트랜잭션)
+    - Milvus: partition_reaper가 툼스톤을 읽어 doc_id <= max_doc_id 벡터를 백그라운드 삭제
+    - 검색: 툼스톤이 남아 있는 동안 doc_id > max_doc_id 조건으로 삭제 대기 벡터 제외
+    - 응답: 202 Accepted + job_id (GET /bot/delete/{job_id}로 Milvus 삭제 완료 확인)
     
-    Saga Pattern 장점:
-    - 데이터 일관성 보장
-    - 부분 실패 시 자동 복구
-    - POST 메서드로 요청 본문에 안전하게 데이터 전달
+    Note:
+        삭제 직후 같은 봇에 새 문서를 삽입해도 됨
+        (doc_id는 단조 증가하므로 새 문서는 툼스톤 범위에 포함되지 않음)
+        리퍼는 툼스톤 정리 후 봇에 남은 문서가 없을 때만 빈 파티션을 삭제 (다음 삽입 시 재생성)
+        PostgreSQL 트랜잭션이 실패하면 툼스톤도 롤백되므로 별도 보상 트랜잭션 불필요
     """
     try:
-        start_time = datetime.now()
+        start_time = perf_counter_ns()
         
-        logger.info(f"🗑️ 봇 전체 삭제 시작 (Saga Pattern)")
-        logger.info(f"   - Account: {request.account_name}")
-        logger.info(f"   - Bot ID: {request.chat_bot_id}")
+        logger.debug("🗑️ 봇 전체 삭제 시작 (툼스톤): account=%s, bot=%s", request.account_name, request.chat_bot_id)
         
-        collection_name = f"collection_{request.account_name}"
         partition_name = generate_partition_name(request.chat_bot_id)
         
-        # ========== Step 1: Milvus에서 파티션 삭제 (먼저) ==========
-        milvus_start = datetime.now()
-        deleted_vectors = 0
-        
+        # ========== Step 1: PostgreSQL 봇 데이터 삭제 + 툼스톤 기록 ==========
         try:
-            # Milvus에서 해당 파티션의 모든 벡터 삭제
-            deleted_vectors = await milvus_client.delete_partition(collection_name, partition_name)
-            
-            milvus_time = (datetime.now() - milvus_start).total_seconds() * 1000
-            logger.info(f"✅ Milvus 파티션 삭제 완료: {deleted_vectors}개 벡터, {milvus_time:.2f}ms")
-            
-        except Exception as milvus_error:
-            logger.error(f"❌ Milvus 파티션 삭제 실패: {str(milvus_error)}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Milvus partition deletion failed: {str(milvus_error)}"
+            (deleted_docs, deleted_chunks, max_doc_id), postgres_time = await _timed(
+                postgres_client.delete_bot_data(request.account_name, request.chat_bot_id, partition_name)
             )
-        
-        # ========== Step 2: PostgreSQL에서 봇 데이터 삭제 (나중에) ==========
-        postgres_start = datetime.now()
-        
-        try:
-            deleted_docs, deleted_chunks = await postgres_client.delete_bot_data(request.account_name, request.chat_bot_id)
-            postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
-            logger.info(f"✅ PostgreSQL 봇 삭제 완료: {deleted_docs}개 문서, {deleted_chunks}개 청크, {postgres_time:.2f}ms")
-            
-        except Exception as postgres_error:
-            # PostgreSQL 삭제 실패 시 Milvus 복구 (보상 트랜잭션)
-            logger.error(f"❌ PostgreSQL 봇 삭제 실패, Milvus 복구 시작: {str(postgres_error)}")
-            try:
-                # TODO: Milvus 복구 로직 구현 (삭제된 파티션을 다시 생성하고 벡터 재삽입)
-                # 현재는 로그만 남기고 계속 진행
-                logger.warning(f"⚠️ Milvus 복구 로직 미구현 - 데이터 일관성 문제 가능성")
-            except Exception as recovery_error:
-                logger.error(f"❌ Milvus 복구 실패: {str(recovery_error)}")
-            
+        except _POSTGRES_ERRORS as e:
+            logger.error("❌ PostgreSQL 봇 삭제 실패: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"PostgreSQL bot deletion failed: {str(postgres_error)}"
+                detail=f"PostgreSQL bot deletion failed: {str(e)}"
             )
+        logger.debug("✅ PostgreSQL 봇 삭제 완료: %d개 문서, %d개 청크, %.2fms", deleted_docs, deleted_chunks, postgres_time)
+        
+        # ========== Step 2: Milvus 삭제 작업 접수 (리퍼가 백그라운드 처리) ==========
+        job_id = None
+        if max_doc_id is not None:
+            job_id = partition_reaper.submit(request.account_name, request.chat_bot_id, partition_name, max_doc_id)
+        
+        # ========== Step 3: 결과 반환 ==========
+        total_time = (perf_counter_ns() - start_time) / 1e6
+        
+        # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+        log_request_summary(
+            logger, "bot_delete",
+            bot=request.chat_bot_id, job=job_id,
+            docs=deleted_docs, chunks=deleted_chunks, max_doc_id=max_doc_id,
+            pg_ms=round(postgres_time, 2), total_ms=round(total_time, 2)
+        )
         
-        # ========== Step 3: 🔥 자동 flush 마킹 (삭제 이벤트) ==========
-        await auto_flusher.mark_for_flush(collection_name)
-        logger.info(f"🔥 Flush marked after bot delete: {collection_name}")
-        
-        # ========== Step 4: 결과 반환 ==========
-        total_time = (datetime.now() - start_time).total_seconds() * 1000
-        
-        logger.info(f"✅ 봇 전체 삭제 완료 (Saga Pattern 성공)")
-        logger.info(f"   - Bot ID: {request.chat_bot_id}")
-        logger.info(f"   - 삭제된 문서: {deleted_docs}개")
-        logger.info(f"   - 삭제된 청크: {deleted_chunks}개")
-        logger.info(f"   - 삭제된 벡터: {deleted_vectors}개")
-        logger.info(f"   - 총 소요 시간: {total_time:.2f}ms")
-        logger.info(f"   - 검색에서 제외: 0.5초 이내")
-        
-        return BotDeleteResponse(
-            status="success",
+        # 서버에서 만든 값이므로 검증 없이 model_construct 사용
+        # Milvus 벡터는 백그라운드에서 삭제되므로 deleted_vectors/milvus_delete_time_ms는 0
+        return BotDeleteResponse.model_construct(
+            status="accepted" if job_id else "success",
+            job_id=job_id,
             chat_bot_id=request.chat_bot_id,
             deleted_documents=deleted_docs,
             deleted_chunks=deleted_chunks,
-            deleted_vectors=deleted_vectors,
+            deleted_vectors=0,
             postgres_delete_time_ms=postgres_time,
-            milvus_delete_time_ms=milvus_time,
+            milvus_delete_time_ms=0.0,
             total_time_ms=total_time
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ 봇 전체 삭제 실패: {str(e)}")
+        logger.error("❌ 봇 전체 삭제 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete bot data: {str(e)}"
         )
 
 
+@router.get("/bot/delete/{job_id}", response_model=BotDeleteJobStatusResponse)
+async def get_bot_delete_job(job_id: str):
+    """
+    봇 삭제 작업(Milvus 벡터 삭제) 상태 조회
+    
+    Note:
+        작업 상태는 삭제 요청을 처리한 삽입 서버 프로세스의 메모리에만 있음
+    """
+    job = partition_reaper.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Bot delete job not found: {job_id}"
+        )
+    return BotDeleteJobStatusResponse.model_construct(**{
+        key: job[key] for key in BotDeleteJobStatusResponse.model_fields
+    })
+
+
 @router.patch("/document/{doc_id}/metadata", response_model=MetadataUpdateResponse)
 async def update_metadata(doc_id: int, request: MetadataUpdateRequest):
     """
@@ -1098,7 +1418,7 @@ async def update_metadata(doc_id: int, request: MetadataUpdateRequest):
     PostgreSQL만 수정하고 Milvus는 건드리지 않음 (초고속)
     """
     try:
-        logger.info(f"메타데이터 업데이트 요청 (account: {request.account_name}, bot: {request.chat_bot_id}): doc_id={doc_id}")
+        logger.info("메타데이터 업데이트 요청 (account: %s, bot: %s): doc_id=%s", request.account_name, request.chat_bot_id, doc_id)
         
         # TODO: PostgreSQL UPDATE만 실행 (해당 파티션에서만)
         # await postgres_client.update_metadata(request.account_name, request.chat_bot_id, doc_id, request.metadata_updates)
@@ -1108,7 +1428,7 @@ async def update_metadata(doc_id: int, request: MetadataUpdateRequest):
             detail="구현 예정"
         )
     except Exception as e:
-        logger.error(f"메타데이터 업데이트 실패: {str(e)}")
+        logger.error("메타데이터 업데이트 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update metadata: {str(e)}"
@@ -1,23 +1,101 @@
 """
 검색 API
 """
+import asyncio
+import orjson
+from pymilvus import MilvusException
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from app.models.search import SearchRequest, SearchResponse
-from app.utils.logger import setup_logger
+from app.utils.logger import setup_logger, log_request_summary
+from app.utils.naming import generate_partition_name, generate_collection_name
 from app.core.partition_manager import partition_manager
-from app.core.embedding import embedding_service
-from app.core.milvus_client import milvus_client
+from app.core.embedding_cache import embedding_cache
+from app.core.milvus_client import get_collection, has_text_preview
 from app.core.postgres_client import postgres_client
-from pymilvus import Collection
-from datetime import datetime
+from app.core.partition_reaper import partition_reaper
+from app.schemas.milvus_schema import CHUNK_TEXT_PREVIEW_FIELD
+from time import perf_counter
 
 logger = setup_logger(__name__)
-router = APIRouter()
+# 검색 응답(청크 텍스트 + 메타데이터)을 orjson으로 직렬화 (C 구현, bytes 직접 생성)
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# HNSW 검색 ef (limit은 ef 이하로 제한)
+EF_VALUE = 128
 
-def generate_partition_name(chat_bot_id: str) -> str:
-    """chat_bot_id로 파티션명 자동 생성"""
-    return f"bot_{chat_bot_id.replace('-', '')}"
+# 요청마다 변하지 않는 Milvus 검색 인자 (모듈 로드 시 1회 생성, 요청에서는 수정하지 않음)
+_SEARCH_PARAMS = {
+    "metric_type": "COSINE",
+    "params": {"ef": EF_VALUE}
+}
+_SEARCH_BASE_KWARGS = {
+    "anns_field": "embedding_dense",
+    "param": _SEARCH_PARAMS,
+    "output_fields": ["doc_id", "chunk_index"]  # metadata 제거
+}
+# 미리보기 검색용 출력 필드 (결과를 Milvus에서 바로 구성, PostgreSQL 조회 생략)
+_PREVIEW_OUTPUT_FIELDS = ["doc_id", "chunk_index", "content_name", "metadata", CHUNK_TEXT_PREVIEW_FIELD]
+
+
+def _search_sync(collection_name: str, search_kwargs: dict, with_preview: bool = False):
+    """
+    Milvus 벡터 검색 (스레드에서 실행)
+    
+    Args:
+        collection_name: 컬렉션명
+        search_kwargs: Collection.search 인자
+        with_preview: True면 미리보기 필드가 있는 컬렉션에서 결과 구성용 필드까지 함께 조회
+    
+    Returns:
+        (검색 결과, 미리보기 필드 조회 여부)
+    
+    Note:
+        Collection 핸들은 캐시에서 재사용 (최초 1회만 스키마 조회 RPC)
+        리퍼가 빈 파티션을 삭제한 직후라 파티션이 없으면 빈 결과 반환
+    """
+    use_preview = with_preview and has_text_preview(collection_name)
+    if use_preview:
+        search_kwargs = {**search_kwargs, "output_fields": _PREVIEW_OUTPUT_FIELDS}
+    collection = get_collection(collection_name)
+    try:
+        return collection.search(**search_kwargs), use_preview
+    except MilvusException:
+        if any(collection.has_partition(name) for name in search_kwargs["partition_names"]):
+            raise
+        return [], use_preview
+
+
+def _build_preview_results(hits) -> list:
+    """
+    Milvus 출력 필드만으로 검색 결과 구성 (return_full_text=False)
+    
+    Note:
+        chunk_text는 미리보기, document의 title/metadata는 Milvus 메타데이터 기준
+        (title은 MILVUS_METADATA_FIELDS와 무관하게 삽입 시 항상 Milvus 메타데이터에 저장)
+        같은 문서의 여러 청크 히트는 document 딕셔너리를 공유
+    """
+    documents = {}
+    results = [None] * len(hits)
+    for i, hit in enumerate(hits):
+        entity = hit.entity
+        doc_id = entity.get("doc_id")
+        document = documents.get(doc_id)
+        if document is None:
+            metadata = entity.get("metadata") or {}
+            document = documents[doc_id] = {
+                "title": metadata.get("title", "(제목 없음)"),
+                "content_name": entity.get("content_name") or "",
+                "metadata": metadata
+            }
+        results[i] = {
+            "doc_id": doc_id,
+            "chunk_index": entity.get("chunk_index"),
+            "score": float(hit.score),
+            "chunk_text": entity.get(CHUNK_TEXT_PREVIEW_FIELD) or "",
+            "document": document
+        }
+    return results
 
 
 @router.post("/query", response_model=SearchResponse)
@@ -25,100 +103,112 @@ async def search_documents(request: SearchRequest):
     """
     유사도 검색 (벡터 검색)
     
-    1. 파티션 로드 (검색을 위해 메모리에 올림)
-    2. 쿼리 텍스트를 임베딩 처리
-    3. Milvus에서 벡터 검색 → doc_id 리스트 획득
-    4. 계정별 PostgreSQL에서 메타데이터 조회
-    5. 결과 통합하여 반환
+    1. 파티션 로드 확인 + 쿼리 텍스트 임베딩 (동시 실행)
+    2. Milvus에서 벡터 검색 → doc_id 리스트 획득
+    3. 계정별 PostgreSQL에서 메타데이터 조회
+    4. 결과 통합하여 반환
     """
     try:
-        collection_name = f"collection_{request.account_name}"
+        collection_name = generate_collection_name(request.account_name)
         partition_name = generate_partition_name(request.chat_bot_id)
         
-        logger.info(f"검색 요청 (account: {request.account_name}, bot: {request.chat_bot_id}): '{request.query_text}', limit={request.limit}")
-        
-        # ========== Step 0: 파티션 접근 시간 업데이트 ==========
-        # 컬렉션은 시작 시 전체 로드되어 있으므로 로드 체크 불필요
-        await partition_manager.ensure_partition_loaded(
-            collection_name=collection_name,
-            partition_name=partition_name
-        )
+        logger.debug("검색 요청 (account: %s, bot: %s): '%s', limit=%s", request.account_name, request.chat_bot_id, request.query_text, request.limit)
         
-        # ========== Step 0.5: 쿼리 검증 ==========
-        # 빈 문자열 또는 공백만 있는 경우 에러
+        # ========== Step 0: 쿼리 검증 ==========
+        # 빈 문자열 또는 공백만 있는 경우 에러 (파티션/임베딩 작업 전에 거부)
         if not request.query_text or not request.query_text.strip():
-            logger.warning(f"빈 검색 쿼리 요청: '{request.query_text}'")
+            logger.warning("빈 검색 쿼리 요청: '%s'", request.query_text)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Query text is empty or contains only whitespace"
             )
         
-        # ========== Step 1: 쿼리 임베딩 생성 ==========
-        embedding_start = datetime.now()
+        # ========== Step 1: 파티션 접근 시간 업데이트 + 쿼리 임베딩 생성 (동시 실행) ==========
+        # 컬렉션은 시작 시 전체 로드되어 있으므로 로드 체크 불필요
+        # 파티션 확인과 임베딩은 서로 독립적이므로 RTT를 겹쳐서 대기
+        embedding_start = perf_counter()
         
-        try:
-            query_vector = await embedding_service.embed(request.query_text.strip())
-            embedding_time = (datetime.now() - embedding_start).total_seconds() * 1000
-            logger.info(f"쿼리 임베딩 완료: {embedding_time:.2f}ms")
-        except Exception as embedding_error:
-            logger.error(f"쿼리 임베딩 실패: {str(embedding_error)}")
+        async def _embed_query():
+            """쿼리 임베딩 → (벡터, ms)"""
+            vector = await embedding_cache.get_or_compute(request.query_text)
+            return vector, (perf_counter() - embedding_start) * 1000
+        
+        partition_result, embedding_result = await asyncio.gather(
+            partition_manager.ensure_partition_loaded(
+                collection_name=collection_name,
+                partition_name=partition_name
+            ),
+            _embed_query(),
+            return_exceptions=True
+        )
+        
+        if isinstance(partition_result, BaseException):
+            raise partition_result
+        
+        if isinstance(embedding_result, BaseException):
+            logger.error("쿼리 임베딩 실패: %s", embedding_result)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Query embedding failed: {str(embedding_error)}"
+                detail=f"Query embedding failed: {str(embedding_result)}"
             )
         
+        query_vector, embedding_time = embedding_result
+        logger.debug("쿼리 임베딩 완료: %.2fms", embedding_time)
+        
         # ========== Step 2: Milvus 벡터 검색 ==========
-        search_start = datetime.now()
+        search_start = perf_counter()
         
         try:
-            collection = Collection(name=collection_name)
-            
-            # ⚠️ ef=64 고정이므로 limit이 64보다 크면 64로 제한
-            EF_VALUE = 128
+            # ⚠️ ef 고정이므로 limit이 ef보다 크면 ef로 제한
             effective_limit = min(request.limit, EF_VALUE)
             if request.limit > EF_VALUE:
-                logger.warning(f"⚠️ Requested limit ({request.limit}) exceeds ef ({EF_VALUE}), limiting to {EF_VALUE}")
-            
-            # 검색 파라미터
-            search_params = {
-                "metric_type": "COSINE",
-                "params": {"ef": EF_VALUE}
-            }
+                logger.warning("⚠️ Requested limit (%s) exceeds ef (%s), limiting to %s", request.limit, EF_VALUE, EF_VALUE)
             
             # 필터 표현식 구성
             # ⚠️ partition_names로 이미 해당 파티션만 검색하므로 chat_bot_id 필터는 불필요
             # 사용자 정의 필터만 expr로 전달
             expr = request.filter_expr if request.filter_expr else None
             
+            # 봇 삭제 후 리퍼가 아직 정리하지 않은 벡터 제외 (툼스톤)
+            max_deleted_doc_id = await partition_reaper.get_max_deleted_doc_id(request.account_name, partition_name)
+            if max_deleted_doc_id is not None:
+                tombstone_expr = f"doc_id > {max_deleted_doc_id}"
+                expr = f"({expr}) and {tombstone_expr}" if expr else tombstone_expr
+            
             if expr:
-                logger.info(f"Milvus 검색 시작: partition={partition_name}, expr='{expr}', limit={effective_limit}")
+                logger.debug("Milvus 검색 시작: partition=%s, expr='%s', limit=%s", partition_name, expr, effective_limit)
             else:
-                logger.info(f"Milvus 검색 시작: partition={partition_name} (no filter), limit={effective_limit}")
+                logger.debug("Milvus 검색 시작: partition=%s (no filter), limit=%s", partition_name, effective_limit)
             
             # 벡터 검색 실행
             # partition_names로 파티션 지정 (10~100배 빠름!)
             search_kwargs = {
+                **_SEARCH_BASE_KWARGS,
                 "data": [query_vector],
-                "anns_field": "embedding_dense",
-                "param": search_params,
                 "limit": effective_limit,  # ⭐ 제한된 limit 사용
-                "partition_names": [partition_name],  # ⭐ 파티션 지정으로 이미 chat_bot_id 필터링됨
-                "output_fields": ["doc_id", "chunk_index"]  # metadata 제거
+                "partition_names": [partition_name]  # ⭐ 파티션 지정으로 이미 chat_bot_id 필터링됨
             }
             
             # expr은 사용자 정의 필터가 있을 때만 추가
             if expr:
                 search_kwargs["expr"] = expr
             
-            search_results = collection.search(**search_kwargs)
+            # pymilvus 검색은 동기 RPC이므로 스레드에서 실행 (이벤트 루프 블로킹 방지)
+            search_results, used_preview = await asyncio.to_thread(
+                _search_sync, collection_name, search_kwargs, not request.return_full_text
+            )
             
-            search_time = (datetime.now() - search_start).total_seconds() * 1000
-            logger.info(f"Milvus 검색 완료: {search_time:.2f}ms")
+            search_time = (perf_counter() - search_start) * 1000
+            logger.debug("Milvus 검색 완료: %.2fms", search_time)
             
             # 검색 결과 처리
             if not search_results or not search_results[0]:
-                logger.info("검색 결과 없음")
-                total_time = (datetime.now() - embedding_start).total_seconds() * 1000
+                total_time = (perf_counter() - embedding_start) * 1000
+                log_request_summary(
+                    logger, "search",
+                    hits=0, results=0,
+                    embed_ms=round(embedding_time, 2), search_ms=round(search_time, 2), total_ms=round(total_time, 2)
+                )
                 return SearchResponse(
                     status="success",
                     partition_load_time_ms=0.0,  # 컬렉션은 이미 로드되어 있음
@@ -130,49 +220,66 @@ async def search_documents(request: SearchRequest):
             
             # 결과 파싱
             hits = search_results[0]
-            doc_ids = []
-            scores = []
-            chunk_indices = []
             
-            for hit in hits:
-                scores.append(hit.score)
-                # entity에서 필드 추출 (딕셔너리 스타일)
-                doc_ids.append(hit.entity.get("doc_id"))
-                chunk_indices.append(hit.entity.get("chunk_index"))
+            if used_preview:
+                # 미리보기 응답은 PostgreSQL 조회 없이 바로 반환
+                results = _build_preview_results(hits)
+                total_time = (perf_counter() - embedding_start) * 1000
+                log_request_summary(
+                    logger, "search",
+                    hits=len(hits), results=len(results), preview=True,
+                    embed_ms=round(embedding_time, 2), search_ms=round(search_time, 2), total_ms=round(total_time, 2)
+                )
+                return SearchResponse(
+                    status="success",
+                    partition_load_time_ms=0.0,  # 컬렉션은 이미 로드되어 있음
+                    vector_search_time_ms=search_time + embedding_time,
+                    postgres_query_time_ms=0.0,
+                    total_time_ms=total_time,
+                    results=results
+                )
             
-            logger.info(f"검색 결과: {len(hits)}개 벡터, {len(set(doc_ids))}개 문서")
+            n_hits = len(hits)
+            # 결과 리스트를 미리 할당해 append 재할당 없이 채움
+            doc_ids = [None] * n_hits
+            scores = [0.0] * n_hits
+            chunk_indices = [None] * n_hits
+            
+            for i, hit in enumerate(hits):
+                scores[i] = hit.score
+                # entity는 접근할 때마다 객체를 만들므로 히트당 1회만 조회 (딕셔너리 스타일)
+                entity = hit.entity
+                doc_ids[i] = entity.get("doc_id")
+                chunk_indices[i] = entity.get("chunk_index")
+            
+            logger.debug("검색 결과: %d개 벡터", len(hits))
             
         except Exception as search_error:
-            logger.error(f"Milvus 검색 실패: {str(search_error)}")
+            logger.error("Milvus 검색 실패: %s", search_error)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Vector search failed: {str(search_error)}"
             )
         
         # ========== Step 3: PostgreSQL 메타데이터 조회 ==========
-        postgres_start = datetime.now()
+        postgres_start = perf_counter()
         
         try:
-            # 고유한 doc_id만 조회
-            unique_doc_ids = list(set(doc_ids))
-            unique_chunk_indices = list(set(chunk_indices))
-            logger.info(f"PostgreSQL 문서 조회 시작: {len(unique_doc_ids)}개 doc_id, {len(unique_chunk_indices)}개 chunk_index")
+            # 고유한 doc_id만 조회 (순서 유지, 1회 순회)
+            unique_doc_ids = list(dict.fromkeys(doc_ids))
+            # 검색에 걸린 (doc_id, chunk_index) 쌍만 조회 (doc_id × chunk_index 조합 과다 조회 방지)
+            chunk_pairs = list(dict.fromkeys(zip(doc_ids, chunk_indices)))
+            logger.debug("PostgreSQL 문서 조회 시작: %s개 doc_id, %s개 청크", len(unique_doc_ids), len(chunk_pairs))
             
             documents = await postgres_client.get_documents_with_chunks_by_ids(
                 account_name=request.account_name,
                 chat_bot_id=request.chat_bot_id,
                 doc_ids=unique_doc_ids,
-                chunk_indices=unique_chunk_indices
+                chunk_pairs=chunk_pairs
             )
             
-            postgres_time = (datetime.now() - postgres_start).total_seconds() * 1000
-            logger.info(f"PostgreSQL 메타데이터 조회 완료: {postgres_time:.2f}ms, {len(documents)}개 문서 발견")
-            
-            # PostgreSQL에서 찾지 못한 doc_id 로깅
-            found_doc_ids = {doc["doc_id"] for doc in documents}
-            missing_doc_ids = set(unique_doc_ids) - found_doc_ids
-            if missing_doc_ids:
-                logger.warning(f"⚠️ PostgreSQL에서 문서를 찾지 못한 doc_id: {missing_doc_ids} (Milvus에는 있지만 PostgreSQL에는 없음 - 데이터 불일치 가능성)")
+            postgres_time = (perf_counter() - postgres_start) * 1000
+            logger.debug("PostgreSQL 메타데이터 조회 완료: %.2fms, %s개 문서 발견", postgres_time, len(documents))
             
             # 디버깅: documents 구조 확인
             #logger.info(f"PostgreSQL 결과 타입: {type(documents)}, 개수: {len(documents) if documents else 0}")
@@ -184,7 +291,7 @@ async def search_documents(request: SearchRequest):
             #        logger.info(f"첫 번째 문서 내용: {str(documents[0])[:100]}...")
             
         except Exception as postgres_error:
-            logger.error(f"PostgreSQL 조회 실패: {str(postgres_error)}")
+            logger.error("PostgreSQL 조회 실패: %s", postgres_error)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Metadata retrieval failed: {str(postgres_error)}"
@@ -192,56 +299,59 @@ async def search_documents(request: SearchRequest):
         
         # ========== Step 4: 결과 통합 ==========
         try:
-            # 문서 메타데이터를 딕셔너리로 변환 (documents는 딕셔너리 리스트)
-            doc_metadata = {doc["doc_id"]: doc for doc in documents}
+            # 문서별 정보는 문서당 1회만 구성 (같은 문서의 여러 청크 히트가 공유)
+            # metadata가 문자열(JSONB 텍스트)인 경우 여기서 한 번만 파싱
+            doc_metadata = {}
+            for doc in documents:
+                metadata = doc.get("metadata") or {}
+                if isinstance(metadata, str):
+                    try:
+                        metadata = orjson.loads(metadata)
+                    except orjson.JSONDecodeError:
+                        metadata = {}
+                doc_metadata[doc["doc_id"]] = (
+                    {
+                        "title": metadata.get("title", "(제목 없음)"),
+                        "content_name": doc.get("content_name", ""),
+                        "metadata": metadata
+                    },
+                    doc.get("chunks", {})
+                )
             
-            # 검색 결과 구성 (PostgreSQL에 존재하는 문서만 포함)
-            results = []
-            skipped_count = 0  # PostgreSQL에 없는 문서 수
+            # PostgreSQL에서 찾지 못한 doc_id 로깅 (doc_metadata 키로 확인, 누락이 있을 때만 계산)
+            if len(doc_metadata) < len(unique_doc_ids):
+                missing_doc_ids = [doc_id for doc_id in unique_doc_ids if doc_id not in doc_metadata]
+                logger.warning("⚠️ PostgreSQL에서 문서를 찾지 못한 doc_id: %s (Milvus에는 있지만 PostgreSQL에는 없음 - 데이터 불일치 가능성)", missing_doc_ids)
             
-            for i, (doc_id, score, chunk_index) in enumerate(zip(doc_ids, scores, chunk_indices)):
-                doc_info = doc_metadata.get(doc_id)
-                
-                if doc_info:
-                    # metadata가 문자열인 경우 JSON 파싱
-                    metadata = doc_info.get("metadata", {})
-                    if isinstance(metadata, str):
-                        try:
-                            import json
-                            metadata = json.loads(metadata)
-                        except:
-                            metadata = {}
-                    
-                    # 청크 텍스트 추출 (document_chunks 테이블에서 직접 가져오기)
-                    chunks = doc_info.get("chunks", {})
-                    chunk_data = chunks.get(chunk_index, {})
-                    chunk_text = chunk_data.get("chunk_text", "")
-                    
-                    results.append({
-                        "doc_id": doc_id,
-                        "chunk_index": chunk_index,
-                        "score": float(score),
-                        "chunk_text": chunk_text,
-                        "document": {
-                            "title": metadata.get("title", "(제목 없음)"),
-                            "content_name": doc_info.get("content_name", ""),
-                            "metadata": metadata
-                        }
-                    })
-                else:
-                    # PostgreSQL에 문서가 없는 경우 제외
-                    skipped_count += 1
-                    logger.debug(f"PostgreSQL에서 문서를 찾지 못함: doc_id={doc_id}, chunk_index={chunk_index} (검색 결과에서 제외)")
+            # 검색 결과 구성 (PostgreSQL에 존재하는 문서만 포함, 청크 텍스트는 document_chunks에서 조회한 값)
+            results = [
+                {
+                    "doc_id": doc_id,
+                    "chunk_index": chunk_index,
+                    "score": float(score),
+                    "chunk_text": doc_info[1].get(chunk_index, {}).get("chunk_text", ""),
+                    "document": doc_info[0]
+                }
+                for doc_id, score, chunk_index in zip(doc_ids, scores, chunk_indices)
+                if (doc_info := doc_metadata.get(doc_id)) is not None
+            ]
+            # PostgreSQL에 문서가 없어 제외된 히트 수
+            skipped_count = len(doc_ids) - len(results)
             
             if skipped_count > 0:
-                logger.warning(f"⚠️ 검색 결과에서 {skipped_count}개 문서 제외됨 (PostgreSQL에 존재하지 않음 - Milvus와 데이터 불일치)")
+                logger.warning("⚠️ 검색 결과에서 %s개 문서 제외됨 (PostgreSQL에 존재하지 않음 - Milvus와 데이터 불일치)", skipped_count)
             
             # 시간 계산
-            total_time = (datetime.now() - embedding_start).total_seconds() * 1000
+            total_time = (perf_counter() - embedding_start) * 1000
             vector_search_time = search_time + embedding_time
             
-            logger.info(f"검색 완료: {len(results)}개 결과 반환 (Milvus에서 {len(hits)}개 발견, PostgreSQL에서 {len(documents)}개 존재, {skipped_count}개 제외)")
-            logger.info(f"⏱️  시간 측정 - 벡터 검색: {vector_search_time:.2f}ms, PostgreSQL: {postgres_time:.2f}ms, 총: {total_time:.2f}ms")
+            # 요청당 1회 요약 로그 (단계별 로그는 DEBUG)
+            log_request_summary(
+                logger, "search",
+                hits=len(hits), docs=len(documents), results=len(results), skipped=skipped_count,
+                embed_ms=round(embedding_time, 2), search_ms=round(search_time, 2),
+                pg_ms=round(postgres_time, 2), total_ms=round(total_time, 2)
+            )
             
             return SearchResponse(
                 status="success",
@@ -253,13 +363,13 @@ async def search_documents(request: SearchRequest):
             )
             
         except Exception as merge_error:
-            logger.error(f"❌ 결과 통합 실패: {str(merge_error)}")
+            logger.error("❌ 결과 통합 실패: %s", merge_error)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Result merging failed: {str(merge_error)}"
             )
     except Exception as e:
-        logger.error(f"검색 실패: {str(e)}")
+        logger.error("검색 실패: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Search failed: {str(e)}"
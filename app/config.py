@@ -2,10 +2,15 @@
 애플리케이션 설정 관리
 환경변수 로드 및 전역 설정
 """
+import re
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from typing import Optional
 
+# 계정명/봇 ID 검증 정규식 (요청마다 재컴파일하지 않도록 모듈 로드 시 1회 컴파일)
+_ACCOUNT_NAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+_BOT_ID_RE = re.compile(r'^[a-z0-9]+$')
+
 
 class Settings(BaseSettings):
     """애플리케이션 설정"""
@@ -48,19 +53,36 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     
     # 성능 설정
-    MAX_BATCH_SIZE: int = 100  # 임베딩 배치 처리 최대 크기
+    MAX_BATCH_SIZE: int = 100  # 임베딩 배치 처리 최대 크기 (마이크로 배치 단위)
+    EMBEDDING_MAX_PARALLEL: int = 16  # 임베딩 마이크로 배치 동시 요청 개수
+    EMBEDDING_HTTP2: bool = True  # 임베딩 API를 HTTP/2로 호출 (동시 요청을 적은 연결에 다중화, h2 패키지 필요)
+    EMBEDDING_CACHE_SIZE: int = 10000  # 검색어 임베딩 캐시 최대 항목 수
+    EMBEDDING_CACHE_TTL_SECONDS: int = 3600  # 검색어 임베딩 캐시 유효 시간 (초)
+    MAX_CHUNKS_PER_BATCH: int = 50000  # 배치 삽입 요청당 최대 청크 수 (초과 시 413)
+    MAX_CONCURRENT_INSERTS: int = 32  # 계정별 동시 삽입 요청 수 (초과 요청은 대기)
+    BATCH_CONCURRENCY: int = 8  # 배치 삽입 시 동시에 처리하는 문서 수
+    PIPELINE_GROUP_CHUNKS: int = 500  # 배치 삽입 파이프라인의 임베딩 그룹 크기 (청크 수, 그룹별로 Milvus 삽입 시작)
+    FLUSH_QUIESCE_MS: int = 500  # 마지막 삽입/삭제 후 이 시간 동안 변경이 없으면 일괄 flush (ms)
+    STREAM_RESPONSE_MIN_RESULTS: int = 500  # 배치 삽입 결과가 이 개수를 넘으면 응답을 스트리밍으로 전송
+    STREAM_RESPONSE_CHUNK_SIZE: int = 1000  # 스트리밍 응답에서 한 번에 직렬화하는 결과 수
+    DELETE_MILVUS_SNAPSHOT: bool = False  # 문서 삭제 전 Milvus 벡터 스냅샷 조회 (선택, PostgreSQL 삭제 실패 시 Milvus 복구용 - 삭제 앞에 직렬 조회 추가, 1536차원 기준 벡터당 약 6KB / 끄면 PostgreSQL 삭제 재시도로 복구)
+    DELETE_SNAPSHOT_MAX_VECTORS: int = 16384  # 문서 삭제 시 보상용 스냅샷 최대 벡터 수 (Milvus 쿼리 결과 상한, 초과 시 보상 생략)
+    CHUNK_TEXT_PREVIEW_CHARS: int = 256  # Milvus에 함께 저장하는 청크 텍스트 미리보기 길이 (문자 수, 검색 시 PostgreSQL 조회 생략용)
     
     # Milvus 메타데이터 필터링 필드 설정
     MILVUS_METADATA_FIELDS: list = [
         "content_type", "source_type", "language", "tags", "category", "source_url","created_at","updated_at"
     ]
     CONNECTION_POOL_SIZE: int = 10  # PostgreSQL 연결 풀 크기
+    CONNECTION_POOL_MIN_SIZE: int = 5  # PostgreSQL 연결 풀 최소 유지 연결 수 (연결 수립 지연 제거)
+    MAX_CONCURRENT_PARTITION_CREATES: int = 8  # 봇 일괄 등록 시 Milvus 파티션 동시 생성 개수
     
     # 파티션 메모리 관리 설정
     PARTITION_TTL_MINUTES: int = 30  # 파티션 자동 언로드 시간 (분)
     MEMORY_THRESHOLD_PERCENT: float = 80.0  # 메모리 임계값 (%)
     MAX_CONCURRENT_LOADS: int = 10  # 최대 동시 로드 개수
     CLEANUP_INTERVAL_SECONDS: int = 300  # 자동 정리 주기 (초, 5분)
+    PARTITION_REAP_INTERVAL_SECONDS: int = 10  # 삭제된 봇 벡터 정리 주기 (초)
     
     # 환경 변수 값 정제
     @field_validator('EMBEDDING_MODEL', mode='before')
@@ -85,9 +107,8 @@ class Settings(BaseSettings):
         Returns:
             Milvus 컬렉션명 (예: collection_chatty, collection_enterprise)
         """
-        import re
         # 입력 검증: 영문, 숫자, 언더스코어만 허용
-        if not re.match(r'^[a-zA-Z0-9_]+$', account_name):
+        if not _ACCOUNT_NAME_RE.match(account_name):
             raise ValueError(f"Invalid account_name: {account_name}")
         
         return f"{self.MILVUS_COLLECTION_PREFIX}{account_name}"
@@ -102,8 +123,7 @@ class Settings(BaseSettings):
         Returns:
             PostgreSQL DB명 (예: rag_db_chatty, rag_db_enterprise)
         """
-        import re
-        if not re.match(r'^[a-zA-Z0-9_]+$', account_name):
+        if not _ACCOUNT_NAME_RE.match(account_name):
             raise ValueError(f"Invalid account_name: {account_name}")
         
         return f"{self.POSTGRES_DB_PREFIX}{account_name}"
@@ -123,13 +143,11 @@ class Settings(BaseSettings):
             - 접두사 'bot_'를 추가하여 숫자 시작 방지
         """
         # UUID 검증 및 정규화 (하이픈 제거, 소문자 변환)
-        import re
-        
         # 하이픈 제거
         sanitized_id = bot_id.replace("-", "").replace("_", "").lower()
         
         # 영문, 숫자만 허용 (보안)
-        if not re.match(r'^[a-z0-9]+$', sanitized_id):
+        if not _BOT_ID_RE.match(sanitized_id):
             raise ValueError(f"Invalid bot_id: {bot_id}. Must be UUID format.")
         
         # 길이 제한 (PostgreSQL은 63자까지, bot_ + 32자 UUID = 36자)
@@ -3,13 +3,16 @@
 - 데이터 삽입/삭제 시에만 flush 실행
 - 지연 flush로 API 응답 속도 향상
 - 배치 처리로 리소스 효율성 극대화
+- 삽입/삭제 변경을 한 quiesce 구간에 모아 1회 flush (삽입 컬렉션 우선)
 """
 
 import asyncio
 import logging
 from typing import Set, Dict
-from pymilvus import Collection
-from datetime import datetime, timedelta
+from pymilvus import Collection, utility
+from datetime import datetime
+from time import monotonic, perf_counter
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +31,48 @@ class AutoFlusher:
         self.delay_seconds = delay_seconds
         self.max_wait_seconds = max_wait_seconds
         self.collections_to_flush: Set[str] = set()
-        self.last_change_time: Dict[str, datetime] = {}  # 마지막 데이터 변경 시간
-        self.last_flush_time: Dict[str, datetime] = {}   # 마지막 flush 시간
+        self.pending_ops: Dict[str, Set[str]] = {}  # 컬렉션별 대기 중인 변경 종류 (insert/delete)
+        self.last_change_time: Dict[str, float] = {}  # 마지막 데이터 변경 시간 (monotonic)
+        self.last_flush_time: Dict[str, datetime] = {}   # 마지막 flush 시간 (상태 조회용)
+        self._last_flush_monotonic: Dict[str, float] = {}  # 마지막 flush 시간 (max_wait 계산용)
         self._running = False
         self._flush_lock = asyncio.Lock()
+        self._dirty = asyncio.Event()  # 대기 중인 변경이 생기면 set (워커 기상 신호)
         
-    async def mark_for_flush(self, collection_name: str):
+    async def mark_for_flush(self, collection_name: str, op_type: str = "insert"):
         """
         데이터 변경 시 flush 마킹 (삽입/삭제 후 호출)
         
         Args:
             collection_name: flush할 컬렉션명
+            op_type: 변경 종류 ("insert" 또는 "delete")
         """
-        async with self._flush_lock:
-            self.collections_to_flush.add(collection_name)
-            self.last_change_time[collection_name] = datetime.now()
-            logger.info(f"📌 Marked for flush: {collection_name}")
+        self.mark_for_flush_nowait(collection_name, op_type)
+        logger.debug("📌 Marked for flush: %s (%s)", collection_name, op_type)
+    
+    def mark_for_flush_nowait(self, collection_name: str, op_type: str = "insert"):
+        """
+        데이터 변경 시 flush 마킹 (await 없이 즉시 반환)
+        
+        Args:
+            collection_name: flush할 컬렉션명
+            op_type: 변경 종류 ("insert" 또는 "delete")
+        
+        Note:
+            이벤트 루프 스레드에서만 호출 (set/dict 갱신 사이에 await가 없어 락 불필요)
+            삽입/삭제 API 응답 경로에서 await 한 단계를 줄이기 위해 사용
+        """
+        self.collections_to_flush.add(collection_name)
+        self.pending_ops.setdefault(collection_name, set()).add(op_type)
+        self.last_change_time[collection_name] = monotonic()
+        self._dirty.set()
     
     async def start(self):
         """
         자동 flush 백그라운드 태스크 시작
         - 데이터 변경이 있을 때만 flush
         - delay_seconds 이내 추가 변경을 배치 처리
+        - 대기 중인 변경이 없으면 이벤트를 기다리며 잠듦 (주기적 폴링 없음)
         """
         if self._running:
             logger.warning("⚠️ Auto-flusher is already running")
@@ -61,12 +84,16 @@ class AutoFlusher:
         
         while self._running:
             try:
-                # 데이터 변경이 있는지 확인
-                if self.collections_to_flush:
-                    await self._check_and_flush()
+                # 대기 중인 변경이 없으면 다음 마킹까지 대기
+                if not self.collections_to_flush:
+                    self._dirty.clear()
+                    await self._dirty.wait()
+                    continue
                 
-                # 짧은 주기로 체크 (리소스 부담 최소화)
-                await asyncio.sleep(0.1)
+                # flush 조건을 확인하고, 조건이 될 때까지 남은 시간만큼만 대기
+                wait_seconds = await self._check_and_flush()
+                if wait_seconds > 0:
+                    await asyncio.sleep(wait_seconds)
                 
             except asyncio.CancelledError:
                 logger.info("🛑 Auto-flusher cancelled")
@@ -75,58 +102,108 @@ class AutoFlusher:
                 logger.error(f"❌ Auto-flush error: {e}")
                 await asyncio.sleep(1)
     
-    async def _check_and_flush(self):
+    async def _check_and_flush(self) -> float:
         """
         flush 조건 체크 및 실행
-        - 조건 1: 마지막 변경 후 delay_seconds 경과
-        - 조건 2: 마지막 flush 후 max_wait_seconds 경과
+        - 조건 1: 모든 변경이 멈춘 뒤 delay_seconds 경과 (quiesce)
+        - 조건 2: 어느 컬렉션이든 마지막 flush 후 max_wait_seconds 경과
+        - 조건 충족 시 구간 내 변경된 모든 컬렉션을 한 번에 flush
+          (삽입 직후 삭제가 이어져도 flush는 1회)
+        
+        Returns:
+            다음 확인까지 대기할 시간 (초)
         """
         async with self._flush_lock:
-            current_time = datetime.now()
-            collections_to_process = []
+            pending = list(self.collections_to_flush)
+            if not pending:
+                return 0.0
             
-            for coll_name in list(self.collections_to_flush):
-                last_change = self.last_change_time.get(coll_name, current_time)
-                last_flush = self.last_flush_time.get(coll_name, datetime.min)
-                
-                # 조건 1: 마지막 변경 후 delay_seconds 경과
-                time_since_change = (current_time - last_change).total_seconds()
-                
-                # 조건 2: 마지막 flush 후 max_wait_seconds 경과
-                time_since_flush = (current_time - last_flush).total_seconds()
-                
-                should_flush = (
-                    time_since_change >= self.delay_seconds or
-                    time_since_flush >= self.max_wait_seconds
-                )
-                
-                if should_flush:
-                    collections_to_process.append(coll_name)
+            # 경과 시간은 monotonic 시계로 계산 (시스템 시간 변경 영향 없음)
+            current_time = monotonic()
+            last_change = max(self.last_change_time.get(name, current_time) for name in pending)
+            oldest_flush = min(self._last_flush_monotonic.get(name, float("-inf")) for name in pending)
+            
+            until_quiet = self.delay_seconds - (current_time - last_change)
+            until_max_wait = self.max_wait_seconds - (current_time - oldest_flush)
+            
+            if until_quiet > 0 and until_max_wait > 0:
+                return min(until_quiet, until_max_wait)
             
-            # flush 실행
-            if collections_to_process:
-                await self._flush_collections(collections_to_process)
+            # 삽입이 있는 컬렉션을 먼저 flush (인덱스 빌드가 새 데이터를 먼저 보도록)
+            pending.sort(key=lambda name: "insert" not in self.pending_ops.get(name, ()))
+            await self._flush_collections(pending)
+            
+            # flush 실패 등으로 남은 컬렉션은 delay_seconds 후 재시도
+            return self.delay_seconds if self.collections_to_flush else 0.0
     
     async def _flush_collections(self, collection_names: list[str]):
-        """지정된 컬렉션들 flush"""
-        for coll_name in collection_names:
+        """
+        지정된 컬렉션들 flush
+        - 컬렉션이 1개면 해당 컬렉션만 flush
+        - 여러 개면 flush_all 1회로 모두 flush (실패 시 컬렉션별 flush로 대체)
+        - pymilvus flush는 동기 호출이므로 스레드에서 실행 (이벤트 루프 비차단)
+        """
+        # flush 도중 들어온 변경은 마킹을 유지하기 위해 시작 시점의 변경 시간 기록
+        change_snapshot = {name: self.last_change_time.get(name) for name in collection_names}
+        
+        results = None
+        if len(collection_names) > 1:
             try:
-                start_time = datetime.now()
-                
-                logger.info(f"🔥 Auto-Flushing: {coll_name}...")
-                
-                collection = Collection(name=coll_name)
-                collection.flush()
-                
-                elapsed = (datetime.now() - start_time).total_seconds()
-                logger.info(f"✅ Flush 완료: {coll_name} ({elapsed:.2f}초)")
-                self.last_flush_time[coll_name] = datetime.now()
-                
-                # 마킹 제거
-                self.collections_to_flush.discard(coll_name)
-                
+                elapsed = await asyncio.to_thread(self._flush_all)
+                results = [elapsed] * len(collection_names)
             except Exception as e:
-                logger.error(f"❌ Failed to flush {coll_name}: {e}")
+                logger.warning(f"⚠️ flush_all 실패, 컬렉션별 flush로 재시도: {e}")
+        
+        if results is None:
+            # 삽입 컬렉션이 앞에 있으므로 먼저 스레드에 제출됨
+            results = await asyncio.gather(
+                *[asyncio.to_thread(self._flush_one, coll_name) for coll_name in collection_names],
+                return_exceptions=True
+            )
+        
+        # flush 완료 시각은 라운드당 1회만 생성
+        flushed_at = datetime.now()
+        flushed_at_monotonic = monotonic()
+        
+        for coll_name, result in zip(collection_names, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ Failed to flush {coll_name}: {result}")
+                continue
+            
+            logger.info(f"✅ Flush 완료: {coll_name} ({result:.2f}초)")
+            self.last_flush_time[coll_name] = flushed_at
+            self._last_flush_monotonic[coll_name] = flushed_at_monotonic
+            
+            # 마킹 제거 (flush 이후 추가 변경이 없을 때만)
+            if self.last_change_time.get(coll_name) == change_snapshot[coll_name]:
+                self.collections_to_flush.discard(coll_name)
+                self.pending_ops.pop(coll_name, None)
+    
+    @staticmethod
+    def _flush_all() -> float:
+        """
+        전체 컬렉션 flush (스레드에서 실행)
+        
+        Returns:
+            소요 시간 (초)
+        """
+        start_time = perf_counter()
+        logger.info("🔥 Auto-Flushing all collections...")
+        utility.flush_all()
+        return perf_counter() - start_time
+    
+    @staticmethod
+    def _flush_one(collection_name: str) -> float:
+        """
+        단일 컬렉션 flush (스레드에서 실행)
+        
+        Returns:
+            소요 시간 (초)
+        """
+        start_time = perf_counter()
+        logger.info(f"🔥 Auto-Flushing: {collection_name}...")
+        Collection(name=collection_name).flush()
+        return perf_counter() - start_time
     
     async def flush_immediately(self, collection_name: str):
         """
@@ -138,17 +215,19 @@ class AutoFlusher:
         """
         try:
             logger.info(f"🔥 Immediate flush requested: {collection_name}")
-            start_time = datetime.now()
+            start_time = perf_counter()
             
             collection = Collection(name=collection_name)
             collection.flush()
             
-            elapsed = (datetime.now() - start_time).total_seconds()
+            elapsed = perf_counter() - start_time
             self.last_flush_time[collection_name] = datetime.now()
+            self._last_flush_monotonic[collection_name] = monotonic()
             
             # 마킹 제거
             async with self._flush_lock:
                 self.collections_to_flush.discard(collection_name)
+                self.pending_ops.pop(collection_name, None)
             
             logger.info(f"✅ Immediate flush completed in {elapsed:.3f}s")
             
@@ -159,6 +238,7 @@ class AutoFlusher:
     async def stop(self):
         """자동 flush 중지"""
         self._running = False
+        self._dirty.set()
         
         # 남아있는 flush 실행
         if self.collections_to_flush:
@@ -183,6 +263,7 @@ class AutoFlusher:
             "max_wait_seconds": self.max_wait_seconds,
             "pending_flush_count": len(self.collections_to_flush),
             "pending_collections": list(self.collections_to_flush),
+            "pending_ops": {coll: sorted(ops) for coll, ops in self.pending_ops.items()},
             "last_flush_times": {
                 coll: time.isoformat() 
                 for coll, time in self.last_flush_time.items()
@@ -191,6 +272,6 @@ class AutoFlusher:
 
 
 # 전역 인스턴스
-auto_flusher = AutoFlusher(delay_seconds=0.5, max_wait_seconds=5)
+auto_flusher = AutoFlusher(delay_seconds=settings.FLUSH_QUIESCE_MS / 1000, max_wait_seconds=5)
 
 
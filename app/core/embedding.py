@@ -2,7 +2,12 @@
 임베딩 처리 서비스
 텍스트를 벡터로 변환
 """
+import asyncio
+import base64
+import importlib.util
 from typing import List
+import httpx
+import numpy as np
 from openai import AsyncOpenAI
 from app.config import settings
 from app.utils.logger import setup_logger
@@ -19,11 +24,42 @@ class EmbeddingService:
         if self.model_type == "openai":
             if not settings.OPENAI_API_KEY:
                 raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다.")
-            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=self._create_http_client())
             self.model_name = "text-embedding-ada-002"
         
+        # 마이크로 배치 동시 요청 수 제한 (프로세스 전체 공유)
+        self._semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_PARALLEL)
+        
         logger.info(f"임베딩 서비스 초기화: {self.model_type}")
     
+    @staticmethod
+    def _create_http_client() -> httpx.AsyncClient:
+        """
+        임베딩 API용 HTTP 클라이언트 생성
+        
+        Returns:
+            httpx.AsyncClient (가능하면 HTTP/2)
+        
+        Note:
+            HTTP/2면 EMBEDDING_MAX_PARALLEL개 마이크로 배치가 소수의 연결에 다중화되어
+            동시 요청마다 TCP/TLS 연결을 새로 맺지 않음
+            h2 패키지가 없으면 HTTP/1.1 keep-alive 연결 풀로 동작
+        """
+        http2 = settings.EMBEDDING_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("⚠️ h2 패키지가 없어 임베딩 API를 HTTP/1.1로 호출합니다 (pip install 'httpx[http2]')")
+            http2 = False
+        
+        return httpx.AsyncClient(
+            http2=http2,
+            # OpenAI SDK 기본값과 동일한 타임아웃
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=max(100, settings.EMBEDDING_MAX_PARALLEL),
+                max_keepalive_connections=max(50, settings.EMBEDDING_MAX_PARALLEL)
+            )
+        )
+    
     async def embed(self, text: str) -> List[float]:
         """
         단일 텍스트 임베딩
@@ -36,11 +72,11 @@ class EmbeddingService:
         """
         if self.model_type == "openai":
             result = await self._embed_openai([text])
-            return result[0]
+            return result[0].tolist()
         else:
             raise NotImplementedError(f"모델 '{self.model_type}'는 아직 구현되지 않았습니다.")
     
-    async def batch_embed(self, texts: List[str]) -> List[List[float]]:
+    async def batch_embed(self, texts: List[str]) -> np.ndarray:
         """
         배치 임베딩 처리
         
@@ -48,10 +84,26 @@ class EmbeddingService:
             texts: 임베딩할 텍스트 리스트
         
         Returns:
-            임베딩 벡터 리스트
+            임베딩 벡터 배열 (shape: (N, D), float32, 입력 순서 유지)
+        
+        Note:
+            중복 텍스트는 한 번만 임베딩한 뒤 원래 위치로 재배치
+            빈 입력은 API 호출 없이 (0, D) 배열 반환
         """
+        if not texts:
+            return np.empty((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        
         if self.model_type == "openai":
-            return await self._embed_openai(texts)
+            # 순서를 유지한 중복 제거 (dict는 삽입 순서 유지)
+            unique_index = {}
+            index_map = [unique_index.setdefault(t, len(unique_index)) for t in texts]
+            
+            if len(unique_index) == len(texts):
+                return await self._embed_openai(texts)
+            
+            unique_embeddings = await self._embed_openai(list(unique_index))
+            logger.debug("임베딩 중복 제거: %d개 → %d개", len(texts), len(unique_index))
+            return unique_embeddings[index_map]
         else:
             raise NotImplementedError(f"모델 '{self.model_type}'는 아직 구현되지 않았습니다.")
     
@@ -60,7 +112,7 @@ class EmbeddingService:
         texts: List[str], 
         max_retries: int = 3, 
         backoff: float = 2.0
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
         """
         재시도 로직이 포함된 배치 임베딩 처리
         
@@ -70,7 +122,7 @@ class EmbeddingService:
             backoff: 재시도 간격 (초)
         
         Returns:
-            임베딩 벡터 리스트
+            임베딩 벡터 배열 (shape: (N, D), float32)
         """
         import asyncio
         
@@ -86,7 +138,7 @@ class EmbeddingService:
                     logger.warning(f"⚠️ 임베딩 생성 실패 (시도 {attempt + 1}/{max_retries + 1}), {wait_time}초 후 재시도: {str(e)}")
                     await asyncio.sleep(wait_time)
     
-    async def _embed_openai(self, texts: List[str]) -> List[List[float]]:
+    async def _embed_openai(self, texts: List[str]) -> np.ndarray:
         """
         OpenAI 임베딩 API 호출
         
@@ -94,21 +146,31 @@ class EmbeddingService:
             texts: 텍스트 리스트
         
         Returns:
-            임베딩 벡터 리스트
+            임베딩 벡터 배열 (shape: (N, D), float32, 입력 순서 유지)
+        
+        Note:
+            MAX_BATCH_SIZE를 넘으면 길이순으로 정렬해 마이크로 배치로 나누고
+            EMBEDDING_MAX_PARALLEL 개수까지 동시에 요청한 뒤 원래 순서로 복원
         """
         try:
-            # 배치 크기 제한
             batch_size = settings.MAX_BATCH_SIZE
-            all_embeddings = []
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                response = await self.client.embeddings.create(
-                    input=batch,
-                    model=self.model_name
-                )
-                embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(embeddings)
+            if len(texts) <= batch_size:
+                all_embeddings = await self._request_openai(texts)
+            else:
+                # 비슷한 길이끼리 묶어 배치별 처리 시간 편차를 줄임
+                order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+                micro_batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+                
+                batch_results = await asyncio.gather(*[
+                    self._request_openai([texts[i] for i in micro_batch])
+                    for micro_batch in micro_batches
+                ])
+                
+                # 원래 순서로 재배치 (행 단위 일괄 대입)
+                all_embeddings = np.empty((len(texts), batch_results[0].shape[1]), dtype=np.float32)
+                for micro_batch, embeddings in zip(micro_batches, batch_results):
+                    all_embeddings[micro_batch] = embeddings
             
             logger.info(f"임베딩 처리 완료: {len(texts)}개 텍스트")
             return all_embeddings
@@ -116,6 +178,31 @@ class EmbeddingService:
         except Exception as e:
             logger.error(f"임베딩 처리 실패: {str(e)}")
             raise
+    
+    async def _request_openai(self, batch: List[str]) -> np.ndarray:
+        """
+        OpenAI 임베딩 API 단일 요청 (동시 요청 수 제한)
+        
+        Args:
+            batch: 텍스트 리스트 (MAX_BATCH_SIZE 이하)
+        
+        Returns:
+            임베딩 벡터 배열 (shape: (len(batch), D), float32)
+        
+        Note:
+            base64 인코딩으로 받아 float32 바이트를 그대로 배열로 변환
+            (JSON float 파싱 및 float 객체 생성 없음)
+        """
+        async with self._semaphore:
+            response = await self.client.embeddings.create(
+                input=batch,
+                model=self.model_name,
+                encoding_format="base64"
+            )
+        return np.stack([
+            np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)
+            for item in response.data
+        ])
 
 
 # 전역 임베딩 서비스 인스턴스
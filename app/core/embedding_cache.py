@@ -0,0 +1,115 @@
+"""
+쿼리 임베딩 캐시
+- 같은 검색어는 임베딩 API를 다시 호출하지 않고 캐시된 벡터 재사용
+- 크기 제한 LRU + TTL (OrderedDict 기반, 외부 의존성 없음)
+- 동시에 들어온 같은 검색어는 임베딩 요청 1회로 합침 (request coalescing)
+"""
+
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, List, Tuple
+from app.config import settings
+from app.core.embedding import embedding_service
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class EmbeddingCache:
+    """검색어 임베딩 LRU/TTL 캐시"""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Args:
+            maxsize: 최대 캐시 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            ttl_seconds: 항목 유효 시간 (초)
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        # {(모델명, 정규화된 텍스트): (만료 시각, 벡터)}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        # 임베딩 요청 진행 중인 키 {key: Future}
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        캐시 키용 텍스트 정규화 (앞뒤 공백 제거 + 연속 공백을 하나로)
+
+        Note:
+            대소문자는 임베딩 결과에 영향을 주므로 그대로 유지
+        """
+        return " ".join(text.split())
+
+    async def get_or_compute(self, text: str) -> List[float]:
+        """
+        검색어 임베딩 조회 (캐시에 없으면 임베딩 후 저장)
+
+        Args:
+            text: 검색어
+
+        Returns:
+            임베딩 벡터 (호출자가 수정하지 않아야 함)
+        """
+        normalized = self.normalize(text)
+        key = (getattr(embedding_service, "model_name", embedding_service.model_type), normalized)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, vector = entry
+            if expires_at > monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            del self._entries[key]
+
+        # 같은 검색어 임베딩이 이미 진행 중이면 그 결과를 기다림
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            vector = await embedding_service.embed(normalized)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 예외 미확인 경고가 나지 않도록 확인 처리
+            future.exception()
+            raise
+        else:
+            future.set_result(vector)
+            self._entries[key] = (monotonic() + self.ttl_seconds, vector)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return vector
+        finally:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """캐시 통계 조회"""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def clear(self):
+        """캐시 비우기"""
+        self._entries.clear()
+
+
+# 전역 인스턴스
+embedding_cache = EmbeddingCache(
+    maxsize=settings.EMBEDDING_CACHE_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS
+)
@@ -2,14 +2,68 @@
 Milvus 클라이언트
 벡터 저장소 연결 및 CRUD 작업
 """
+import asyncio
 from typing import List, Optional, Dict, Any
-from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType
+from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, MilvusException
 from app.config import settings
 from app.utils.logger import setup_logger
-from app.schemas.milvus_schema import create_collection_schema, get_index_params, get_search_params
+from app.utils.exceptions import CollectionAlreadyExistsError
+from app.utils.naming import generate_partition_name
+from app.schemas.milvus_schema import (
+    create_collection_schema, get_index_params, get_search_params,
+    CHUNK_TEXT_PREVIEW_FIELD, make_chunk_text_preview
+)
 
 logger = setup_logger(__name__)
 
+# 컬렉션 핸들 캐시 {collection_name: Collection}
+# Collection(name=...) 생성 시마다 스키마 조회 RPC가 발생하므로 핸들을 재사용
+_collections: Dict[str, Collection] = {}
+
+
+def get_collection(collection_name: str) -> Collection:
+    """
+    캐시된 Collection 핸들 반환 (없으면 생성 후 캐시)
+    
+    Note:
+        스레드에서 동시에 호출되어도 중복 생성만 될 뿐 안전 (dict 대입은 원자적)
+    """
+    collection = _collections.get(collection_name)
+    if collection is None:
+        collection = _collections[collection_name] = Collection(name=collection_name)
+    return collection
+
+
+# 컬렉션별 청크 텍스트 미리보기 필드 존재 여부 캐시 {collection_name: bool}
+_text_preview_support: Dict[str, bool] = {}
+
+
+def has_text_preview(collection_name: str) -> bool:
+    """
+    컬렉션에 chunk_text_preview 필드가 있는지 확인 (결과 캐시)
+    
+    Note:
+        필드 추가 이전에 생성된 컬렉션에는 없으므로 삽입/검색 전에 확인
+        캐시에 없으면 get_collection을 거치므로 스레드에서 호출
+    """
+    supported = _text_preview_support.get(collection_name)
+    if supported is None:
+        fields = get_collection(collection_name).schema.fields
+        supported = _text_preview_support[collection_name] = any(
+            field.name == CHUNK_TEXT_PREVIEW_FIELD for field in fields
+        )
+    return supported
+
+
+def _make_previews(chunks: List[Dict[str, Any]]) -> List[str]:
+    """청크 리스트의 텍스트 미리보기 컬럼 생성"""
+    max_chars = settings.CHUNK_TEXT_PREVIEW_CHARS
+    return [make_chunk_text_preview(chunk.get("text") or "", max_chars) for chunk in chunks]
+
+
+# 문서 삭제 보상용 스냅샷 필드 (insert 컬럼 순서와 동일, id는 auto_id이므로 제외)
+_SNAPSHOT_FIELDS = ["doc_id", "chat_bot_id", "content_name", "chunk_index", "embedding_dense", "metadata"]
+
 
 class MilvusClient:
     """Milvus 벡터 데이터베이스 클라이언트"""
@@ -51,7 +105,7 @@ class MilvusClient:
             dimension: 벡터 차원
         
         Raises:
-            Exception: 컬렉션이 이미 존재하는 경우 "already exists" 포함된 예외 발생
+            CollectionAlreadyExistsError: 컬렉션이 이미 존재하는 경우
         
         Note:
             계정당 1개 컬렉션 (collection_chatty, collection_enterprise)
@@ -63,7 +117,7 @@ class MilvusClient:
             # 이미 존재하는지 확인
             from pymilvus import utility
             if utility.has_collection(collection_name):
-                raise Exception(f"Collection '{collection_name}' already exists")
+                raise CollectionAlreadyExistsError(f"Collection '{collection_name}' already exists")
             
             # 스키마 파일에서 올바른 스키마 가져오기
             schema = create_collection_schema(
@@ -72,6 +126,9 @@ class MilvusClient:
             )
             
             collection = Collection(name=collection_name, schema=schema)
+            # 같은 이름으로 재생성된 경우 이전 스키마의 핸들을 쓰지 않도록 교체
+            _collections[collection_name] = collection
+            _text_preview_support.pop(collection_name, None)
             
             # 인덱스 생성
             # chat_bot_id 스칼라 인덱스 (파티션 필터링용)
@@ -109,6 +166,8 @@ class MilvusClient:
             
             return collection
             
+        except CollectionAlreadyExistsError:
+            raise
         except Exception as e:
             logger.error(f"❌ 컬렉션 생성 실패: {str(e)}")
             raise
@@ -157,6 +216,7 @@ class MilvusClient:
             partition_name: 파티션 이름 (예: bot_550e8400...)
             doc_id: 문서 ID
             chunks: 청크 데이터 (embedding, chunk_index, text 포함)
+                    embedding은 List[float] 또는 float32 np.ndarray 행 (pymilvus가 그대로 처리)
             metadata: 필터링용 메타데이터 (content_type, tags 등)
         
         Returns:
@@ -167,6 +227,10 @@ class MilvusClient:
             삽입 전에 파티션이 로드되어 있는지 확인하고 필요 시 로드합니다.
         """
         try:
+            # 삽입할 청크가 없으면 파티션 로드/insert 호출 없이 종료
+            if not chunks:
+                return []
+            
             collection_name = settings.get_collection_name(account_name)
             
             # 파티션 생성 확인 (컬렉션은 이미 전체 로드되어 있음)
@@ -176,8 +240,6 @@ class MilvusClient:
                 partition_name=partition_name
             )
             
-            collection = Collection(name=collection_name)
-            
             # 메타데이터 기본값
             if metadata is None:
                 metadata = {}
@@ -203,14 +265,13 @@ class MilvusClient:
                         sparse_embeddings.append([])  # 기본값 NULL
                 entities.append(sparse_embeddings)
             
-            # 벡터 삽입
-            insert_result = collection.insert(
-                entities, 
-                partition_name=partition_name
+            # 벡터 삽입 (pymilvus insert는 동기 RPC이므로 스레드에서 실행)
+            primary_keys = await asyncio.to_thread(
+                self._insert_entities_sync, collection_name, partition_name, entities, _make_previews(chunks)
             )
             
             logger.info(f"✅ Milvus 벡터 삽입 완료: collection={collection_name}, partition={partition_name}, vectors={len(chunks)}")
-            return insert_result.primary_keys
+            return primary_keys
             
         except Exception as e:
             logger.error(f"❌ Milvus 벡터 삽입 실패: {str(e)}")
@@ -285,71 +346,108 @@ class MilvusClient:
         
         Note:
             삽입 전에 필요한 파티션들이 로드되어 있는지 확인하고 필요 시 로드합니다.
+            같은 파티션(봇)의 문서는 엔티티를 합쳐 파티션당 insert 1회로 저장하며,
+            파티션별 insert는 스레드에서 동시에 실행합니다.
         """
+        if not documents_data:
+            return []
+        
         try:
             collection_name = settings.get_collection_name(account_name)
-            collection = Collection(name=collection_name)
             
             # 파티션 생성 확인 (컬렉션은 이미 전체 로드되어 있음)
             from app.core.partition_manager import partition_manager
-            processed_partitions = set()
             
-            all_vector_ids = []
+            # 파티션별 문서 인덱스 그룹화 (입력 순서 유지)
+            docs_by_partition: Dict[str, List[int]] = {}
+            for idx, doc_data in enumerate(documents_data):
+                partition_name = generate_partition_name(doc_data["chat_bot_id"])
+                docs_by_partition.setdefault(partition_name, []).append(idx)
             
-            for doc_data in documents_data:
-                chat_bot_id = doc_data["chat_bot_id"]
-                doc_id = doc_data["doc_id"]
-                chunks = doc_data["chunks"]
-                partition_name = f"bot_{chat_bot_id.replace('-', '')}"
-                
-                # 파티션 생성 확인 (한 번만 처리)
-                if partition_name not in processed_partitions:
-                    await partition_manager.ensure_partition_loaded(
-                        collection_name=collection_name,
-                        partition_name=partition_name
-                    )
-                    processed_partitions.add(partition_name)
-                
-                # 개별 문서 메타데이터 사용 (우선순위: 개별 > 공통)
-                doc_metadata = doc_data.get("metadata", {}) or metadata or {}
-                
-                # 엔티티 데이터 준비
-                content_name = doc_data.get("content_name", "")
-                entities = [
-                    [doc_id] * len(chunks),  # doc_id
-                    [chat_bot_id] * len(chunks),  # chat_bot_id
-                    [content_name] * len(chunks),  # content_name
-                    [chunk["chunk_index"] for chunk in chunks],  # chunk_index
-                    [chunk["embedding"] for chunk in chunks],  # embedding_dense
-                    [doc_metadata] * len(chunks)  # metadata JSON
-                ]
-                
-                # Sparse 임베딩 필드 (향후 고도화용, 기본값 NULL)
-                if settings.USE_SPARSE_EMBEDDING:
-                    # sparse_embedding이 있으면 사용, 없으면 빈 리스트 (NULL)
-                    sparse_embeddings = []
-                    for chunk in chunks:
-                        if "sparse_embedding" in chunk and chunk["sparse_embedding"]:
-                            sparse_embeddings.append(chunk["sparse_embedding"])
-                        else:
-                            sparse_embeddings.append([])  # 기본값 NULL
-                    entities.append(sparse_embeddings)
-                
-                # 벡터 삽입
-                insert_result = collection.insert(
-                    entities, 
+            for partition_name in docs_by_partition:
+                await partition_manager.ensure_partition_loaded(
+                    collection_name=collection_name,
                     partition_name=partition_name
                 )
-                
-                all_vector_ids.append(insert_result.primary_keys)
             
-            logger.info(f"✅ Milvus 배치 벡터 삽입 완료: {len(documents_data)}개 문서")
+            # 파티션별 컬럼 데이터 구성
+            partition_entities = []
+            for partition_name, doc_indices in docs_by_partition.items():
+                columns = [[], [], [], [], [], []]  # doc_id, chat_bot_id, content_name, chunk_index, embedding_dense, metadata
+                previews = []
+                sparse_embeddings = []
+                for idx in doc_indices:
+                    doc_data = documents_data[idx]
+                    chunks = doc_data["chunks"]
+                    n = len(chunks)
+                    # 개별 문서 메타데이터 사용 (우선순위: 개별 > 공통)
+                    doc_metadata = doc_data.get("metadata", {}) or metadata or {}
+                    
+                    columns[0].extend([doc_data["doc_id"]] * n)
+                    columns[1].extend([doc_data["chat_bot_id"]] * n)
+                    columns[2].extend([doc_data.get("content_name", "")] * n)
+                    columns[3].extend(chunk["chunk_index"] for chunk in chunks)
+                    columns[4].extend(chunk["embedding"] for chunk in chunks)
+                    columns[5].extend([doc_metadata] * n)
+                    previews.extend(_make_previews(chunks))
+                    
+                    # Sparse 임베딩 필드 (향후 고도화용, 없으면 빈 리스트 = NULL)
+                    if settings.USE_SPARSE_EMBEDDING:
+                        sparse_embeddings.extend(chunk.get("sparse_embedding") or [] for chunk in chunks)
+                
+                if settings.USE_SPARSE_EMBEDDING:
+                    columns.append(sparse_embeddings)
+                partition_entities.append((partition_name, columns, previews))
+            
+            # 파티션별 insert 동시 실행 (pymilvus insert는 동기 호출)
+            partition_keys = await asyncio.gather(*[
+                asyncio.to_thread(self._insert_entities_sync, collection_name, partition_name, columns, previews)
+                for partition_name, columns, previews in partition_entities
+            ])
+            
+            # 파티션별 primary key를 문서 단위로 다시 분배
+            all_vector_ids: List[List[int]] = [[] for _ in documents_data]
+            for doc_indices, keys in zip(docs_by_partition.values(), partition_keys):
+                offset = 0
+                for idx in doc_indices:
+                    n = len(documents_data[idx]["chunks"])
+                    all_vector_ids[idx] = keys[offset:offset + n]
+                    offset += n
+            
+            logger.info(f"✅ Milvus 배치 벡터 삽입 완료: {len(documents_data)}개 문서, {len(docs_by_partition)}개 파티션")
             return all_vector_ids
             
         except Exception as e:
             logger.error(f"❌ Milvus 배치 벡터 삽입 실패: {str(e)}")
             raise
     
+    @staticmethod
+    def _insert_entities_sync(
+        collection_name: str, partition_name: str, entities: list, previews: Optional[List[str]] = None
+    ) -> list:
+        """
+        컬럼 단위 엔티티를 파티션에 삽입 (스레드에서 실행, primary key 리스트 반환)
+        
+        Note:
+            previews는 컬렉션에 chunk_text_preview 필드가 있을 때만 metadata 다음 컬럼으로 삽입
+            리퍼가 빈 파티션을 삭제한 직후라 파티션이 없으면 다시 생성 후 1회 재시도
+        """
+        # 청크가 없는 문서만 모인 파티션은 insert 호출 생략
+        if not entities[0]:
+            return []
+        if previews is not None and has_text_preview(collection_name):
+            entities = entities[:6] + [previews] + entities[6:]
+        collection = get_collection(collection_name)
+        try:
+            insert_result = collection.insert(entities, partition_name=partition_name)
+        except MilvusException:
+            if collection.has_partition(partition_name):
+                raise
+            logger.warning(f"⚠️ 삽입 대상 파티션이 없어 재생성: {partition_name}")
+            collection.create_partition(partition_name)
+            insert_result = collection.insert(entities, partition_name=partition_name)
+        return list(insert_result.primary_keys)
+    
     async def batch_insert_vectors_with_retry(
         self,
         account_name: str,
@@ -520,7 +618,15 @@ class MilvusClient:
         
         Returns:
             삭제된 벡터 수
+        
+        Note:
+            pymilvus 호출은 동기식이므로 스레드에서 실행
+            (PostgreSQL 삭제 등 다른 코루틴과 동시 진행 가능)
         """
+        return await asyncio.to_thread(self._delete_partition_sync, collection_name, partition_name)
+    
+    def _delete_partition_sync(self, collection_name: str, partition_name: str) -> int:
+        """delete_partition의 동기 구현 (스레드에서 실행)"""
         try:
             from pymilvus import Collection
             
@@ -568,7 +674,99 @@ class MilvusClient:
             logger.error(f"Milvus 파티션 삭제 실패: {str(e)}")
             raise
 
-    async def delete_by_content_names(self, collection_name: str, chat_bot_id: str, content_names: List[str]) -> int:
+    async def delete_up_to_doc_id(self, collection_name: str, partition_name: str, max_doc_id: int) -> int:
+        """
+        파티션에서 doc_id <= max_doc_id 인 벡터 일괄 삭제 (봇 삭제 툼스톤 처리용)
+        
+        Args:
+            collection_name: 컬렉션명
+            partition_name: 파티션명
+            max_doc_id: 삭제할 최대 doc_id (봇 삭제 시점 기준)
+        
+        Returns:
+            삭제된 벡터 수
+        
+        Note:
+            파티션 자체는 유지하므로 봇 삭제 이후 새로 삽입된 벡터는 보존됨
+        """
+        return await asyncio.to_thread(self._delete_up_to_doc_id_sync, collection_name, partition_name, max_doc_id)
+    
+    def _delete_up_to_doc_id_sync(self, collection_name: str, partition_name: str, max_doc_id: int) -> int:
+        """delete_up_to_doc_id의 동기 구현 (스레드에서 실행)"""
+        collection = get_collection(collection_name)
+        
+        if not collection.has_partition(partition_name):
+            return 0
+        
+        delete_result = collection.delete(
+            expr=f"doc_id <= {int(max_doc_id)}",
+            partition_name=partition_name
+        )
+        return delete_result.delete_count if delete_result else 0
+    
+    @staticmethod
+    def _content_names_expr(chat_bot_id: str, content_names: List[str]) -> str:
+        """chat_bot_id + content_name 목록 필터 표현식 생성"""
+        expr = f"chat_bot_id == '{chat_bot_id}'"
+        if len(content_names) == 1:
+            return expr + f" and content_name == '{content_names[0]}'"
+        content_names_str = "', '".join(content_names)
+        return expr + f" and content_name in ['{content_names_str}']"
+    
+    async def snapshot_by_content_names(
+        self, collection_name: str, chat_bot_id: str, content_names: List[str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        삭제 전 벡터 스냅샷 조회 (문서 삭제 보상 트랜잭션용)
+        
+        Args:
+            collection_name: 컬렉션명
+            chat_bot_id: 챗봇 ID
+            content_names: 삭제할 문서의 content_name 리스트
+        
+        Returns:
+            스냅샷 행 리스트 (삭제할 벡터가 없으면 빈 리스트)
+            DELETE_SNAPSHOT_MAX_VECTORS개 이상이면 잘린 스냅샷일 수 있으므로 None
+        
+        Note:
+            dense 임베딩까지 전부 조회하므로 벡터 수 × 차원에 비례하는 전송 비용이 있음
+            (1536차원 기준 벡터당 약 6KB, DELETE_MILVUS_SNAPSHOT=true일 때만 조회)
+        """
+        return await asyncio.to_thread(
+            self._snapshot_by_content_names_sync, collection_name, chat_bot_id, content_names
+        )
+    
+    def _snapshot_by_content_names_sync(
+        self, collection_name: str, chat_bot_id: str, content_names: List[str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """snapshot_by_content_names의 동기 구현 (스레드에서 실행)"""
+        collection = get_collection(collection_name)
+        partition_name = generate_partition_name(chat_bot_id)
+        
+        if not collection.has_partition(partition_name):
+            logger.warning("파티션이 존재하지 않음: %s", partition_name)
+            return []
+        
+        snapshot_fields = _SNAPSHOT_FIELDS
+        if has_text_preview(collection_name):
+            snapshot_fields = _SNAPSHOT_FIELDS + [CHUNK_TEXT_PREVIEW_FIELD]
+        
+        snapshot_limit = settings.DELETE_SNAPSHOT_MAX_VECTORS
+        snapshot = collection.query(
+            expr=self._content_names_expr(chat_bot_id, content_names),
+            partition_names=[partition_name],
+            output_fields=snapshot_fields,
+            limit=snapshot_limit
+        )
+        
+        if len(snapshot) >= snapshot_limit:
+            logger.warning("⚠️ 삭제 대상 벡터가 많아 스냅샷 생략: %d개 이상 (상한 %d개)", len(snapshot), snapshot_limit)
+            return None
+        return snapshot
+    
+    async def delete_by_content_names(
+        self, collection_name: str, chat_bot_id: str, content_names: List[str]
+    ) -> int:
         """
         여러 content_name으로 벡터 일괄 삭제
         
@@ -579,61 +777,73 @@ class MilvusClient:
             
         Returns:
             삭제된 벡터 수
+        
+        Note:
+            pymilvus 호출은 동기식이므로 스레드에서 실행
+            (PostgreSQL 삭제 등 다른 코루틴과 동시 진행 가능)
+            보상용 스냅샷이 필요하면 삭제 전에 snapshot_by_content_names로 먼저 조회
         """
+        return await asyncio.to_thread(
+            self._delete_by_content_names_sync, collection_name, chat_bot_id, content_names
+        )
+    
+    def _delete_by_content_names_sync(
+        self, collection_name: str, chat_bot_id: str, content_names: List[str]
+    ) -> int:
+        """delete_by_content_names의 동기 구현 (스레드에서 실행)"""
         try:
-            collection = Collection(name=collection_name)
-            partition_name = f"bot_{chat_bot_id.replace('-', '')}"
+            collection = get_collection(collection_name)
+            partition_name = generate_partition_name(chat_bot_id)
             
-            logger.info(f"Milvus 일괄 삭제 시작: {len(content_names)}개 문서")
-            logger.info(f"   - Collection: {collection_name}")
-            logger.info(f"   - Partition: {partition_name}")
-            logger.info(f"   - Content Names: {content_names}")
-            
-            # 컬렉션 로드
-            collection.load()
-            
-            # 파티션 존재 확인
-            if not collection.has_partition(partition_name):
-                logger.warning(f"파티션이 존재하지 않음: {partition_name}")
-                return 0
-            
-            # 삭제 전 벡터 수 확인
-            query_expr = f"chat_bot_id == '{chat_bot_id}'"
-            if len(content_names) == 1:
-                query_expr += f" and content_name == '{content_names[0]}'"
-            else:
-                content_names_str = "', '".join(content_names)
-                query_expr += f" and content_name in ['{content_names_str}']"
-            
-            # 삭제 전 벡터 수 조회
-            query_result = collection.query(
-                expr=query_expr,
-                partition_names=[partition_name],
-                output_fields=["count(*)"]
+            logger.debug(
+                "Milvus 일괄 삭제 시작: %d개 문서 (collection=%s, partition=%s)",
+                len(content_names), collection_name, partition_name
             )
-            vector_count_before = len(query_result) if query_result else 0
             
-            if vector_count_before == 0:
-                logger.warning(f"삭제할 벡터가 없음: {content_names}")
+            if not collection.has_partition(partition_name):
+                logger.warning("파티션이 존재하지 않음: %s", partition_name)
                 return 0
             
-            # 벡터 삭제
             delete_result = collection.delete(
-                expr=query_expr,
+                expr=self._content_names_expr(chat_bot_id, content_names),
                 partition_name=partition_name
             )
-            
             deleted_count = delete_result.delete_count if delete_result else 0
             
-            logger.info(f"Milvus 일괄 삭제 완료: {deleted_count}개 벡터 삭제")
-            logger.info(f"   - 삭제 전: {vector_count_before}개")
-            logger.info(f"   - 삭제 후: {deleted_count}개")
-            
+            logger.info("Milvus 일괄 삭제 완료: %d개 벡터 삭제", deleted_count)
             return deleted_count
             
         except Exception as e:
             logger.error(f"Milvus 일괄 삭제 실패: {str(e)}")
             raise
+    
+    async def restore_vectors(self, collection_name: str, chat_bot_id: str, snapshot: List[Dict[str, Any]]) -> int:
+        """
+        삭제 전 스냅샷으로 벡터 복구 (문서 삭제 보상 트랜잭션용)
+        
+        Args:
+            collection_name: 컬렉션명
+            chat_bot_id: 챗봇 ID
+            snapshot: snapshot_by_content_names가 반환한 스냅샷
+        
+        Returns:
+            복구된 벡터 수
+        
+        Note:
+            id는 auto_id이므로 복구된 벡터는 새 primary key를 받음
+        """
+        if not snapshot:
+            return 0
+        
+        columns = [[row[field] for row in snapshot] for field in _SNAPSHOT_FIELDS]
+        if settings.USE_SPARSE_EMBEDDING:
+            columns.append([[] for _ in snapshot])  # 기본값 NULL
+        previews = [row.get(CHUNK_TEXT_PREVIEW_FIELD) or "" for row in snapshot]
+        
+        keys = await asyncio.to_thread(
+            self._insert_entities_sync, collection_name, generate_partition_name(chat_bot_id), columns, previews
+        )
+        return len(keys)
 
 
 # 전역 클라이언트 인스턴스
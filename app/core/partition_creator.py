@@ -0,0 +1,118 @@
+"""
+Milvus 파티션 생성 큐 (백그라운드 워커)
+- 봇 등록 요청은 큐에 적재 후 결과(Future)만 대기
+- 워커가 최대 group_size개씩 묶어 병렬 생성
+- 파티션 생성은 Milvus 메타데이터 락에서 직렬화되므로 동시 실행 수를 제한
+"""
+
+import asyncio
+import logging
+from typing import Tuple
+from app.config import settings
+from app.core.milvus_client import milvus_client
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionCreator:
+    """큐 기반 Milvus 파티션 생성기"""
+
+    def __init__(self, group_size: int = 8):
+        """
+        Args:
+            group_size: 한 번에 병렬로 생성할 최대 파티션 수
+        """
+        self.group_size = group_size
+        self._queue: asyncio.Queue[Tuple[str, str, asyncio.Future]] = asyncio.Queue()
+        self._running = False
+
+    async def create(self, account_name: str, partition_name: str):
+        """
+        파티션 생성 요청 (생성 완료까지 대기)
+
+        Args:
+            account_name: 계정명
+            partition_name: 파티션명
+
+        Note:
+            워커가 실행 중이 아니면 스레드에서 바로 생성
+        """
+        if not self._running:
+            return await asyncio.to_thread(
+                milvus_client.create_partition,
+                account_name=account_name,
+                partition_name=partition_name
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((account_name, partition_name, future))
+        return await future
+
+    async def start(self):
+        """파티션 생성 워커 시작"""
+        if self._running:
+            logger.warning("⚠️ Partition creator is already running")
+            return
+
+        self._running = True
+        logger.info(f"🔄 Partition creator started (group_size: {self.group_size})")
+
+        while self._running:
+            group = []
+            try:
+                # 첫 요청이 올 때까지 대기 후, 쌓여 있는 요청을 group_size까지 묶음
+                group.append(await self._queue.get())
+                while len(group) < self.group_size and not self._queue.empty():
+                    group.append(self._queue.get_nowait())
+
+                await self._process_group(group)
+
+            except asyncio.CancelledError:
+                # 처리 중이던 요청은 대기 중인 호출자에게 취소 전달
+                for _, _, future in group:
+                    if not future.done():
+                        future.cancel()
+                logger.info("🛑 Partition creator cancelled")
+                break
+            except Exception as e:
+                logger.error(f"❌ Partition creator error: {e}")
+
+    async def _process_group(self, group: list):
+        """묶인 파티션 생성 요청을 병렬 실행하고 결과 전달"""
+        results = await asyncio.gather(
+            *[
+                asyncio.to_thread(
+                    milvus_client.create_partition,
+                    account_name=account_name,
+                    partition_name=partition_name
+                )
+                for account_name, partition_name, _ in group
+            ],
+            return_exceptions=True
+        )
+
+        for (_, _, future), result in zip(group, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def stop(self):
+        """워커 중지 (대기 중인 요청은 마저 처리)"""
+        self._running = False
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        if pending:
+            logger.info(f"🔄 Creating remaining {len(pending)} partitions...")
+            await self._process_group(pending)
+
+        logger.info("🛑 Partition creator stopped")
+
+
+# 전역 인스턴스
+partition_creator = PartitionCreator(group_size=settings.MAX_CONCURRENT_PARTITION_CREATES)
@@ -11,6 +11,7 @@ from typing import Dict, Set
 from pymilvus import Collection
 from pymilvus.exceptions import SchemaNotReadyException
 from datetime import datetime
+from time import perf_counter
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -38,7 +39,7 @@ class MilvusPartitionManager:
         """
         try:
             logger.info(f"🔄 Starting preload for collection: {collection_name}")
-            start_time = datetime.now()
+            start_time = perf_counter()
             
             # 컬렉션 연결
             collection = Collection(name=collection_name)
@@ -53,13 +54,14 @@ class MilvusPartitionManager:
             # 로드된 파티션 추적
             self.loaded_partitions[collection_name] = set(partition_names)
             
-            # 파티션별 접근 시간 초기화
+            # 파티션별 접근 시간 초기화 (현재 시각은 1회만 생성해 공유)
+            now = datetime.now()
             for partition_name in partition_names:
                 key = self._get_partition_key(collection_name, partition_name)
-                self.last_access_time[key] = datetime.now()
-                self.partition_load_time[key] = datetime.now()
+                self.last_access_time[key] = now
+                self.partition_load_time[key] = now
             
-            elapsed_time = (datetime.now() - start_time).total_seconds()
+            elapsed_time = perf_counter() - start_time
             logger.info(f"✅ Collection preload completed in {elapsed_time:.2f}s")
             logger.info(f"   - Collection: {collection_name}")
             logger.info(f"   - Partitions: {len(partition_names)}")
@@ -81,7 +83,7 @@ class MilvusPartitionManager:
         """
         try:
             logger.info("🔄 Starting preload for all collections...")
-            start_time = datetime.now()
+            start_time = perf_counter()
             
             # Milvus에서 모든 컬렉션 조회
             from pymilvus import utility
@@ -106,7 +108,7 @@ class MilvusPartitionManager:
             
             # 결과 집계
             total_partitions = sum(len(partitions) for partitions in self.loaded_partitions.values())
-            elapsed_time = (datetime.now() - start_time).total_seconds()
+            elapsed_time = perf_counter() - start_time
             
             logger.info(f"✅ All collections preload completed in {elapsed_time:.2f}s")
             logger.info(f"   - Collections loaded: {len(collection_names)}")
@@ -122,6 +124,18 @@ class MilvusPartitionManager:
             logger.error(f"❌ Failed to preload all collections: {e}")
             raise
     
+    def forget_partition(self, collection_name: str, partition_name: str):
+        """
+        삭제된 파티션 추적 정보 제거
+        
+        Note:
+            다음 ensure_partition_loaded 호출 시 Milvus 존재 여부를 다시 확인 (없으면 재생성)
+        """
+        self.loaded_partitions.get(collection_name, set()).discard(partition_name)
+        key = self._get_partition_key(collection_name, partition_name)
+        self.partition_load_time.pop(key, None)
+        self.last_access_time.pop(key, None)
+    
     def get_loaded_partitions(self, collection_name: str) -> Set[str]:
         """로드된 파티션 목록 조회"""
         return self.loaded_partitions.get(collection_name, set())
@@ -181,11 +195,12 @@ class MilvusPartitionManager:
                 # 로드된 파티션 추적
                 self.loaded_partitions[collection_name] = set(partition_names)
                 
-                # 파티션별 접근 시간 초기화
+                # 파티션별 접근 시간 초기화 (현재 시각은 1회만 생성해 공유)
+                now = datetime.now()
                 for pname in partition_names:
                     pkey = self._get_partition_key(collection_name, pname)
-                    self.last_access_time[pkey] = datetime.now()
-                    self.partition_load_time[pkey] = datetime.now()
+                    self.last_access_time[pkey] = now
+                    self.partition_load_time[pkey] = now
                 
                 logger.info(f"✅ Collection '{collection_name}' loaded: {len(partition_names)} partitions")
                 
@@ -276,6 +291,9 @@ class MilvusPartitionManager:
             oldest_time = self.last_access_time[oldest_key]
             oldest_partition = oldest_key
         
+        # 경과 시간 계산 기준 시각 (1회만 생성)
+        now = datetime.now()
+        
         # 로드된 파티션 목록
         all_loaded = []
         for collection_name, partitions in self.loaded_partitions.items():
@@ -285,7 +303,7 @@ class MilvusPartitionManager:
                 all_loaded.append({
                     "key": key,
                     "last_access": last_access.isoformat() if last_access else None,
-                    "minutes_ago": int((datetime.now() - last_access).total_seconds() / 60) if last_access else None
+                    "minutes_ago": int((now - last_access).total_seconds() / 60) if last_access else None
                 })
         
         return {
@@ -300,7 +318,7 @@ class MilvusPartitionManager:
             "oldest_partition": {
                 "key": oldest_partition,
                 "last_access": oldest_time.isoformat() if oldest_time else None,
-                "minutes_ago": int((datetime.now() - oldest_time).total_seconds() / 60) if oldest_time else None
+                "minutes_ago": int((now - oldest_time).total_seconds() / 60) if oldest_time else None
             } if oldest_partition else None,
             "loaded_partitions": all_loaded,
             "config": {
@@ -0,0 +1,322 @@
+"""
+봇 삭제 툼스톤 리퍼 (백그라운드 워커)
+- 봇 삭제 API는 PostgreSQL 삭제 + deleted_partitions 툼스톤 기록만 수행
+- 툼스톤이 있는 계정은 postgres 기본 DB의 tombstone_accounts에 표시
+- 리퍼가 주기적으로 표시된 계정의 툼스톤을 읽어 Milvus 벡터를 실제 삭제한 뒤 툼스톤 제거
+  (남은 문서가 없으면 빈 Milvus 파티션도 삭제, 계정 DB는 1회용 연결로 접근)
+- 검색은 캐시된 툼스톤으로 삭제 대기 중인 벡터(doc_id <= max_doc_id)를 제외
+  (캐시에 없는 계정은 첫 검색 시 조회)
+- 봇 삭제 API는 job_id를 받아 GET /bot/delete/{job_id}로 완료 여부 확인
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.core.auto_flusher import auto_flusher
+from app.core.milvus_client import milvus_client
+from app.core.partition_manager import partition_manager
+from app.core.postgres_client import postgres_client
+from app.utils.naming import generate_collection_name
+
+logger = logging.getLogger(__name__)
+
+# 보관할 최대 작업 상태 수 (초과 시 오래된 작업부터 제거)
+MAX_TRACKED_JOBS = 10000
+
+
+class PartitionReaper:
+    """툼스톤 기반 Milvus 봇 벡터 지연 삭제"""
+
+    def __init__(self, interval_seconds: float = 10.0):
+        """
+        Args:
+            interval_seconds: 툼스톤 조회/삭제 주기 (초)
+        """
+        self.interval_seconds = interval_seconds
+        # 계정별 툼스톤 캐시 {account_name: {partition_name: max_doc_id}}
+        self.tombstones: Dict[str, Dict[str, int]] = {}
+        # 삭제 작업 상태 {job_id: {...}} (이 프로세스에서 접수한 작업만 추적)
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._running = False
+        self._wakeup = asyncio.Event()
+
+    def mark(self, account_name: str, partition_name: str, max_doc_id: int):
+        """
+        봇 삭제 직후 로컬 캐시에 툼스톤 반영 (다음 조회 주기 전에도 검색에서 제외)
+
+        Args:
+            account_name: 계정명
+            partition_name: 파티션명
+            max_doc_id: 삭제 시점의 최대 doc_id
+        """
+        partitions = self.tombstones.setdefault(account_name, {})
+        partitions[partition_name] = max(max_doc_id, partitions.get(partition_name, max_doc_id))
+
+    def submit(self, account_name: str, chat_bot_id: str, partition_name: str, max_doc_id: int) -> str:
+        """
+        봇 삭제 작업 접수 (툼스톤 반영 + 작업 등록 + 워커 즉시 깨우기)
+        
+        Args:
+            account_name: 계정명
+            chat_bot_id: 봇 ID
+            partition_name: 파티션명
+            max_doc_id: 삭제 시점의 최대 doc_id
+        
+        Returns:
+            job_id
+        
+        Note:
+            PostgreSQL 커밋 이후에만 호출하므로 PostgreSQL 실패 시 취소할 작업이 없음
+        """
+        self.mark(account_name, partition_name, max_doc_id)
+        
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "status": "pending",
+            "account_name": account_name,
+            "chat_bot_id": chat_bot_id,
+            "partition_name": partition_name,
+            "max_doc_id": max_doc_id,
+            "deleted_vectors": None,
+            "created_at": datetime.now(),
+            "completed_at": None
+        }
+        while len(self.jobs) > MAX_TRACKED_JOBS:
+            self.jobs.popitem(last=False)
+        
+        # 다음 주기를 기다리지 않고 바로 처리
+        self._wakeup.set()
+        return job_id
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        삭제 작업 상태 조회
+        
+        Returns:
+            작업 상태 (없으면 None)
+        """
+        return self.jobs.get(job_id)
+    
+    def _complete_jobs(self, account_name: str, partition_name: str, max_doc_id: int, deleted_vectors: int):
+        """Milvus 삭제가 끝난 범위(doc_id <= max_doc_id)에 포함되는 대기 작업 완료 처리"""
+        now = datetime.now()
+        for job in self.jobs.values():
+            if (
+                job["status"] == "pending"
+                and job["account_name"] == account_name
+                and job["partition_name"] == partition_name
+                and job["max_doc_id"] <= max_doc_id
+            ):
+                job["status"] = "completed"
+                job["deleted_vectors"] = deleted_vectors
+                job["completed_at"] = now
+    
+    async def get_max_deleted_doc_id(self, account_name: str, partition_name: str) -> Optional[int]:
+        """
+        삭제 대기 중인 벡터의 최대 doc_id 조회
+
+        Returns:
+            max_doc_id (툼스톤이 없으면 None)
+
+        Note:
+            아직 캐시에 없는 계정(재시작 직후 등)은 첫 호출 시 PostgreSQL에서 툼스톤을 읽어옴
+        """
+        partitions = self.tombstones.get(account_name)
+        if partitions is None:
+            partitions = await self._refresh_tombstones(account_name)
+        return partitions.get(partition_name)
+
+    async def _refresh_tombstones(self, account_name: str) -> Dict[str, int]:
+        """
+        계정의 툼스톤 캐시 갱신
+
+        Returns:
+            {partition_name: max_doc_id}
+        """
+        rows = await postgres_client.get_deleted_partitions(account_name)
+        return self._set_tombstones(account_name, {row["partition_name"]: row["max_doc_id"] for row in rows})
+
+    def _set_tombstones(self, account_name: str, partitions: Dict[str, int]) -> Dict[str, int]:
+        """
+        계정의 툼스톤 캐시 교체
+
+        Note:
+            새 조회 결과에서 사라진 툼스톤(다른 프로세스가 정리 완료)의 파티션은
+            삭제됐을 수 있으므로 파티션 추적 정보도 제거
+        """
+        previous = self.tombstones.get(account_name, {})
+        self.tombstones[account_name] = partitions
+
+        cleared = previous.keys() - partitions.keys()
+        if cleared:
+            collection_name = generate_collection_name(account_name)
+            for partition_name in cleared:
+                partition_manager.forget_partition(collection_name, partition_name)
+        return partitions
+
+    async def start(self, reap: bool = True):
+        """
+        리퍼 워커 시작
+
+        Args:
+            reap: True면 Milvus 삭제까지 수행 (삽입 서버),
+                  False면 툼스톤 캐시만 갱신 (검색 서버)
+        """
+        if self._running:
+            logger.warning("⚠️ Partition reaper is already running")
+            return
+
+        self._running = True
+        logger.info(f"🔄 Partition reaper started (interval: {self.interval_seconds}s, reap: {reap})")
+
+        if reap:
+            await self._mark_existing_tombstones()
+
+        while self._running:
+            try:
+                marked, checked_at = await postgres_client.list_tombstone_accounts()
+                if reap:
+                    # 표시된 계정 + 이 프로세스가 접수한 툼스톤 (표시 실패 대비)
+                    local = [name for name, partitions in self.tombstones.items() if partitions]
+                    for account_name in dict.fromkeys(marked + local):
+                        await self._reap_account(account_name, account_name in marked, checked_at)
+                else:
+                    await self._refresh_cached_accounts(set(marked))
+
+                # 주기 대기 (새 작업이 접수되면 즉시 깨어남)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+            except asyncio.CancelledError:
+                logger.info("🛑 Partition reaper cancelled")
+                break
+            except Exception as e:
+                logger.error(f"❌ Partition reaper error: {e}")
+                await asyncio.sleep(self.interval_seconds)
+
+    async def _mark_existing_tombstones(self):
+        """
+        기동 시 툼스톤이 남아 있는 계정을 tombstone_accounts에 표시 (1회)
+
+        Note:
+            표시 도입 이전에 기록됐거나 표시에 실패한 툼스톤 보정용
+            계정 DB마다 1회용 연결을 순서대로 사용하므로 상주 연결은 늘지 않음
+        """
+        try:
+            account_names = await postgres_client.list_account_names()
+        except Exception as e:
+            logger.error(f"❌ 계정 목록 조회 실패 (툼스톤 표시 보정 생략): {e}")
+            return
+
+        for account_name in account_names:
+            try:
+                if await postgres_client.get_deleted_partitions(account_name):
+                    await postgres_client.mark_tombstone_account(account_name)
+            except Exception as e:
+                logger.warning(f"⚠️ 툼스톤 표시 보정 실패 ({account_name}): {e}")
+
+    async def _refresh_cached_accounts(self, marked: set):
+        """
+        검색 서버: 이미 캐시된 계정의 툼스톤만 갱신
+
+        Args:
+            marked: tombstone_accounts에 표시된 계정
+
+        Note:
+            표시가 없는 계정은 DB 조회 없이 빈 툼스톤으로 처리
+            처음 보는 계정은 get_max_deleted_doc_id가 첫 검색 시 조회
+        """
+        for account_name in list(self.tombstones):
+            try:
+                if account_name in marked:
+                    await self._refresh_tombstones(account_name)
+                elif self.tombstones[account_name]:
+                    self._set_tombstones(account_name, {})
+            except Exception as e:
+                # 한 계정 실패가 다른 계정 처리를 막지 않도록 계정 단위로 처리
+                logger.error(f"❌ Partition reaper error ({account_name}): {e}")
+
+    async def _reap_account(self, account_name: str, marked: bool, checked_at):
+        """
+        삽입 서버: 계정의 툼스톤을 읽어 Milvus 벡터 삭제
+
+        Args:
+            account_name: 계정명
+            marked: tombstone_accounts에 표시된 계정 여부
+            checked_at: 표시 조회 시각 (모두 정리되면 이 시각 이전 표시만 제거)
+        """
+        try:
+            await self._process_account(account_name)
+            if marked and not self.tombstones.get(account_name):
+                await postgres_client.unmark_tombstone_account(account_name, checked_at)
+        except Exception as e:
+            # 한 계정 실패가 다른 계정 처리를 막지 않도록 계정 단위로 처리
+            logger.error(f"❌ Partition reaper error ({account_name}): {e}")
+
+    async def _process_account(self, account_name: str):
+        """계정의 툼스톤 캐시 갱신 및 Milvus 벡터 삭제"""
+        rows = await postgres_client.get_deleted_partitions(account_name)
+        self.tombstones[account_name] = {row["partition_name"]: row["max_doc_id"] for row in rows}
+
+        if not rows:
+            return
+
+        collection_name = generate_collection_name(account_name)
+        for row in rows:
+            try:
+                deleted = await milvus_client.delete_up_to_doc_id(
+                    collection_name, row["partition_name"], row["max_doc_id"]
+                )
+                cleared = await postgres_client.clear_deleted_partition(
+                    account_name, row["chat_bot_id"], row["max_doc_id"]
+                )
+                if cleared:
+                    self.tombstones[account_name].pop(row["partition_name"], None)
+                self._complete_jobs(account_name, row["partition_name"], row["max_doc_id"], deleted)
+                # 파티션이 없거나 이미 정리된 경우(0개)는 flush 불필요
+                if deleted > 0:
+                    auto_flusher.mark_for_flush_nowait(collection_name, "delete")
+                logger.info(f"🧹 봇 벡터 삭제 완료: {row['partition_name']} ({deleted}개, doc_id <= {row['max_doc_id']})")
+                if cleared:
+                    await self._drop_partition_if_empty(account_name, collection_name, row["chat_bot_id"], row["partition_name"])
+            except Exception as e:
+                # 툼스톤이 남아 있으므로 다음 주기에 재시도
+                logger.error(f"❌ 봇 벡터 삭제 실패: {row['partition_name']} - {e}")
+
+    async def _drop_partition_if_empty(self, account_name: str, collection_name: str, chat_bot_id: str, partition_name: str):
+        """
+        봇에 남은 문서가 없으면 빈 Milvus 파티션 삭제
+
+        Note:
+            확인부터 삭제까지 bot_registry 행 잠금을 유지하므로 그 사이 문서 삽입은 대기
+            삭제 후 같은 봇에 문서가 삽입되면 ensure_partition_loaded / insert 재시도가 파티션을 다시 생성
+            실패해도 데이터에는 영향이 없으므로 로그만 남김 (다음 봇 삭제 시 재시도)
+        """
+        try:
+            async with postgres_client.lock_bot_if_empty(account_name, chat_bot_id) as empty:
+                if not empty:
+                    logger.debug(f"봇에 새 문서가 있어 파티션 유지: {partition_name}")
+                    return
+                await milvus_client.delete_partition(collection_name, partition_name)
+                partition_manager.forget_partition(collection_name, partition_name)
+            logger.info(f"🧹 빈 파티션 삭제 완료: {partition_name}")
+        except Exception as e:
+            logger.warning(f"⚠️ 빈 파티션 삭제 실패 (무시): {partition_name} - {e}")
+
+    def stop(self):
+        """워커 중지 (남은 툼스톤은 다음 기동 시 처리)"""
+        self._running = False
+        self._wakeup.set()
+        logger.info("🛑 Partition reaper stopped")
+
+
+# 전역 인스턴스
+partition_reaper = PartitionReaper(interval_seconds=settings.PARTITION_REAP_INTERVAL_SECONDS)
@@ -2,7 +2,8 @@
 PostgreSQL 클라이언트
 메타데이터 저장소 연결 및 CRUD 작업 (파티셔닝 기반)
 """
-from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Any, Set, Tuple
 import asyncpg
 import json
 from app.config import settings
@@ -11,6 +12,26 @@ from app.schemas.postgres_schema import get_init_sql
 
 logger = setup_logger(__name__)
 
+# 봇 삭제 툼스톤 테이블 (Milvus 벡터는 백그라운드 리퍼가 나중에 삭제)
+# - max_doc_id: 삭제 시점의 최대 doc_id (이후 새로 삽입된 문서는 삭제 대상 아님)
+DELETED_PARTITIONS_DDL = """
+CREATE TABLE IF NOT EXISTS deleted_partitions (
+    chat_bot_id VARCHAR(100) PRIMARY KEY,
+    partition_name VARCHAR(255) NOT NULL,
+    max_doc_id BIGINT NOT NULL,
+    deleted_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+# 툼스톤이 있는 계정 목록 (postgres 기본 DB, 리퍼가 계정 DB를 모두 순회하지 않도록 사용)
+# - marked_at: 마지막 봇 삭제 커밋 이후 시각 (리퍼는 조회 시각 이전 행만 제거)
+TOMBSTONE_ACCOUNTS_DDL = """
+CREATE TABLE IF NOT EXISTS tombstone_accounts (
+    account_name VARCHAR(255) PRIMARY KEY,
+    marked_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+);
+"""
+
 
 class PostgresClient:
     """
@@ -22,6 +43,8 @@ class PostgresClient:
     def __init__(self):
         # 계정별 연결 풀 캐싱 {account_name: pool}
         self.pools: Dict[str, asyncpg.Pool] = {}
+        # postgres 기본 DB 연결 풀 (DB 생성 등 관리 작업용)
+        self.admin_pool: Optional[asyncpg.Pool] = None
     
     async def get_pool(self, account_name: str) -> asyncpg.Pool:
         """
@@ -38,6 +61,62 @@ class PostgresClient:
         
         return self.pools[account_name]
     
+    async def get_admin_pool(self) -> asyncpg.Pool:
+        """
+        postgres 기본 DB 연결 풀 가져오기 (없으면 생성)
+        
+        Returns:
+            관리 작업용 연결 풀
+        
+        Note:
+            DB 생성 요청마다 새 연결을 맺지 않도록 연결을 재사용
+        """
+        if self.admin_pool is None:
+            self.admin_pool = await asyncpg.create_pool(
+                host=settings.POSTGRES_HOST,
+                port=settings.POSTGRES_PORT,
+                database='postgres',  # 기본 DB
+                user=settings.POSTGRES_USER,
+                password=settings.POSTGRES_PASSWORD,
+                min_size=1,
+                max_size=2
+            )
+            async with self.admin_pool.acquire() as conn:
+                await conn.execute(TOMBSTONE_ACCOUNTS_DDL)
+            logger.info("✅ PostgreSQL 관리용 연결 풀 생성: DB=postgres")
+        
+        return self.admin_pool
+    
+    @asynccontextmanager
+    async def account_connection(self, account_name: str):
+        """
+        계정 DB 연결 (풀이 있으면 풀에서 획득, 없으면 1회용 연결)
+        
+        Args:
+            account_name: 계정명
+        
+        Note:
+            백그라운드 리퍼처럼 요청 트래픽이 없는 계정에 접근할 때 사용
+            (계정마다 상주 풀을 만들지 않아 idle 연결이 쌓이지 않음)
+        """
+        pool = self.pools.get(account_name)
+        if pool is not None:
+            async with pool.acquire() as conn:
+                yield conn
+            return
+        
+        conn = await asyncpg.connect(
+            host=settings.POSTGRES_HOST,
+            port=settings.POSTGRES_PORT,
+            database=settings.get_db_name(account_name),
+            user=settings.POSTGRES_USER,
+            password=settings.POSTGRES_PASSWORD
+        )
+        try:
+            yield conn
+        finally:
+            await conn.close()
+    
     async def _create_pool(self, account_name: str):
         """
         계정별 PostgreSQL 연결 풀 생성
@@ -54,10 +133,14 @@ class PostgresClient:
                 database=db_name,
                 user=settings.POSTGRES_USER,
                 password=settings.POSTGRES_PASSWORD,
-                min_size=1,
+                min_size=min(settings.CONNECTION_POOL_MIN_SIZE, settings.CONNECTION_POOL_SIZE),
                 max_size=settings.CONNECTION_POOL_SIZE
             )
             
+            # 기존 계정 DB에도 툼스톤 테이블 보장 (풀 생성 시 1회)
+            async with pool.acquire() as conn:
+                await conn.execute(DELETED_PARTITIONS_DDL)
+            
             self.pools[account_name] = pool
             logger.info(f"✅ PostgreSQL 연결 풀 생성: account={account_name} → DB={db_name}")
             
@@ -75,6 +158,11 @@ class PostgresClient:
             logger.info(f"PostgreSQL 연결 풀 해제: {account_name}")
         
         self.pools.clear()
+        
+        if self.admin_pool is not None:
+            await self.admin_pool.close()
+            self.admin_pool = None
+            logger.info("PostgreSQL 관리용 연결 풀 해제")
     
     async def create_database(self, account_name: str):
         """
@@ -87,36 +175,29 @@ class PostgresClient:
             성공 여부
         
         Note:
-            postgres 데이터베이스에 연결해서 새 DB 생성
+            postgres 데이터베이스 연결 풀을 사용해서 새 DB 생성
         """
         try:
             db_name = settings.get_db_name(account_name)
             
-            # postgres DB에 연결 (DB 생성용)
-            conn = await asyncpg.connect(
-                host=settings.POSTGRES_HOST,
-                port=settings.POSTGRES_PORT,
-                database='postgres',  # 기본 DB
-                user=settings.POSTGRES_USER,
-                password=settings.POSTGRES_PASSWORD
-            )
-            
-            # 데이터베이스 존재 확인
-            exists = await conn.fetchval(
-                "SELECT 1 FROM pg_database WHERE datname = $1",
-                db_name
-            )
-            
-            if exists:
-                logger.info(f"⚠️ 데이터베이스가 이미 존재합니다: {db_name}")
-                await conn.close()
-                return True
+            # postgres DB 연결 풀에서 연결 획득 (DB 생성용)
+            admin_pool = await self.get_admin_pool()
             
-            # 데이터베이스 생성 (template0 사용 - collation 버전 문제 회피)
-            await conn.execute(f"CREATE DATABASE {db_name} WITH TEMPLATE template0")
-            logger.info(f"✅ PostgreSQL 데이터베이스 생성 완료: {db_name}")
+            async with admin_pool.acquire() as conn:
+                # 데이터베이스 존재 확인
+                exists = await conn.fetchval(
+                    "SELECT 1 FROM pg_database WHERE datname = $1",
+                    db_name
+                )
+                
+                if exists:
+                    logger.info(f"⚠️ 데이터베이스가 이미 존재합니다: {db_name}")
+                    return True
+                
+                # 데이터베이스 생성 (template0 사용 - collation 버전 문제 회피)
+                await conn.execute(f"CREATE DATABASE {db_name} WITH TEMPLATE template0")
+                logger.info(f"✅ PostgreSQL 데이터베이스 생성 완료: {db_name}")
             
-            await conn.close()
             return True
             
         except Exception as e:
@@ -202,7 +283,8 @@ class PostgresClient:
             documents_partition_name VARCHAR;
             chunks_partition_name VARCHAR;
         BEGIN
-            partition_suffix := REPLACE(REPLACE(p_bot_id, '-', ''), '_', '');
+            -- 하이픈/언더스코어를 한 번에 제거하여 파티션 테이블명 계산 (IF 분기 없음)
+            partition_suffix := translate(p_bot_id, '-_', '');
             documents_partition_name := 'documents_' || partition_suffix;
             chunks_partition_name := 'document_chunks_' || partition_suffix;
             
@@ -246,20 +328,11 @@ class PostgresClient:
         END;
         $$ LANGUAGE plpgsql;
         
-        -- 5. 봇 등록 시 자동 파티션 생성 트리거
-        CREATE OR REPLACE FUNCTION auto_create_bot_partitions()
-        RETURNS TRIGGER AS $$
-        BEGIN
-            PERFORM create_bot_partitions(NEW.bot_id);
-            RETURN NEW;
-        END;
-        $$ LANGUAGE plpgsql;
-        
+        -- 5. 파티션 생성은 register_bot에서 신규 등록 시에만 명시적으로 호출
+        --    (bot_registry INSERT마다 실행되던 기존 트리거 제거)
         DROP TRIGGER IF EXISTS trigger_auto_create_partitions ON bot_registry;
-        CREATE TRIGGER trigger_auto_create_partitions
-        AFTER INSERT ON bot_registry
-        FOR EACH ROW EXECUTE FUNCTION auto_create_bot_partitions();
-        """
+        DROP FUNCTION IF EXISTS auto_create_bot_partitions();
+        """ + DELETED_PARTITIONS_DDL
         
         async with pool.acquire() as conn:
             await conn.execute(init_sql)
@@ -275,7 +348,7 @@ class PostgresClient:
         partition_name: str, 
         description: str = None,
         metadata: dict = None
-    ) -> bool:
+    ) -> Optional[str]:
         """
         봇 등록 (자동으로 PostgreSQL + Milvus 파티션 생성)
         
@@ -288,11 +361,13 @@ class PostgresClient:
             metadata: 추가 메타데이터 JSONB (선택)
         
         Returns:
-            성공 여부
+            새로 등록되었으면 partition_name, 이미 등록된 봇이면 None
         
         Note:
-            - PostgreSQL: 트리거로 documents, document_chunks 파티션 자동 생성
+            - PostgreSQL: 신규 등록 시 같은 트랜잭션에서 documents, document_chunks 파티션 생성
+              (네이티브 LIST 파티셔닝 → 문서 INSERT는 트리거 없이 파티션으로 직접 라우팅)
             - Milvus: collection_{account_name}의 파티션으로 생성
+            - 존재 확인 SELECT 없이 ON CONFLICT ... RETURNING 한 번으로 신규 여부 판단
         """
         pool = await self.get_pool(account_name)
         
@@ -300,18 +375,103 @@ class PostgresClient:
         INSERT INTO bot_registry (bot_id, bot_name, partition_name, description, metadata)
         VALUES ($1, $2, $3, $4, $5::jsonb)
         ON CONFLICT (bot_id) DO NOTHING
+        RETURNING partition_name
+        """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # 봇 메타데이터는 재등록으로 복구 가능하므로 커밋 시 WAL fsync 대기 생략
+                await conn.execute("SET LOCAL synchronous_commit = off")
+                inserted_partition = await conn.fetchval(
+                    query, 
+                    bot_id, 
+                    bot_name, 
+                    partition_name, 
+                    description,
+                    json.dumps(metadata or {})  # JSON 문자열로 변환
+                )
+                
+                # 신규 봇만 PARTITION OF 테이블 생성 (이미 등록된 봇은 DDL 생략)
+                if inserted_partition is not None:
+                    await conn.execute("SELECT create_bot_partitions($1)", bot_id)
+        
+        # 연결은 INSERT 직후 반납 (Milvus 파티션 생성 등 후속 작업 동안 점유하지 않음)
+        # RETURNING 결과가 없으면 ON CONFLICT로 무시된 것 (이미 등록된 봇)
+        logger.info(f"봇 등록 완료 (account: {account_name}): bot_id={bot_id}, name={bot_name}, partition={partition_name}, 신규={inserted_partition is not None}")
+        return inserted_partition
+    
+    async def register_bots(self, account_name: str, bots: List[Dict[str, Any]]) -> List[str]:
+        """
+        봇 일괄 등록 (단일 트랜잭션)
+        
+        Args:
+            account_name: 계정명
+            bots: 봇 정보 리스트 [{"bot_id", "bot_name", "partition_name", "description", "metadata"}, ...]
+        
+        Returns:
+            새로 등록된 bot_id 리스트 (이미 등록된 봇은 제외)
+        
+        Note:
+            - 한 번의 INSERT ... SELECT unnest(...)로 전체 봇 등록
+            - 신규 등록된 봇만 같은 트랜잭션에서 PostgreSQL 파티션 생성
+        """
+        pool = await self.get_pool(account_name)
+        
+        query = """
+        INSERT INTO bot_registry (bot_id, bot_name, partition_name, description, metadata)
+        SELECT b.bot_id, b.bot_name, b.partition_name, b.description, b.metadata::jsonb
+        FROM unnest($1::varchar[], $2::varchar[], $3::varchar[], $4::text[], $5::text[])
+            AS b(bot_id, bot_name, partition_name, description, metadata)
+        ON CONFLICT (bot_id) DO NOTHING
+        RETURNING bot_id
         """
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # 봇 메타데이터는 재등록으로 복구 가능하므로 커밋 시 WAL fsync 대기 생략
+                await conn.execute("SET LOCAL synchronous_commit = off")
+                rows = await conn.fetch(
+                    query,
+                    [bot["bot_id"] for bot in bots],
+                    [bot["bot_name"] for bot in bots],
+                    [bot["partition_name"] for bot in bots],
+                    [bot.get("description") for bot in bots],
+                    [json.dumps(bot.get("metadata") or {}) for bot in bots]
+                )
+                inserted_bot_ids = [row["bot_id"] for row in rows]
+                
+                if inserted_bot_ids:
+                    await conn.execute(
+                        "SELECT create_bot_partitions(bot_id) FROM unnest($1::varchar[]) AS bot_id",
+                        inserted_bot_ids
+                    )
+        
+        logger.info(f"봇 일괄 등록 완료 (account: {account_name}): 요청 {len(bots)}개, 신규 {len(inserted_bot_ids)}개")
+        return inserted_bot_ids
+    
+    async def unregister_bot(self, account_name: str, bot_id: str) -> bool:
+        """
+        봇 등록 취소 (봇 등록 실패 시 보상 트랜잭션용)
+        
+        Args:
+            account_name: 계정명
+            bot_id: 봇 ID (UUID)
+        
+        Returns:
+            삭제 여부
+        
+        Note:
+            등록 시 생성된 PostgreSQL 파티션 테이블은 남겨둠 (재등록 시 IF NOT EXISTS로 재사용)
+        """
+        pool = await self.get_pool(account_name)
+        
         async with pool.acquire() as conn:
             result = await conn.execute(
-                query, 
-                bot_id, 
-                bot_name, 
-                partition_name, 
-                description,
-                json.dumps(metadata or {})  # JSON 문자열로 변환
+                "DELETE FROM bot_registry WHERE bot_id = $1",
+                bot_id
             )
-            logger.info(f"봇 등록 완료 (account: {account_name}): bot_id={bot_id}, name={bot_name}, partition={partition_name}")
-            return True
+        
+        deleted = result.endswith(" 1")
+        logger.info(f"봇 등록 취소 (account: {account_name}): bot_id={bot_id}, 삭제={deleted}")
+        return deleted
     
     async def insert_document(self, account_name: str, document_data: Dict[str, Any], chunk_count: int = 0) -> int:
         """
@@ -366,7 +526,8 @@ class PostgresClient:
         
         Note:
             PostgreSQL 트랜잭션으로 문서와 청크 삽입의 원자성 보장
-            중복 시 (chat_bot_id, content_name) 기존 doc_id 반환 또는 None
+            중복 여부는 UNIQUE (chat_bot_id, content_name) + ON CONFLICT DO NOTHING으로 판단
+            (별도 사전 조회 없음, 중복이면 청크 삽입 없이 None 반환)
         """
         pool = await self.get_pool(account_name)
         chat_bot_id = document_data.get("chat_bot_id")
@@ -388,22 +549,10 @@ class PostgresClient:
                     json.dumps(document_data.get("metadata", {}))
                 )
                 
-                # 중복 체크: doc_id가 None이면 중복된 문서이므로 기존 doc_id 조회
+                # 중복된 문서 (ON CONFLICT DO NOTHING → RETURNING 없음): 청크 삽입 스킵
                 if doc_id is None:
-                    # 중복된 문서이므로 기존 doc_id 조회
-                    doc_id = await conn.fetchval("""
-                        SELECT doc_id FROM documents 
-                        WHERE chat_bot_id = $1 AND content_name = $2
-                    """, chat_bot_id, content_name)
-                    
-                    if doc_id is None:
-                        # 정말 문제가 있는 경우 (예상치 못한 오류)
-                        logger.error(f"❌ 문서 삽입 실패: doc_id가 None입니다. chat_bot_id={chat_bot_id}, content_name={content_name}")
-                        return None
-                    
-                    # 중복된 문서이므로 청크 삽입 스킵
-                    logger.warning(f"⚠️ 중복된 문서 발견 (트랜잭션 내): content_name='{content_name}', 기존 doc_id={doc_id}")
-                    return doc_id
+                    logger.warning(f"⚠️ 중복된 문서 발견 (트랜잭션 내): content_name='{content_name}'")
+                    return None
                 
                 # 2. 청크 삽입
                 await conn.executemany("""
@@ -422,7 +571,7 @@ class PostgresClient:
         self,
         account_name: str,
         documents: List[Dict[str, Any]]
-    ) -> List[int]:
+    ) -> List[Optional[int]]:
         """
         여러 문서 + 청크를 단일 트랜잭션으로 삽입 (배치 Saga Pattern용)
         
@@ -431,66 +580,73 @@ class PostgresClient:
             documents: 문서 데이터 리스트 (각 문서는 document_data, chunks 포함)
         
         Returns:
-            생성된 doc_id 리스트 (중복 문서는 기존 doc_id 포함)
+            documents와 같은 순서의 doc_id 리스트 (이미 존재하거나 요청 내에서 중복된 문서는 None)
         
         Note:
-            PostgreSQL 트랜잭션으로 모든 문서와 청크 삽입의 원자성 보장
-            중복 문서는 기존 doc_id를 반환하고 청크 삽입 스킵
+            - 문서 전체를 INSERT ... SELECT unnest(...) 1회로 삽입
+            - 신규 문서의 청크 전체를 INSERT ... SELECT unnest(...) 1회로 삽입
+            - PostgreSQL 트랜잭션으로 모든 문서와 청크 삽입의 원자성 보장
         """
+        if not documents:
+            return []
+        
         pool = await self.get_pool(account_name)
-        doc_ids = []
+        
+        doc_query = """
+        INSERT INTO documents (chat_bot_id, content_name, chunk_count, metadata)
+        SELECT d.chat_bot_id, d.content_name, d.chunk_count, d.metadata::jsonb
+        FROM unnest($1::varchar[], $2::varchar[], $3::int[], $4::text[])
+            AS d(chat_bot_id, content_name, chunk_count, metadata)
+        ON CONFLICT (chat_bot_id, content_name) DO NOTHING
+        RETURNING doc_id, chat_bot_id, content_name
+        """
+        chunk_query = """
+        INSERT INTO document_chunks (doc_id, chat_bot_id, chunk_index, chunk_text, page_number, content_hash)
+        SELECT *
+        FROM unnest($1::bigint[], $2::varchar[], $3::int[], $4::text[], $5::int[], $6::varchar[])
+        """
+        
+        document_data_list = [doc_data["document_data"] for doc_data in documents]
         
         async with pool.acquire() as conn:
             async with conn.transaction():
-                for doc_data in documents:
-                    chat_bot_id = doc_data["document_data"].get("chat_bot_id")
-                    content_name = doc_data["document_data"].get("content_name")
-                    
-                    # 1. 문서 삽입 (중복 시 기존 doc_id 조회)
-                    doc_id = await conn.fetchval("""
-                        INSERT INTO documents (chat_bot_id, content_name, chunk_count, metadata)
-                        VALUES ($1, $2, $3, $4::jsonb)
-                        ON CONFLICT (chat_bot_id, content_name) 
-                        DO NOTHING
-                        RETURNING doc_id
-                    """, 
-                        chat_bot_id,
-                        content_name,
-                        len(doc_data["chunks"]),
-                        json.dumps(doc_data["document_data"].get("metadata", {}))
-                    )
-                    
-                    # 중복 체크: doc_id가 None이면 중복된 문서이므로 기존 doc_id 조회
+                # 1. 문서 일괄 삽입 (중복은 DO NOTHING → RETURNING에서 제외)
+                rows = await conn.fetch(
+                    doc_query,
+                    [data.get("chat_bot_id") for data in document_data_list],
+                    [data.get("content_name") for data in document_data_list],
+                    [len(doc_data["chunks"]) for doc_data in documents],
+                    [json.dumps(data.get("metadata", {})) for data in document_data_list]
+                )
+                inserted = {(row["chat_bot_id"], row["content_name"]): row["doc_id"] for row in rows}
+                
+                # 입력 순서로 doc_id 매핑 (같은 키가 요청에 두 번 있으면 첫 번째만 신규)
+                doc_ids = []
+                for data in document_data_list:
+                    doc_ids.append(inserted.pop((data.get("chat_bot_id"), data.get("content_name")), None))
+                
+                # 2. 신규 문서의 청크 일괄 삽입
+                chunk_columns = ([], [], [], [], [], [])
+                for doc_data, data, doc_id in zip(documents, document_data_list, doc_ids):
                     if doc_id is None:
-                        # 중복된 문서이므로 기존 doc_id 조회
-                        doc_id = await conn.fetchval("""
-                            SELECT doc_id FROM documents 
-                            WHERE chat_bot_id = $1 AND content_name = $2
-                        """, chat_bot_id, content_name)
-                        
-                        if doc_id is None:
-                            logger.error(f"❌ 문서 삽입 실패: doc_id가 None입니다. chat_bot_id={chat_bot_id}, content_name={content_name}")
-                            continue
-                        
-                        # 중복된 문서이므로 청크 삽입 스킵
-                        logger.warning(f"⚠️ 중복된 문서 발견 (배치 트랜잭션 내): content_name='{content_name}', 기존 doc_id={doc_id}")
-                        doc_ids.append(doc_id)
                         continue
-                    
-                    doc_ids.append(doc_id)
-                    
-                    # 2. 청크 삽입
-                    await conn.executemany("""
-                        INSERT INTO document_chunks (doc_id, chat_bot_id, chunk_index, chunk_text, page_number, content_hash)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                    """, [
-                        (doc_id, chat_bot_id, chunk["chunk_index"], chunk["text"], chunk.get("page_number"), chunk.get("content_hash"))
-                        for chunk in doc_data["chunks"]
-                    ])
+                    chat_bot_id = data.get("chat_bot_id")
+                    for chunk in doc_data["chunks"]:
+                        chunk_columns[0].append(doc_id)
+                        chunk_columns[1].append(chat_bot_id)
+                        chunk_columns[2].append(chunk["chunk_index"])
+                        chunk_columns[3].append(chunk["text"])
+                        chunk_columns[4].append(chunk.get("page_number"))
+                        chunk_columns[5].append(chunk.get("content_hash"))
                 
-                # 트랜잭션 커밋 (이 시점에서 모든 doc_id 확정)
-                logger.info(f"✅ PostgreSQL 배치 트랜잭션 완료: {len(doc_ids)}개 문서")
-                return doc_ids
+                if chunk_columns[0]:
+                    await conn.execute(chunk_query, *chunk_columns)
+        
+        skipped = doc_ids.count(None)
+        if skipped:
+            logger.warning(f"⚠️ 중복된 문서 {skipped}개 스킵 (배치 트랜잭션 내)")
+        logger.info(f"✅ PostgreSQL 배치 트랜잭션 완료: {len(doc_ids) - skipped}개 문서, {len(chunk_columns[0])}개 청크")
+        return doc_ids
     
     async def insert_chunks(self, account_name: str, chat_bot_id: str, doc_id: int, chunks: List[Dict[str, Any]]):
         """
@@ -573,7 +729,7 @@ class PostgresClient:
             rows = await conn.fetch(query, chat_bot_id, doc_ids)
             return [dict(row) for row in rows]
     
-    async def get_documents_with_chunks_by_ids(self, account_name: str, chat_bot_id: str, doc_ids: List[int], chunk_indices: List[int] = None) -> List[Dict[str, Any]]:
+    async def get_documents_with_chunks_by_ids(self, account_name: str, chat_bot_id: str, doc_ids: List[int], chunk_pairs: List[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
         """
         문서와 해당 청크들을 함께 조회 (검색 결과용)
         
@@ -581,45 +737,58 @@ class PostgresClient:
             account_name: 계정명
             chat_bot_id: 챗봇 ID (파티션 키)
             doc_ids: 문서 ID 리스트
-            chunk_indices: 특정 청크 인덱스들 (옵션)
+            chunk_pairs: 조회할 (doc_id, chunk_index) 쌍 리스트 (옵션, 없으면 문서의 모든 청크)
         
         Returns:
             문서 데이터 리스트 (chunks 필드 포함)
+        
+        Note:
+            청크는 문서 수와 관계없이 1회 쿼리로 조회
+            chunk_pairs가 주어지면 UNNEST로 쌍 배열과 조인해 검색에 걸린 청크만 가져옴
+            (doc_id 목록 × chunk_index 목록 조합으로 불필요한 청크를 읽지 않음)
         """
         pool = await self.get_pool(account_name)
         
-        # 단일 트랜잭션으로 문서와 청크를 함께 조회
         async with pool.acquire() as conn:
             # 문서 조회
             doc_query = "SELECT * FROM documents WHERE chat_bot_id = $1 AND doc_id = ANY($2)"
             doc_rows = await conn.fetch(doc_query, chat_bot_id, doc_ids)
             documents = [dict(row) for row in doc_rows]
+            if not documents:
+                return documents
             
-            # 각 문서의 청크들 조회 (같은 연결 사용)
-            for doc in documents:
-                doc_id = doc['doc_id']
-                
-                # 특정 청크 인덱스가 지정된 경우
-                if chunk_indices:
-                    chunk_query = """
-                    SELECT chunk_index, chunk_text, page_number 
-                    FROM document_chunks 
-                    WHERE chat_bot_id = $1 AND doc_id = $2 AND chunk_index = ANY($3)
-                    ORDER BY chunk_index
-                    """
-                    chunk_rows = await conn.fetch(chunk_query, chat_bot_id, doc_id, chunk_indices)
-                else:
-                    # 모든 청크 조회
-                    chunk_query = """
-                    SELECT chunk_index, chunk_text, page_number 
-                    FROM document_chunks 
-                    WHERE chat_bot_id = $1 AND doc_id = $2
-                    ORDER BY chunk_index
-                    """
-                    chunk_rows = await conn.fetch(chunk_query, chat_bot_id, doc_id)
-                
-                # 청크 데이터를 딕셔너리로 변환
-                doc['chunks'] = {row['chunk_index']: dict(row) for row in chunk_rows}
+            # 청크 조회 (같은 연결 사용)
+            if chunk_pairs:
+                chunk_query = """
+                SELECT c.doc_id, c.chunk_index, c.chunk_text, c.page_number
+                FROM UNNEST($2::bigint[], $3::int[]) AS t(doc_id, chunk_index)
+                JOIN document_chunks c
+                  ON c.chat_bot_id = $1 AND c.doc_id = t.doc_id AND c.chunk_index = t.chunk_index
+                """
+                pair_doc_ids, pair_chunk_indices = zip(*chunk_pairs)
+                chunk_rows = await conn.fetch(chunk_query, chat_bot_id, list(pair_doc_ids), list(pair_chunk_indices))
+            else:
+                # 모든 청크 조회
+                chunk_query = """
+                SELECT doc_id, chunk_index, chunk_text, page_number
+                FROM document_chunks
+                WHERE chat_bot_id = $1 AND doc_id = ANY($2::bigint[])
+                ORDER BY doc_id, chunk_index
+                """
+                chunk_rows = await conn.fetch(chunk_query, chat_bot_id, [doc['doc_id'] for doc in documents])
+        
+        # 청크 데이터를 문서별 딕셔너리로 분배
+        chunks_by_doc = {doc['doc_id']: {} for doc in documents}
+        for row in chunk_rows:
+            chunks = chunks_by_doc.get(row['doc_id'])
+            if chunks is not None:
+                chunks[row['chunk_index']] = {
+                    'chunk_index': row['chunk_index'],
+                    'chunk_text': row['chunk_text'],
+                    'page_number': row['page_number']
+                }
+        for doc in documents:
+            doc['chunks'] = chunks_by_doc[doc['doc_id']]
         
         return documents
     
@@ -639,6 +808,70 @@ class PostgresClient:
             await conn.execute(query, chat_bot_id, doc_id)
         logger.info(f"문서 삭제 완료 (account: {account_name}, bot: {chat_bot_id}): doc_id={doc_id}")
     
+    async def delete_documents(self, account_name: str, chat_bot_id: str, doc_ids: List[int]) -> int:
+        """
+        여러 문서 일괄 삭제 (보상 트랜잭션용, CASCADE로 청크도 자동 삭제)
+        
+        Args:
+            account_name: 계정명
+            chat_bot_id: 챗봇 ID (파티션 키)
+            doc_ids: 삭제할 문서 ID 리스트
+        
+        Returns:
+            삭제된 문서 수
+        
+        Note:
+            doc_id 개수와 관계없이 ANY 배열 조건으로 한 번에 삭제 (1회 왕복)
+        """
+        if not doc_ids:
+            return 0
+        
+        pool = await self.get_pool(account_name)
+        
+        query = "DELETE FROM documents WHERE chat_bot_id = $1 AND doc_id = ANY($2::bigint[])"
+        async with pool.acquire() as conn:
+            result = await conn.execute(query, chat_bot_id, doc_ids)
+        
+        deleted_count = int(result.split()[-1])
+        logger.info(f"문서 일괄 삭제 완료 (account: {account_name}, bot: {chat_bot_id}): {deleted_count}/{len(doc_ids)}개")
+        return deleted_count
+    
+    async def delete_document_pairs(self, account_name: str, pairs: List[Tuple[str, int]]) -> int:
+        """
+        여러 봇에 걸친 문서 일괄 삭제 (보상 트랜잭션용, CASCADE로 청크도 자동 삭제)
+        
+        Args:
+            account_name: 계정명
+            pairs: (chat_bot_id, doc_id) 리스트
+        
+        Returns:
+            삭제된 문서 수
+        
+        Note:
+            두 배열을 unnest로 짝지어 봇 수와 관계없이 한 번에 삭제 (1회 왕복)
+            chat_bot_id = ANY 조건으로 해당 봇 파티션만 스캔
+        """
+        if not pairs:
+            return 0
+        
+        pool = await self.get_pool(account_name)
+        
+        bot_ids = [bot_id for bot_id, _ in pairs]
+        doc_ids = [doc_id for _, doc_id in pairs]
+        
+        query = """
+        DELETE FROM documents d
+        USING unnest($1::text[], $2::bigint[]) AS p(chat_bot_id, doc_id)
+        WHERE d.chat_bot_id = p.chat_bot_id AND d.doc_id = p.doc_id
+          AND d.chat_bot_id = ANY($1::text[])
+        """
+        async with pool.acquire() as conn:
+            result = await conn.execute(query, bot_ids, doc_ids)
+        
+        deleted_count = int(result.split()[-1])
+        logger.info(f"문서 일괄 삭제 완료 (account: {account_name}, bots: {len(set(bot_ids))}): {deleted_count}/{len(pairs)}개")
+        return deleted_count
+    
     async def update_document(self, account_name: str, chat_bot_id: str, doc_id: int, document_data: Dict[str, Any], chunk_count: int = None):
         """
         문서 업데이트 (메타데이터 + chunk_count)
@@ -787,9 +1020,11 @@ class PostgresClient:
                 logger.info(f"문서 삭제 완료 (account: {account_name}, bot: {chat_bot_id}, content_name: {content_name}): {doc_count}개 문서, {chunk_count}개 청크")
                 return doc_count, chunk_count
 
-    async def delete_documents_by_content_names(self, account_name: str, chat_bot_id: str, content_names: List[str]) -> tuple:
+    async def check_and_delete_documents(
+        self, account_name: str, chat_bot_id: str, content_names: List[str]
+    ) -> Tuple[List[str], int, int, Dict[str, list]]:
         """
-        여러 content_name 기준으로 문서 일괄 삭제 (해당 파티션에서만)
+        여러 content_name 기준으로 존재 확인 + 문서 일괄 삭제 (해당 파티션에서만)
         
         Args:
             account_name: 계정명
@@ -797,83 +1032,140 @@ class PostgresClient:
             content_names: 문서 고유 식별자 리스트
         
         Returns:
-            (삭제된 문서 수, 삭제된 청크 수)
+            (실제로 삭제된 content_name 리스트, 삭제된 문서 수, 삭제된 청크 수, 삭제된 행 스냅샷)
+            스냅샷: {"documents": [...], "chunks": [...]} (restore_documents로 재삽입)
+        
+        Note:
+            DELETE ... RETURNING으로 존재하던 문서를 삭제하면서 바로 반환하므로
+            존재 확인 조회 없이 한 문장에서 처리 (1회 왕복, 문장 단위 자동 커밋)
+            연결과 행 잠금은 이 문장 동안만 유지 (Milvus 삭제를 기다리지 않음)
+            반환된 행은 Milvus 삭제 실패 시 보상 재삽입에 사용
         """
+        if not content_names:
+            return [], 0, 0, {"documents": [], "chunks": []}
+        
         pool = await self.get_pool(account_name)
         
+        # 문서 삭제 결과(doc_id)로 청크 삭제 → 삭제된 행 전체를 함께 반환
+        delete_query = """
+        WITH deleted_docs AS (
+            DELETE FROM documents
+            WHERE chat_bot_id = $1 AND content_name = ANY($2::text[])
+            RETURNING doc_id, content_name, chunk_count, created_at, updated_at, metadata
+        ),
+        deleted_chunks AS (
+            DELETE FROM document_chunks
+            WHERE chat_bot_id = $1 AND doc_id IN (SELECT doc_id FROM deleted_docs)
+            RETURNING chunk_id, doc_id, chunk_index, chunk_text, page_number, content_hash
+        )
+        SELECT
+            ARRAY(SELECT row_to_json(d)::text FROM deleted_docs d) AS documents,
+            ARRAY(SELECT row_to_json(c)::text FROM deleted_chunks c) AS chunks
+        """
+        
         async with pool.acquire() as conn:
-            async with conn.transaction():
-                # 1. 삭제 전 통계 조회
-                if len(content_names) == 1:
-                    # 단일 문서인 경우
-                    stats_query = """
-                    SELECT 
-                        COUNT(DISTINCT d.doc_id) as doc_count,
-                        COUNT(c.chunk_id) as chunk_count
-                    FROM documents d
-                    LEFT JOIN document_chunks c ON d.doc_id = c.doc_id AND d.chat_bot_id = c.chat_bot_id
-                    WHERE d.chat_bot_id = $1 AND d.content_name = $2
-                    """
-                    stats_row = await conn.fetchrow(stats_query, chat_bot_id, content_names[0])
-                else:
-                    # 여러 문서인 경우
-                    placeholders = ','.join([f'${i+2}' for i in range(len(content_names))])
-                    stats_query = f"""
-                    SELECT 
-                        COUNT(DISTINCT d.doc_id) as doc_count,
-                        COUNT(c.chunk_id) as chunk_count
-                    FROM documents d
-                    LEFT JOIN document_chunks c ON d.doc_id = c.doc_id AND d.chat_bot_id = c.chat_bot_id
-                    WHERE d.chat_bot_id = $1 AND d.content_name IN ({placeholders})
-                    """
-                    stats_row = await conn.fetchrow(stats_query, chat_bot_id, *content_names)
-                
-                doc_count = stats_row['doc_count'] if stats_row else 0
-                chunk_count = stats_row['chunk_count'] if stats_row else 0
-                
-                if doc_count == 0:
-                    logger.warning(f"삭제할 문서가 없음 (account: {account_name}, bot: {chat_bot_id}, content_names: {content_names})")
-                    return 0, 0
-                
-                # 2. 청크 삭제 (CASCADE로 자동 삭제되지만 명시적으로)
-                if len(content_names) == 1:
-                    # 단일 문서인 경우
-                    await conn.execute("""
-                        DELETE FROM document_chunks 
-                        WHERE chat_bot_id = $1 AND doc_id IN (
-                            SELECT doc_id FROM documents 
-                            WHERE chat_bot_id = $1 AND content_name = $2
-                        )
-                    """, chat_bot_id, content_names[0])
-                else:
-                    # 여러 문서인 경우
-                    placeholders = ','.join([f'${i+2}' for i in range(len(content_names))])
-                    await conn.execute(f"""
-                        DELETE FROM document_chunks 
-                        WHERE chat_bot_id = $1 AND doc_id IN (
-                            SELECT doc_id FROM documents 
-                            WHERE chat_bot_id = $1 AND content_name IN ({placeholders})
-                        )
-                    """, chat_bot_id, *content_names)
-                
-                # 3. 문서 삭제
-                if len(content_names) == 1:
-                    # 단일 문서인 경우
-                    await conn.execute("""
-                        DELETE FROM documents 
-                        WHERE chat_bot_id = $1 AND content_name = $2
-                    """, chat_bot_id, content_names[0])
-                else:
-                    # 여러 문서인 경우
-                    placeholders = ','.join([f'${i+2}' for i in range(len(content_names))])
-                    await conn.execute(f"""
-                        DELETE FROM documents 
-                        WHERE chat_bot_id = $1 AND content_name IN ({placeholders})
-                    """, chat_bot_id, *content_names)
-                
-                logger.info(f"문서 일괄 삭제 완료 (account: {account_name}, bot: {chat_bot_id}, content_names: {len(content_names)}개): {doc_count}개 문서, {chunk_count}개 청크")
-                return doc_count, chunk_count
+            row = await conn.fetchrow(delete_query, chat_bot_id, list(content_names))
+        
+        documents = [json.loads(doc) for doc in row['documents']]
+        chunks = [json.loads(chunk) for chunk in row['chunks']]
+        deleted_names = [doc['content_name'] for doc in documents]
+        
+        if deleted_names:
+            logger.info(f"문서 일괄 삭제 완료 (account: {account_name}, bot: {chat_bot_id}, content_names: {len(content_names)}개): {len(deleted_names)}개 문서, {len(chunks)}개 청크")
+        else:
+            logger.debug("삭제할 문서가 없음 (account: %s, bot: %s, content_names: %d개)", account_name, chat_bot_id, len(content_names))
+        
+        return deleted_names, len(documents), len(chunks), {"documents": documents, "chunks": chunks}
+    
+    async def restore_documents(self, account_name: str, chat_bot_id: str, snapshot: Dict[str, list]) -> int:
+        """
+        check_and_delete_documents로 삭제한 문서/청크 재삽입 (Milvus 삭제 실패 시 보상 트랜잭션)
+        
+        Args:
+            account_name: 계정명
+            chat_bot_id: 챗봇 ID (파티션 키)
+            snapshot: check_and_delete_documents가 반환한 스냅샷
+        
+        Returns:
+            재삽입된 문서 수
+        
+        Note:
+            doc_id/chunk_id를 그대로 유지하므로 Milvus 벡터(doc_id 기준)와 다시 연결됨
+            그 사이 같은 content_name으로 새 문서가 삽입됐으면 해당 문서(와 청크)는 건너뜀
+        """
+        documents = snapshot["documents"]
+        if not documents:
+            return 0
+        chunks = snapshot["chunks"]
+        
+        pool = await self.get_pool(account_name)
+        
+        # 문서와 청크를 한 문장으로 재삽입 (FK는 문장 종료 시 확인)
+        restore_query = """
+        WITH restored_docs AS (
+            INSERT INTO documents (doc_id, chat_bot_id, content_name, chunk_count, created_at, updated_at, metadata)
+            SELECT d.doc_id, $1, d.content_name, d.chunk_count, d.created_at, d.updated_at, d.metadata
+            FROM jsonb_to_recordset($2::jsonb) AS d(
+                doc_id BIGINT, content_name TEXT, chunk_count INT,
+                created_at TIMESTAMP, updated_at TIMESTAMP, metadata JSONB
+            )
+            ON CONFLICT DO NOTHING
+            RETURNING doc_id
+        ),
+        restored_chunks AS (
+            INSERT INTO document_chunks (chunk_id, doc_id, chat_bot_id, chunk_index, chunk_text, page_number, content_hash)
+            SELECT c.chunk_id, c.doc_id, $1, c.chunk_index, c.chunk_text, c.page_number, c.content_hash
+            FROM jsonb_to_recordset($3::jsonb) AS c(
+                chunk_id BIGINT, doc_id BIGINT, chunk_index INT,
+                chunk_text TEXT, page_number INT, content_hash TEXT
+            )
+            WHERE c.doc_id IN (SELECT doc_id FROM restored_docs)
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM restored_docs) AS doc_count
+        """
+        
+        async with pool.acquire() as conn:
+            restored = await conn.fetchval(restore_query, chat_bot_id, json.dumps(documents), json.dumps(chunks))
+        
+        logger.info(f"문서 복구 완료 (account: {account_name}, bot: {chat_bot_id}): {restored}/{len(documents)}개 문서")
+        return restored
 
+    async def get_existing_pairs(self, account_name: str, pairs: List[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """
+        여러 봇에 걸친 (chat_bot_id, content_name) 쌍 중 이미 존재하는 쌍 조회 (1회 왕복)
+        
+        Args:
+            account_name: 계정명
+            pairs: (chat_bot_id, content_name) 리스트
+        
+        Returns:
+            존재하는 (chat_bot_id, content_name) 집합
+        
+        Note:
+            두 배열을 unnest로 짝지어 조인 (정확히 일치하는 쌍만 반환)
+            chat_bot_id = ANY 조건으로 해당 봇 파티션만 스캔
+        """
+        if not pairs:
+            return set()
+        
+        pool = await self.get_pool(account_name)
+        
+        bot_ids = [bot_id for bot_id, _ in pairs]
+        names = [name for _, name in pairs]
+        
+        query = """
+        SELECT d.chat_bot_id, d.content_name
+        FROM documents d
+        JOIN unnest($1::text[], $2::text[]) AS p(chat_bot_id, content_name)
+          ON d.chat_bot_id = p.chat_bot_id AND d.content_name = p.content_name
+        WHERE d.chat_bot_id = ANY($1::text[])
+        """
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, bot_ids, names)
+        
+        return {(row['chat_bot_id'], row['content_name']) for row in rows}
+    
     async def get_existing_content_names(self, account_name: str, chat_bot_id: str, content_names: List[str]) -> List[str]:
         """
         존재하는 content_name들만 반환
@@ -985,48 +1277,220 @@ class PostgresClient:
                 
                 return found_names
 
-    async def delete_bot_data(self, account_name: str, chat_bot_id: str) -> tuple:
+    async def delete_bot_data(self, account_name: str, chat_bot_id: str, partition_name: str) -> tuple:
         """
         봇 전체 데이터 삭제 (해당 파티션의 모든 문서와 청크)
         
         Args:
             account_name: 계정명
             chat_bot_id: 챗봇 ID
+            partition_name: Milvus 파티션명 (툼스톤 기록용)
         
         Returns:
-            (삭제된 문서 수, 삭제된 청크 수)
+            (삭제된 문서 수, 삭제된 청크 수, 툼스톤 max_doc_id 또는 None)
+        
+        Note:
+            같은 문장에서 deleted_partitions 툼스톤을 기록
+            (Milvus 벡터는 리퍼가 doc_id <= max_doc_id 조건으로 나중에 삭제)
         """
         pool = await self.get_pool(account_name)
         
+        # 통계 조회 + 청크/문서 삭제 + 툼스톤 기록을 단일 문장으로 실행 (왕복 1회)
+        # - 데이터 변경 CTE는 같은 스냅샷에서 실행되며 문장 단위로 원자적
+        # - 기존 툼스톤이 있으면 더 큰 max_doc_id로 갱신
+        delete_query = """
+        WITH deleted_chunks AS (
+            DELETE FROM document_chunks
+            WHERE chat_bot_id = $1
+            RETURNING 1
+        ),
+        deleted_docs AS (
+            DELETE FROM documents
+            WHERE chat_bot_id = $1
+            RETURNING doc_id
+        ),
+        stats AS (
+            SELECT
+                (SELECT COUNT(*) FROM deleted_docs) AS doc_count,
+                (SELECT COUNT(*) FROM deleted_chunks) AS chunk_count,
+                (SELECT MAX(doc_id) FROM deleted_docs) AS max_doc_id
+        ),
+        tombstone AS (
+            INSERT INTO deleted_partitions (chat_bot_id, partition_name, max_doc_id)
+            SELECT $1, $2, max_doc_id FROM stats WHERE max_doc_id IS NOT NULL
+            ON CONFLICT (chat_bot_id) DO UPDATE
+            SET max_doc_id = GREATEST(deleted_partitions.max_doc_id, EXCLUDED.max_doc_id),
+                deleted_at = NOW()
+            RETURNING max_doc_id
+        )
+        SELECT
+            stats.doc_count,
+            stats.chunk_count,
+            (SELECT max_doc_id FROM tombstone) AS max_doc_id
+        FROM stats
+        """
+        
         async with pool.acquire() as conn:
+            row = await conn.fetchrow(delete_query, chat_bot_id, partition_name)
+        
+        doc_count, chunk_count, max_doc_id = row['doc_count'], row['chunk_count'], row['max_doc_id']
+        logger.info(f"봇 데이터 삭제 완료 (account: {account_name}, bot: {chat_bot_id}): {doc_count}개 문서, {chunk_count}개 청크")
+        
+        # 툼스톤 커밋 이후 계정 표시 (리퍼가 이 계정을 조회 대상에 포함)
+        # 실패해도 삭제는 완료됐으므로 로그만 남김 (이 프로세스의 리퍼는 로컬 툼스톤으로 처리)
+        if max_doc_id is not None:
+            try:
+                await self.mark_tombstone_account(account_name)
+            except Exception as e:
+                logger.warning(f"⚠️ 툼스톤 계정 표시 실패 (account: {account_name}): {e}")
+        return doc_count, chunk_count, max_doc_id
+    
+    async def mark_tombstone_account(self, account_name: str):
+        """
+        툼스톤이 있는 계정으로 표시 (tombstone_accounts upsert)
+        
+        Args:
+            account_name: 계정명
+        
+        Note:
+            툼스톤 커밋 이후에 호출해야 함
+            (marked_at이 리퍼 조회 시각보다 늦으므로 리퍼가 새 툼스톤을 놓친 채 표시를 지우지 않음)
+        """
+        admin_pool = await self.get_admin_pool()
+        
+        async with admin_pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO tombstone_accounts (account_name) VALUES ($1)
+                ON CONFLICT (account_name) DO UPDATE SET marked_at = clock_timestamp()
+            """, account_name)
+    
+    async def list_tombstone_accounts(self) -> Tuple[List[str], Any]:
+        """
+        툼스톤이 있는 계정 목록 조회
+        
+        Returns:
+            (계정명 리스트, 조회 시각) - 조회 시각은 unmark_tombstone_account에 전달
+        """
+        admin_pool = await self.get_admin_pool()
+        
+        async with admin_pool.acquire() as conn:
+            checked_at = await conn.fetchval("SELECT clock_timestamp()")
+            rows = await conn.fetch("SELECT account_name FROM tombstone_accounts")
+        return [row['account_name'] for row in rows], checked_at
+    
+    async def unmark_tombstone_account(self, account_name: str, checked_at) -> bool:
+        """
+        툼스톤을 모두 정리한 계정의 표시 제거
+        
+        Args:
+            account_name: 계정명
+            checked_at: list_tombstone_accounts 조회 시각
+        
+        Returns:
+            제거 여부 (조회 이후 새 봇 삭제로 다시 표시됐으면 False)
+        """
+        admin_pool = await self.get_admin_pool()
+        
+        async with admin_pool.acquire() as conn:
+            result = await conn.execute(
+                "DELETE FROM tombstone_accounts WHERE account_name = $1 AND marked_at < $2",
+                account_name, checked_at
+            )
+        return result != "DELETE 0"
+    
+    async def get_deleted_partitions(self, account_name: str) -> List[Dict[str, Any]]:
+        """
+        Milvus 삭제 대기 중인 봇 툼스톤 조회
+        
+        Args:
+            account_name: 계정명
+        
+        Returns:
+            [{"chat_bot_id", "partition_name", "max_doc_id"}, ...]
+        
+        Note:
+            풀 없이 account_connection으로 조회 (리퍼/검색 서버가 계정별 풀을 만들지 않음)
+            툼스톤 테이블이 아직 없는 기존 DB는 툼스톤 없음으로 처리
+        """
+        async with self.account_connection(account_name) as conn:
+            try:
+                rows = await conn.fetch(
+                    "SELECT chat_bot_id, partition_name, max_doc_id FROM deleted_partitions"
+                )
+            except asyncpg.UndefinedTableError:
+                return []
+        return [dict(row) for row in rows]
+    
+    async def clear_deleted_partition(self, account_name: str, chat_bot_id: str, max_doc_id: int) -> bool:
+        """
+        Milvus 삭제가 끝난 툼스톤 제거
+        
+        Args:
+            account_name: 계정명
+            chat_bot_id: 챗봇 ID
+            max_doc_id: 리퍼가 처리한 max_doc_id
+        
+        Returns:
+            제거 여부 (처리 도중 더 큰 max_doc_id로 갱신됐으면 False → 다음 주기에 재처리)
+        """
+        async with self.account_connection(account_name) as conn:
+            result = await conn.execute(
+                "DELETE FROM deleted_partitions WHERE chat_bot_id = $1 AND max_doc_id = $2",
+                chat_bot_id, max_doc_id
+            )
+        return result != "DELETE 0"
+    
+    @asynccontextmanager
+    async def lock_bot_if_empty(self, account_name: str, chat_bot_id: str):
+        """
+        봇에 남은 문서/툼스톤이 없는지 확인하고, 확인 결과를 유지하는 동안 문서 삽입 차단
+        
+        Args:
+            account_name: 계정명
+            chat_bot_id: 챗봇 ID
+        
+        Yields:
+            True면 남은 문서와 대기 중인 툼스톤이 없음 (빈 Milvus 파티션 삭제 가능)
+        
+        Note:
+            bot_registry 행을 FOR UPDATE로 잠그므로 with 블록이 끝날 때까지
+            documents 삽입(FK 확인 시 FOR KEY SHARE)이 대기함
+            → 블록 안에서 Milvus 파티션을 삭제하면 새 문서는 삭제 이후에만 삽입됨
+        """
+        async with self.account_connection(account_name) as conn:
             async with conn.transaction():
-                # 1. 삭제 전 통계 조회
-                stats_query = """
-                SELECT 
-                    COUNT(DISTINCT d.doc_id) as doc_count,
-                    COUNT(c.chunk_id) as chunk_count
-                FROM documents d
-                LEFT JOIN document_chunks c ON d.doc_id = c.doc_id
-                WHERE d.chat_bot_id = $1
-                """
-                stats_row = await conn.fetchrow(stats_query, chat_bot_id)
-                doc_count = stats_row['doc_count'] if stats_row else 0
-                chunk_count = stats_row['chunk_count'] if stats_row else 0
-                
-                # 2. 청크 삭제 (CASCADE로 자동 삭제되지만 명시적으로)
-                await conn.execute("""
-                    DELETE FROM document_chunks 
-                    WHERE chat_bot_id = $1
-                """, chat_bot_id)
-                
-                # 3. 문서 삭제
-                await conn.execute("""
-                    DELETE FROM documents 
-                    WHERE chat_bot_id = $1
+                await conn.execute("SELECT 1 FROM bot_registry WHERE bot_id = $1 FOR UPDATE", chat_bot_id)
+                has_data = await conn.fetchval("""
+                    SELECT EXISTS(SELECT 1 FROM documents WHERE chat_bot_id = $1)
+                        OR EXISTS(SELECT 1 FROM deleted_partitions WHERE chat_bot_id = $1)
                 """, chat_bot_id)
-                
-                logger.info(f"봇 데이터 삭제 완료 (account: {account_name}, bot: {chat_bot_id}): {doc_count}개 문서, {chunk_count}개 청크")
-                return doc_count, chunk_count
+                yield not has_data
+    
+    async def list_account_names(self) -> List[str]:
+        """
+        PostgreSQL에 DB가 있는 계정명 목록 조회 (리퍼 기동 시 툼스톤 계정 표시 보정용)
+        
+        Returns:
+            계정명 리스트 (POSTGRES_DB_PREFIX로 시작하는 DB 기준)
+        """
+        prefix = settings.POSTGRES_DB_PREFIX
+        admin_pool = await self.get_admin_pool()
+        
+        async with admin_pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT datname FROM pg_database WHERE left(datname, length($1)) = $1 AND NOT datistemplate",
+                prefix
+            )
+        
+        account_names = []
+        for row in rows:
+            account_name = row['datname'][len(prefix):]
+            try:
+                settings.get_db_name(account_name)  # 계정명 형식 검증
+            except ValueError:
+                continue
+            account_names.append(account_name)
+        return account_names
 
 
 # 전역 클라이언트 인스턴스
@@ -1,6 +1,7 @@
 """
 컬렉션 관련 Pydantic 모델
 """
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -48,3 +49,32 @@ class BotRegisterResponse(BaseModel):
     partition_name: str = Field(..., description="생성된 파티션명", example="bot_550e8400e29b41d4a716446655440000")
     collection_name: str = Field(..., description="컬렉션명", example="collection_chatty")
 
+
+# ========== 3. 봇 일괄 등록 ==========
+class BotBatchRegisterRequest(BaseModel):
+    """
+    봇 일괄 등록 요청
+    
+    Note: 
+    - PostgreSQL은 계정별 단일 트랜잭션으로 등록
+    - Milvus 파티션은 동시 실행 수를 제한하여 병렬 생성
+    """
+    bots: List[BotRegisterRequest] = Field(..., description="등록할 봇 리스트", min_items=1)
+
+
+class BotBatchRegisterResult(BaseModel):
+    """봇 일괄 등록 개별 결과"""
+    chat_bot_id: str = Field(..., description="챗봇 ID")
+    partition_name: str = Field(..., description="파티션명")
+    status: str = Field(..., description="상태 (success / failed)", example="success")
+    error: Optional[str] = Field(None, description="실패 사유")
+
+
+class BotBatchRegisterResponse(BaseModel):
+    """봇 일괄 등록 응답"""
+    status: str = Field(..., description="상태 (success / partial / failed)", example="success")
+    message: str = Field(..., description="메시지")
+    total_count: int = Field(..., description="요청 봇 수")
+    success_count: int = Field(..., description="성공 수")
+    failed_count: int = Field(..., description="실패 수")
+    results: List[BotBatchRegisterResult] = Field(..., description="봇별 결과")
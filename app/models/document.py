@@ -44,11 +44,12 @@ class DocumentInsertRequest(BaseModel):
         
         ⚠️ 메타데이터 저장 규칙:
         - Milvus 필터링용: content_type, source_type, language, tags, category, author, department, created_date, page_count, file_size, status, priority, is_public, has_attachments
+        - Milvus 미리보기용: title (return_full_text=False 검색 결과)
         - PostgreSQL 전체: 모든 메타데이터 필드 (전체 저장)
         
         예시:
         {
-            "title": "인공지능 입문서",           // → PostgreSQL (전체)
+            "title": "인공지능 입문서",           // → Milvus + PostgreSQL
             "content_type": "pdf",              // → Milvus + PostgreSQL
             "source_type": "file",              // → Milvus + PostgreSQL  
             "tags": ["ai", "ml"],               // → Milvus + PostgreSQL
@@ -227,8 +228,9 @@ class BotDeleteRequest(BaseModel):
 
 
 class BotDeleteResponse(BaseModel):
-    """봇 전체 삭제 응답"""
-    status: str = Field(..., description="상태", example="success")
+    """봇 전체 삭제 응답 (Milvus 벡터는 백그라운드 삭제)"""
+    status: str = Field(..., description="상태", example="accepted")
+    job_id: Optional[str] = Field(None, description="Milvus 벡터 삭제 작업 ID (삭제할 문서가 없으면 None)")
     chat_bot_id: str = Field(..., description="삭제된 봇 ID")
     deleted_documents: int = Field(..., description="삭제된 문서 수")
     deleted_chunks: int = Field(..., description="삭제된 청크 수")
@@ -238,6 +240,18 @@ class BotDeleteResponse(BaseModel):
     total_time_ms: float = Field(..., description="총 삭제 시간 (ms)")
 
 
+class BotDeleteJobStatusResponse(BaseModel):
+    """봇 삭제 작업(Milvus 벡터 삭제) 상태 응답"""
+    job_id: str = Field(..., description="작업 ID")
+    status: str = Field(..., description="작업 상태 (pending / completed)", example="pending")
+    account_name: str = Field(..., description="계정명")
+    chat_bot_id: str = Field(..., description="봇 ID")
+    max_doc_id: int = Field(..., description="삭제 대상 최대 doc_id")
+    deleted_vectors: Optional[int] = Field(None, description="삭제된 벡터 수 (완료 시)")
+    created_at: datetime = Field(..., description="작업 생성 시간")
+    completed_at: Optional[datetime] = Field(None, description="작업 완료 시간")
+
+
 class DuplicateCheckRequest(BaseModel):
     """중복 검사 요청"""
     account_name: str = Field(..., description="계정명", example="chatty")
@@ -13,12 +13,19 @@ class SearchRequest(BaseModel):
     - account_name으로 컬렉션 선택 (collection_chatty)
     - chat_bot_id로 파티션 자동 선택
     - filter_expr로 메타데이터 필터링 (옵션)
+    - return_full_text=False면 chunk_text는 미리보기(CHUNK_TEXT_PREVIEW_CHARS자),
+      document의 title/metadata는 Milvus 메타데이터 기준 (미리보기 필드가 없는 기존 컬렉션은 PostgreSQL 조회)
     """
     account_name: str = Field(..., description="계정명", example="chatty")
     chat_bot_id: str = Field(..., description="챗봇 ID (UUID)", example="550e8400-e29b-41d4-a716-446655440000")
     query_text: str = Field(..., description="검색 쿼리", example="인공지능 학습 방법")
     limit: int = Field(5, description="반환할 결과 수", example=5)
     filter_expr: Optional[str] = Field(None, description="메타데이터 필터 표현식", example='metadata["file_type"] == "pdf"')
+    return_full_text: bool = Field(
+        True,
+        description="전체 청크 텍스트 반환 여부 (False면 Milvus에 저장된 미리보기만 반환하고 PostgreSQL 조회 생략)",
+        example=True
+    )
 
 
 class SearchResultItem(BaseModel):
@@ -4,13 +4,19 @@ Milvus 필터링용 메타데이터 스키마 정의
 Milvus의 metadata 필드에 저장할 수 있는 필터링용 메타데이터만 정의합니다.
 상세한 메타데이터는 PostgreSQL에 저장됩니다.
 """
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from app.config import settings
 
 
 # MilvusMetadata 클래스는 설정 기반으로 동작하므로 제거
 # 대신 filter_milvus_metadata() 함수를 사용하여 동적으로 필터링
 
+# 설정과 무관하게 항상 Milvus에 저장하는 필드 (return_full_text=False 검색 결과의 document.title)
+MILVUS_PREVIEW_METADATA_FIELDS = ("title",)
+
+# Milvus 필터링 필드 집합 (모듈 로드 시 1회 생성, 호출마다 set 재생성 방지)
+_MILVUS_FIELDS = frozenset(settings.MILVUS_METADATA_FIELDS).union(MILVUS_PREVIEW_METADATA_FIELDS)
+
 
 def filter_milvus_metadata(all_metadata: dict) -> dict:
     """
@@ -21,17 +27,37 @@ def filter_milvus_metadata(all_metadata: dict) -> dict:
         
     Returns:
         Milvus 필터링용 메타데이터 딕셔너리
-    """
-    # 설정에서 Milvus 필터링 필드 목록 가져오기
-    milvus_fields = set(settings.MILVUS_METADATA_FIELDS)
     
-    # Milvus 필터링용 필드만 추출
-    milvus_metadata = {}
-    for key, value in all_metadata.items():
-        if key in milvus_fields and value is not None:
-            milvus_metadata[key] = value
+    Note:
+        허용 필드와 메타데이터 키의 교집합만 순회 (None 값은 제외)
+    """
+    return {
+        key: all_metadata[key]
+        for key in _MILVUS_FIELDS & all_metadata.keys()
+        if all_metadata[key] is not None
+    }
+
+
+def filter_milvus_metadata_many(metadata_list: Iterable[Optional[dict]]) -> Iterator[dict]:
+    """
+    여러 문서의 메타데이터를 순서대로 Milvus 필터링용으로 변환
     
-    return milvus_metadata
+    Args:
+        metadata_list: 문서별 전체 메타데이터 (None 허용)
+        
+    Returns:
+        Milvus 필터링용 메타데이터 딕셔너리 이터레이터 (입력 순서 유지)
+    """
+    fields = _MILVUS_FIELDS
+    for all_metadata in metadata_list:
+        if not all_metadata:
+            yield {}
+            continue
+        yield {
+            key: all_metadata[key]
+            for key in fields & all_metadata.keys()
+            if all_metadata[key] is not None
+        }
 
 
 def get_postgresql_metadata(all_metadata: dict) -> dict:
@@ -44,16 +70,12 @@ def get_postgresql_metadata(all_metadata: dict) -> dict:
     Returns:
         PostgreSQL용 상세 메타데이터 딕셔너리
     """
-    # 설정에서 Milvus 필터링 필드 목록 가져오기
-    milvus_fields = set(settings.MILVUS_METADATA_FIELDS)
-    
     # Milvus 필드가 아닌 모든 필드를 PostgreSQL용으로 분류
-    postgresql_metadata = {}
-    for key, value in all_metadata.items():
-        if key not in milvus_fields and value is not None:
-            postgresql_metadata[key] = value
-    
-    return postgresql_metadata
+    return {
+        key: value
+        for key, value in all_metadata.items()
+        if key not in _MILVUS_FIELDS and value is not None
+    }
 
 
 def get_milvus_metadata_fields() -> set:
@@ -63,7 +85,7 @@ def get_milvus_metadata_fields() -> set:
     Returns:
         Milvus 필터링용 필드 집합
     """
-    return set(settings.MILVUS_METADATA_FIELDS)
+    return set(_MILVUS_FIELDS)
 
 
 def is_milvus_metadata_field(field_name: str) -> bool:
@@ -76,7 +98,7 @@ def is_milvus_metadata_field(field_name: str) -> bool:
     Returns:
         Milvus 필터링용 필드 여부
     """
-    return field_name in settings.MILVUS_METADATA_FIELDS
+    return field_name in _MILVUS_FIELDS
 
 
 # === Milvus 필터링 예시 ===
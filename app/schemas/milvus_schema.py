@@ -3,6 +3,31 @@ Milvus 컬렉션 스키마 정의
 """
 from pymilvus import FieldSchema, CollectionSchema, DataType
 
+# 청크 텍스트 미리보기 필드 (검색 결과를 PostgreSQL 조회 없이 반환할 때 사용)
+CHUNK_TEXT_PREVIEW_FIELD = "chunk_text_preview"
+# VARCHAR max_length는 바이트 기준 (UTF-8 한글 3바이트 → 256자 미리보기 여유 있게 수용)
+CHUNK_TEXT_PREVIEW_MAX_LENGTH = 1024
+
+
+def make_chunk_text_preview(text: str, max_chars: int) -> str:
+    """
+    청크 텍스트 미리보기 생성 (Milvus VARCHAR 길이 제한 이내로 자름)
+    
+    Args:
+        text: 청크 텍스트
+        max_chars: 최대 문자 수
+    
+    Returns:
+        미리보기 문자열
+    """
+    preview = text[:max_chars]
+    if len(preview) * 4 > CHUNK_TEXT_PREVIEW_MAX_LENGTH:
+        encoded = preview.encode("utf-8")
+        if len(encoded) > CHUNK_TEXT_PREVIEW_MAX_LENGTH:
+            # 잘린 멀티바이트 문자는 버림
+            preview = encoded[:CHUNK_TEXT_PREVIEW_MAX_LENGTH].decode("utf-8", "ignore")
+    return preview
+
 
 def create_collection_schema(dimension: int = 1536, use_sparse: bool = True) -> CollectionSchema:
     """
@@ -18,6 +43,8 @@ def create_collection_schema(dimension: int = 1536, use_sparse: bool = True) ->
     Note:
         - use_sparse=True: embedding_sparse 필드를 항상 생성 (기본값 NULL)
         - 향후 하이브리드 검색 고도화 시 sparse 벡터 사용 가능
+        - chunk_text_preview는 이 필드 추가 이후 생성된 컬렉션에만 존재
+          (기존 컬렉션은 milvus_client.has_text_preview로 확인 후 사용)
     """
     fields = [
         FieldSchema(
@@ -59,6 +86,12 @@ def create_collection_schema(dimension: int = 1536, use_sparse: bool = True) ->
             name="metadata",
             dtype=DataType.JSON,
             description="메타데이터 (JSON 형태, expr 필터링용)"
+        ),
+        FieldSchema(
+            name=CHUNK_TEXT_PREVIEW_FIELD,
+            dtype=DataType.VARCHAR,
+            max_length=CHUNK_TEXT_PREVIEW_MAX_LENGTH,
+            description="청크 텍스트 미리보기 (검색 결과 반환용, PostgreSQL 조회 생략)"
         )
     ]
     
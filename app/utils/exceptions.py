@@ -37,3 +37,7 @@ class CollectionNotFoundError(MilvusRAGException):
     """컬렉션을 찾을 수 없음"""
     pass
 
+
+class CollectionAlreadyExistsError(MilvusRAGException):
+    """컬렉션이 이미 존재함"""
+    pass
@@ -1,41 +1,86 @@
 """
 로깅 설정
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import orjson
 from app.config import settings
 
+# 모든 로거가 공유하는 로그 큐 (실제 출력은 리스너 스레드에서 수행)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _get_listener() -> logging.handlers.QueueListener:
+    """
+    stdout 출력용 QueueListener 반환 (최초 호출 시 1회 시작)
+
+    Note:
+        요청 처리 스레드는 큐에 레코드만 적재하고,
+        포맷팅 이후의 I/O는 리스너 스레드가 담당
+    """
+    global _listener
+
+    if _listener is None:
+        # 콘솔 핸들러
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setLevel(getattr(logging, settings.LOG_LEVEL))
+
+        # 포맷터
+        formatter = logging.Formatter(
+            fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        handler.setFormatter(formatter)
+
+        _listener = logging.handlers.QueueListener(_log_queue, handler, respect_handler_level=True)
+        _listener.start()
+
+        # 종료 시 큐에 남은 로그 출력
+        atexit.register(_listener.stop)
+
+    return _listener
+
 
 def setup_logger(name: str) -> logging.Logger:
     """
     로거 설정
-    
+
     Args:
         name: 로거 이름 (보통 __name__)
-    
+
     Returns:
         설정된 로거 객체
     """
     logger = logging.getLogger(name)
-    
+
     # 이미 핸들러가 있으면 중복 추가 방지
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
-    # 콘솔 핸들러
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(getattr(logging, settings.LOG_LEVEL))
-    
-    # 포맷터
-    formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
-    
-    logger.addHandler(handler)
-    
+
+    # 큐 핸들러 (출력은 리스너 스레드에서 비동기 처리)
+    _get_listener()
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+
     return logger
 
+
+def log_request_summary(logger: logging.Logger, event: str, **fields):
+    """
+    요청당 1회 요약 로그를 JSON 한 줄로 출력
+
+    Args:
+        logger: 출력할 로거
+        event: 이벤트명 (예: document_delete, search)
+        **fields: 요약 필드 (건수, 단계별 소요 시간 등)
+
+    Note:
+        INFO가 꺼져 있으면 직렬화하지 않음 (orjson으로 1회 인코딩)
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(orjson.dumps({"event": event, **fields}).decode())
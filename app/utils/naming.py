@@ -0,0 +1,41 @@
+"""
+Milvus 컬렉션/파티션 이름 생성
+- 순수 함수이므로 lru_cache로 같은 계정/봇은 캐시된 값 재사용
+"""
+from functools import lru_cache
+
+# 하이픈 제거용 변환 테이블 (모듈 로드 시 1회 생성)
+_HYPHEN_DELETE_TABLE = str.maketrans("", "", "-")
+
+
+@lru_cache(maxsize=8192)
+def generate_partition_name(chat_bot_id: str) -> str:
+    """
+    chat_bot_id로 파티션명 자동 생성
+
+    Args:
+        chat_bot_id: 봇 ID (UUID)
+
+    Returns:
+        파티션명 (예: bot_550e8400e29b41d4a716446655440000)
+    """
+    s = chat_bot_id
+    # 표준 UUID 형식(8-4-4-4-12)은 하이픈 위치가 고정이므로 슬라이싱으로 바로 조합
+    # (하이픈이 정확히 4개일 때만, 그 외에는 모든 하이픈 제거)
+    if len(s) == 36 and s[8] == s[13] == s[18] == s[23] == "-" and s.count("-") == 4:
+        return "bot_" + s[0:8] + s[9:13] + s[14:18] + s[19:23] + s[24:36]
+    return "bot_" + s.translate(_HYPHEN_DELETE_TABLE)
+
+
+@lru_cache(maxsize=1024)
+def generate_collection_name(account_name: str) -> str:
+    """
+    account_name으로 컬렉션명 생성
+
+    Args:
+        account_name: 계정명 (예: chatty)
+
+    Returns:
+        컬렉션명 (예: collection_chatty)
+    """
+    return "collection_" + account_name
@@ -12,7 +12,10 @@ from app.api import collection, data
 from fastapi import APIRouter
 from app.utils.logger import setup_logger
 from app.core.partition_manager import partition_manager
+from app.core.postgres_client import postgres_client
 from app.core.auto_flusher import auto_flusher
+from app.core.partition_creator import partition_creator
+from app.core.partition_reaper import partition_reaper
 import asyncio
 
 # 로거 설정
@@ -36,7 +39,8 @@ async def lifespan(app: FastAPI):
         )
         logger.info(f"✅ Connected to Milvus ({settings.MILVUS_HOST}:{settings.MILVUS_PORT})")
         
-        # PostgreSQL 연결 테스트
+        # PostgreSQL 관리용 연결 풀 생성 (연결 테스트 겸용, 계정별 풀은 첫 요청 시 생성)
+        await postgres_client.get_admin_pool()
         logger.info(f"✅ PostgreSQL Connected to ({settings.POSTGRES_HOST}:{settings.POSTGRES_PORT})")
         
         # 모든 컬렉션 전체 로드 (시작 시 한 번만)
@@ -48,6 +52,14 @@ async def lifespan(app: FastAPI):
         flush_task = asyncio.create_task(auto_flusher.start())
         logger.info(f"✅ Auto-flusher started (delay: {auto_flusher.delay_seconds}s, max_wait: {auto_flusher.max_wait_seconds}s)")
         
+        # 파티션 생성 워커 시작 (봇 등록 시 Milvus 파티션 생성 묶음 처리)
+        partition_creator_task = asyncio.create_task(partition_creator.start())
+        logger.info(f"✅ Partition creator started (group_size: {partition_creator.group_size})")
+        
+        # 삭제된 봇 벡터 정리 워커 시작 (툼스톤 기반 Milvus 지연 삭제)
+        partition_reaper_task = asyncio.create_task(partition_reaper.start(reap=True))
+        logger.info(f"✅ Partition reaper started (interval: {partition_reaper.interval_seconds}s)")
+        
         logger.info("🎉 FastAPI Insert Server Ready!")
         
     except Exception as e:
@@ -73,9 +85,33 @@ async def lifespan(app: FastAPI):
                 pass
         logger.info("✅ Auto-flusher stopped")
         
+        # 파티션 생성 워커 중지
+        if 'partition_creator_task' in locals():
+            partition_creator_task.cancel()
+            try:
+                await asyncio.wait_for(partition_creator_task, timeout=2.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
+        await partition_creator.stop()
+        logger.info("✅ Partition creator stopped")
+        
+        # 삭제된 봇 벡터 정리 워커 중지
+        partition_reaper.stop()
+        if 'partition_reaper_task' in locals():
+            partition_reaper_task.cancel()
+            try:
+                await asyncio.wait_for(partition_reaper_task, timeout=2.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
+        logger.info("✅ Partition reaper stopped")
+        
         # 약간의 대기 (백그라운드 태스크 정리 완료 대기)
         await asyncio.sleep(0.1)
         
+        # PostgreSQL 연결 풀 해제
+        await postgres_client.disconnect()
+        logger.info("✅ PostgreSQL pools closed")
+        
         # Milvus 연결 해제
         try:
             connections.disconnect(alias="default")
@@ -11,6 +11,8 @@ from app.api import search
 from fastapi import APIRouter
 from app.utils.logger import setup_logger
 from app.core.partition_manager import partition_manager
+from app.core.postgres_client import postgres_client
+from app.core.partition_reaper import partition_reaper
 import asyncio
 
 # 로거 설정
@@ -42,6 +44,10 @@ async def lifespan(app: FastAPI):
         preload_result = await partition_manager.preload_all_collections()
         logger.info(f"✅ All collections loaded: {preload_result['collections_loaded']} collections, {preload_result['total_partitions']} partitions")
         
+        # 봇 삭제 툼스톤 캐시 갱신 워커 시작 (Milvus 삭제는 삽입 서버가 담당)
+        partition_reaper_task = asyncio.create_task(partition_reaper.start(reap=False))
+        logger.info(f"✅ Partition tombstone watcher started (interval: {partition_reaper.interval_seconds}s)")
+        
         logger.info("🎉 FastAPI Search Server Ready!")
         
     except Exception as e:
@@ -57,9 +63,22 @@ async def lifespan(app: FastAPI):
         # 파티션 매니저 정리 (Redis 없이 동작하므로 별도 종료 불필요)
         logger.info("✅ Partition manager cleanup completed")
         
+        # 툼스톤 캐시 갱신 워커 중지
+        partition_reaper.stop()
+        if 'partition_reaper_task' in locals():
+            partition_reaper_task.cancel()
+            try:
+                await asyncio.wait_for(partition_reaper_task, timeout=2.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                pass
+        
         # 약간의 대기 (백그라운드 태스크 정리 완료 대기)
         await asyncio.sleep(0.1)
         
+        # PostgreSQL 연결 풀 해제
+        await postgres_client.disconnect()
+        logger.info("✅ PostgreSQL pools closed")
+        
         # Milvus 연결 해제
         try:
             connections.disconnect(alias="default")